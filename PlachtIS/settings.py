@@ -33,6 +33,73 @@ BUILD_ID = os.environ.get('BUILD_ID', 'unknown')
 # RFID reader API authentication
 RFID_API_KEY = os.environ.get('RFID_API_KEY', '')
 
+# Lifetime of cached RFID UID → ticket index entries (seconds). Entries are
+# invalidated explicitly on pairing/assignment changes; the TTL only bounds
+# staleness after edits made outside the app (e.g. Django shell).
+RFID_INDEX_TTL = 3600
+
+# Route the reader endpoints to their async views. Enable when serving
+# PlachtIS.asgi with an ASGI worker (see DEPLOYMENT.md).
+RFID_API_ASYNC = os.environ.get('RFID_API_ASYNC', 'False') == 'True'
+
+# Server-Sent Events stream for readers (api/rfid/events/). Each open stream
+# holds a gunicorn thread, so it is closed after RFID_EVENTS_MAX_DURATION and
+# the reader reconnects.
+RFID_EVENTS_POLL_INTERVAL = 0.5  # seconds between cached state checks
+RFID_EVENTS_KEEPALIVE = 15  # seconds between keepalive comments
+RFID_EVENTS_MAX_DURATION = 300  # seconds
+RFID_EVENTS_RETRY_MS = 1000  # reconnect delay advertised to readers
+# Open streams a process serves from its sync worker threads; further readers
+# get a 503 and poll the heartbeat instead. Defaults to half of the gunicorn
+# threads so the InfoDesk always has threads left (0 disables the cap; the
+# async stream of RFID_API_ASYNC holds no thread and is not capped).
+RFID_EVENTS_MAX_SYNC_STREAMS = int(
+    os.environ.get('RFID_EVENTS_MAX_SYNC_STREAMS')
+    or max(1, int(os.environ.get('GUNICORN_THREADS') or 4) // 2)
+)
+
+# How long a processed scan_id is remembered; a retried scan within this
+# window gets the original response without being applied again.
+RFID_SCAN_DEDUP_WINDOW = 600  # seconds
+
+# Repeated reads of the same card on the same module within this window get
+# the previous answer without touching the database (0 disables).
+RFID_SCAN_DEBOUNCE_SECONDS = 5
+
+# Reader telemetry (heartbeats, scan counts, latency) is buffered in memory
+# and written to the database at most once per flush interval per worker.
+RFID_TELEMETRY_FLUSH_INTERVAL = 10  # seconds
+RFID_TELEMETRY_BUFFER_SIZE = 10000  # scans kept per module between flushes
+RFID_TELEMETRY_RETENTION_HOURS = 24  # per-minute throughput history
+RFID_READER_STALE_SECONDS = 60  # reader shown as offline after this silence
+
+# Token buckets in front of the reader API, as (tokens per second, burst);
+# a rate of 0 disables the limit. Over the limit a request gets a 429 with
+# Retry-After. All readers share the API key, so its bucket caps the total.
+RFID_RATE_LIMIT_KEY = (100, 300)
+RFID_RATE_LIMIT_MODULE = (10, 50)
+
+# Boats on water longer than their class's max_on_water_minutes (or this
+# default) are flagged as overdue; the watch_overdue command re-evaluates
+# every OVERDUE_CHECK_INTERVAL seconds.
+OVERDUE_DEFAULT_MINUTES = 180
+OVERDUE_CHECK_INTERVAL = 5  # seconds
+OVERDUE_THRESHOLD_CACHE_SECONDS = 60  # per-class thresholds are re-read after this
+
+# How often the InfoDesk boats-on-water board asks for changes
+ON_WATER_BOARD_REFRESH = 3  # seconds
+
+# The InfoDesk dashboard counters are kept up to date by the InfoDesk views
+# and recomputed from scratch when older than this, to pick up changes made
+# elsewhere (registrations, the admin)
+DASHBOARD_COUNTERS_RECONCILE_SECONDS = 300
+
+# Tickets per page of the InfoDesk ticket list
+TICKET_LIST_PAGE_SIZE = 100
+
+# A previewed bulk ticket plan is kept this long for the confirm step
+TICKET_PLAN_CACHE_SECONDS = 900
+
 ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 
 # Always allow localhost for health checks
@@ -99,6 +166,43 @@ DATABASES = {
     }
 }
 
+# Write-behind for SailTicketLog: audit entries are queued and written in
+# batches by a background thread instead of inside each request. Entries that
+# cannot be written are spilled to TICKET_LOG_SPILL_DIR and retried.
+TICKET_LOG_WRITE_BEHIND = os.environ.get('TICKET_LOG_WRITE_BEHIND', 'False') == 'True'
+TICKET_LOG_FLUSH_INTERVAL_MS = 200
+TICKET_LOG_FLUSH_BATCH = 100  # flush early once this many entries wait
+TICKET_LOG_QUEUE_SIZE = 10000  # entries beyond this go straight to a spill file
+TICKET_LOG_SPILL_DIR = DB_DIR
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+# The RFID API keeps its hot-path state in the cache. The in-process default is
+# shared by all threads of one gunicorn worker; set CACHE_DIR to a writable
+# directory to share the cache between several workers. MAX_ENTRIES bounds the
+# cache (oldest entries are culled); the default of 300 is too small for one
+# UID index entry per card plus recent scan IDs.
+CACHE_DIR = os.environ.get('CACHE_DIR', '')
+
+if CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'plachtis',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
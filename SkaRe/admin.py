@@ -4,7 +4,7 @@ from solo.admin import SingletonModelAdmin
 
 from .models import (
     Entity, IndividualParticipant, Organizer, Unit, RegularParticipant,
-    EventSettings, BoatClass, Boat, Crew, CrewMember,
+    EventSettings, BoatClass, Boat, Crew, CrewMember, RfidReader,
 )
 
 # Existing registrations (unchanged)
@@ -18,8 +18,8 @@ admin.site.register(Entity)
 
 @admin.register(BoatClass)
 class BoatClassAdmin(admin.ModelAdmin):
-    list_display = ['name', 'category', 'is_other', 'order']
-    list_editable = ['order']
+    list_display = ['name', 'category', 'is_other', 'order', 'max_on_water_minutes']
+    list_editable = ['order', 'max_on_water_minutes']
     ordering = ['order', 'name']
 
 
@@ -49,3 +49,9 @@ class CrewAdmin(admin.ModelAdmin):
     @admin.display(description='Members')
     def member_count(self, obj):
         return obj.members.count()
+
+
+@admin.register(RfidReader)
+class RfidReaderAdmin(admin.ModelAdmin):
+    list_display = ('module_id', 'label', 'last_heartbeat_at', 'last_scan_at', 'scans')
+    fields = ('module_id', 'label')
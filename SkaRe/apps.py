@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class SkareConfig(AppConfig):
     name = 'SkaRe'
+
+    def ready(self):
+        from . import dashboard_counters, rfid_cache, rfid_telemetry
+        dashboard_counters.connect_signals()
+        rfid_cache.connect_signals()
+        rfid_telemetry.connect_signals()
@@ -0,0 +1,153 @@
+"""Materialized counters for the InfoDesk dashboard.
+
+The dashboard reads one DashboardCounters row instead of counting entities,
+people and tickets on every load. The counters move by the amount of each
+change with a single ``UPDATE ... SET n = n + delta``, in the transaction of
+the change and after saving it:
+
+- saving or deleting a Person or Entity instance (registration forms, the
+  InfoDesk confirm buttons, attendance changes of one person, the admin) is
+  picked up by the signal handlers connected in ``connect_signals``;
+- queryset and bulk updates, which send no signals, and sail ticket status
+  changes call the functions below explicitly.
+
+Changes that bypass both (raw SQL, bulk creation in the seed commands) are
+caught by ``current``, which recomputes the counters from scratch once they
+are older than ``DASHBOARD_COUNTERS_RECONCILE_SECONDS``; the
+``reconcile_dashboard_counters`` command does so on demand.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils.timezone import now
+
+from .models import DashboardCounters, Entity, Person, SailTicket
+
+# Person.attendance_status values counted on the dashboard
+PERSON_COUNTERS = {
+    Person.AttendanceStatus.ARRIVED: 'arrived',
+    Person.AttendanceStatus.EXPECTED: 'expected',
+    Person.AttendanceStatus.NOT_COMING: 'not_coming',
+}
+
+
+def adjust(**deltas):
+    """Add ``deltas`` (``counter=amount``) to the counters."""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = DashboardCounters.objects.filter(pk=DashboardCounters.singleton_instance_id).update(
+        **{name: F(name) + delta for name, delta in deltas.items()}
+    )
+    if not updated:
+        # No row yet: counting from scratch includes the change just saved
+        reconcile()
+
+
+def person_status_changed(old_status, new_status, count=1):
+    """``count`` people moved from ``old_status`` to ``new_status``."""
+    deltas = Counter()
+    if old_status in PERSON_COUNTERS:
+        deltas[PERSON_COUNTERS[old_status]] -= count
+    if new_status in PERSON_COUNTERS:
+        deltas[PERSON_COUNTERS[new_status]] += count
+    adjust(**deltas)
+
+
+def ticket_status_changed(old_status, new_status, count=1):
+    """``count`` sail tickets moved from ``old_status`` to ``new_status``."""
+    on_water = SailTicket.Status.ON_WATER
+    adjust(on_water=count * ((new_status == on_water) - (old_status == on_water)))
+
+
+def reconcile():
+    """Recompute all counters from the database; return the saved row.
+
+    The row is locked before counting, so a delta committed meanwhile is not
+    overwritten by counts taken before it.
+    """
+    with transaction.atomic():
+        DashboardCounters.objects.select_for_update().filter(
+            pk=DashboardCounters.singleton_instance_id,
+        ).first()
+        people = Person.objects.aggregate(**{
+            name: Count('pk', filter=Q(attendance_status=status))
+            for status, name in PERSON_COUNTERS.items()
+        })
+        counters, _created = DashboardCounters.objects.update_or_create(
+            pk=DashboardCounters.singleton_instance_id,
+            defaults={
+                'unconfirmed_entities': Entity.objects.filter(confirmed=False).count(),
+                'on_water': SailTicket.objects.filter(status=SailTicket.Status.ON_WATER).count(),
+                'reconciled_at': now(),
+                **people,
+            },
+        )
+    return counters
+
+
+def current():
+    """The counters for display: one primary-key read while they are fresh."""
+    counters = DashboardCounters.objects.filter(pk=DashboardCounters.singleton_instance_id).first()
+    max_age = timedelta(seconds=settings.DASHBOARD_COUNTERS_RECONCILE_SECONDS)
+    if counters is None or counters.reconciled_at is None or counters.reconciled_at < now() - max_age:
+        counters = reconcile()
+    return counters
+
+
+# Instances remember the value they were loaded (or last saved) with, so a
+# save can tell what it changed without reading the row again.
+
+def _remember_person(sender, instance, **kwargs):
+    instance._counted_status = instance.__dict__.get('attendance_status')
+
+
+def _person_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'attendance_status' not in update_fields):
+        return
+    old_status = None if created else instance._counted_status
+    if created or old_status is not None:
+        person_status_changed(old_status, instance.attendance_status)
+    instance._counted_status = instance.attendance_status
+
+
+def _person_deleted(sender, instance, **kwargs):
+    person_status_changed(instance._counted_status, None)
+
+
+def _remember_entity(sender, instance, **kwargs):
+    instance._counted_confirmed = instance.__dict__.get('confirmed')
+
+
+def _entity_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'confirmed' not in update_fields):
+        return
+    old_confirmed = None if created else instance._counted_confirmed
+    if created:
+        adjust(unconfirmed_entities=int(not instance.confirmed))
+    elif old_confirmed is not None:
+        adjust(unconfirmed_entities=int(old_confirmed) - int(instance.confirmed))
+    instance._counted_confirmed = instance.confirmed
+
+
+def _entity_deleted(sender, instance, **kwargs):
+    if instance._counted_confirmed is not None:
+        adjust(unconfirmed_entities=-int(not instance._counted_confirmed))
+
+
+def connect_signals():
+    """Follow saves and deletes of people (of every kind) and entities."""
+    for model in apps.get_models():
+        if issubclass(model, Person):
+            post_init.connect(_remember_person, sender=model)
+            post_save.connect(_person_saved, sender=model)
+    # Deleting a participant also deletes its Person row; count that one
+    post_delete.connect(_person_deleted, sender=Person)
+    post_init.connect(_remember_entity, sender=Entity)
+    post_save.connect(_entity_saved, sender=Entity)
+    post_delete.connect(_entity_deleted, sender=Entity)
@@ -1,8 +1,21 @@
 from django import forms
 from django.utils.translation import gettext_lazy as _
+from ..models import SailTicket
 
 
 class BulkTicketCreateForm(forms.Form):
+    MODE_RECONCILE = 'reconcile'
+    MODE_REPLACE = 'replace'
+
+    mode = forms.ChoiceField(
+        choices=[
+            (MODE_RECONCILE, _('Reconcile with existing tickets')),
+            (MODE_REPLACE, _('Delete all tickets and create anew')),
+        ],
+        initial=MODE_RECONCILE, required=False,
+        label=_('Mode'),
+        help_text=_('Reconciling keeps pairings, statuses and history of existing tickets'),
+    )
     p550_reserves = forms.IntegerField(
         min_value=0, initial=0, required=True,
         label=_('P550 reserve tickets'),
@@ -23,3 +36,50 @@ class BulkTicketCreateForm(forms.Form):
         label=_('Spare tickets'),
         help_text=_('Spare tickets not assigned to any boat'),
     )
+
+    def clean_mode(self):
+        # Forms posted before the mode existed meant a full replace
+        return self.cleaned_data['mode'] or self.MODE_REPLACE
+
+
+class PairingSessionForm(forms.Form):
+    module_id = forms.RegexField(
+        regex=r'^[A-Za-z0-9_.:-]{1,50}$',
+        label=_('Reader module'),
+        help_text=_('module_id the desk reader sends with its scans, e.g. desk-1'),
+        error_messages={'invalid': _('Use letters, digits and . _ : - only.')},
+    )
+    color = forms.ChoiceField(
+        choices=[('', _('All colors'))] + list(SailTicket.Color.choices),
+        required=False,
+        label=_('Color'),
+    )
+    code_prefix = forms.CharField(
+        max_length=50, required=False,
+        label=_('Code prefix'),
+        help_text=_('Only tickets whose code starts with this, e.g. P550-'),
+    )
+    limit = forms.IntegerField(
+        min_value=1, required=False,
+        label=_('Number of tickets'),
+        help_text=_('Leave empty to queue all matching unpaired tickets'),
+    )
+
+
+class RfidManifestForm(forms.Form):
+    manifest = forms.FileField(
+        label=_('Card manifest (CSV)'),
+        help_text=_('Two columns: ticket code and RFID UID, optionally with a header row'),
+    )
+    replace = forms.BooleanField(
+        required=False,
+        label=_('Re-pair tickets already paired to a different card'),
+    )
+    skip_conflicts = forms.BooleanField(
+        required=False,
+        label=_('Apply valid rows even if some rows conflict'),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label=_('Only check the manifest, do not save'),
+    )
@@ -0,0 +1,28 @@
+"""
+Build Trip rows from the existing SailTicketLog history.
+
+Trips are maintained when a ticket's status changes; this fills them in for
+status changes recorded before that. For tickets that already have trips only
+the log before their first trip is used, so the command is safe to run again
+(and to run after the site went live). --replace rebuilds all trips.
+
+Usage: python manage.py backfill_trips [--replace]
+"""
+from django.core.management.base import BaseCommand
+
+from SkaRe.trips import rebuild_trips
+
+
+class Command(BaseCommand):
+    help = 'Build departure/return trips from the sail ticket log'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Delete all trips and rebuild them from the log',
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_trips(replace=options['replace'])
+        self.stdout.write(self.style.SUCCESS(f'{created} trips created'))
@@ -0,0 +1,73 @@
+"""
+Pair RFID cards with sail tickets from a card supplier manifest.
+
+The manifest is a CSV with two columns, ticket code and RFID UID, optionally
+with a header row. Nothing is saved if any row conflicts, unless
+--skip-conflicts is given.
+
+Usage: python manage.py import_rfid_manifest cards.csv [--dry-run] [--replace] [--skip-conflicts]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from SkaRe.rfid_manifest import decode_manifest, import_manifest, parse_manifest
+
+
+class Command(BaseCommand):
+    help = 'Pair RFID cards with sail tickets from a CSV manifest (ticket code, rfid_uid)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='Path to the manifest CSV file')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and report without saving anything',
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Re-pair tickets that are already paired to a different card',
+        )
+        parser.add_argument(
+            '--skip-conflicts',
+            action='store_true',
+            help='Apply the valid rows even if some rows conflict',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['manifest'], 'rb') as f:
+                rows = parse_manifest(decode_manifest(f.read()))
+        except OSError as e:
+            raise CommandError(f'Cannot read manifest: {e}')
+        except UnicodeDecodeError:
+            raise CommandError('Manifest is not valid UTF-8/CP1250 text')
+        if not rows:
+            raise CommandError('Manifest contains no rows')
+
+        report = import_manifest(
+            rows,
+            replace=options['replace'],
+            skip_conflicts=options['skip_conflicts'],
+            dry_run=options['dry_run'],
+        )
+        for conflict in report['conflicts']:
+            self.stderr.write(
+                f"  line {conflict['line']}: {conflict['code']} → {conflict['rfid_uid']}: "
+                f"{conflict['reason']}"
+            )
+
+        summary = (
+            f"{len(rows)} rows: {report['paired']} to pair, "
+            f"{report['unchanged']} unchanged, {len(report['conflicts'])} conflicts"
+        )
+        if report['applied']:
+            self.stdout.write(self.style.SUCCESS(f"Paired {report['paired']} tickets ({summary})."))
+        elif options['dry_run']:
+            self.stdout.write(f'Dry run, nothing saved ({summary}).')
+        elif report['conflicts'] and report['paired']:
+            raise CommandError(
+                f'Nothing saved because of conflicts ({summary}). '
+                'Fix the manifest or use --skip-conflicts.'
+            )
+        else:
+            self.stdout.write(f'Nothing to pair ({summary}).')
@@ -0,0 +1,31 @@
+"""
+Recompute the InfoDesk dashboard counters from scratch.
+
+The counters are adjusted incrementally by the InfoDesk views and recounted
+automatically every DASHBOARD_COUNTERS_RECONCILE_SECONDS; run this after
+bulk imports or direct database edits to correct them at once. Counters that
+had drifted are reported.
+
+Usage: python manage.py reconcile_dashboard_counters
+"""
+from django.core.management.base import BaseCommand
+
+from SkaRe import dashboard_counters
+from SkaRe.models import DashboardCounters
+
+COUNTERS = ['unconfirmed_entities', 'arrived', 'expected', 'not_coming', 'on_water']
+
+
+class Command(BaseCommand):
+    help = 'Recompute the InfoDesk dashboard counters'
+
+    def handle(self, *args, **options):
+        before = DashboardCounters.objects.filter(pk=DashboardCounters.singleton_instance_id).first()
+        after = dashboard_counters.reconcile()
+        for name in COUNTERS:
+            value = getattr(after, name)
+            if before is not None and getattr(before, name) != value:
+                self.stdout.write(f'{name}: {getattr(before, name)} -> {value}')
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{name}={getattr(after, name)}' for name in COUNTERS)
+        ))
@@ -0,0 +1,371 @@
+"""
+Replay historical sail ticket traffic against the RFID scan API as a capacity benchmark.
+
+Scans are reconstructed from SailTicketLog (departures from on_water entries,
+arrivals from ashore entries, duplicate scans from their notes) and sent in
+their original rhythm, compressed by --speedup, by N simulated readers. Each
+ticket always goes through the same reader, so its scans stay in order.
+
+By default the scans go through the Django test client into a throwaway
+test database (a temporary SQLite file, created with migrations and seeded
+with the replayed tickets), so the configured database is never written to.
+With --url they are posted to a running server instead; its tickets must
+match the replayed UIDs (e.g. a copy of the source database).
+
+Usage:
+    python manage.py replay_rfid_traffic [--source db.sqlite3] [--speedup 60] [--readers 4]
+    python manage.py replay_rfid_traffic --url https://plachtis.example/ --api-key KEY
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from SkaRe import rfid_rate_limit
+
+REPLAY_API_KEY = 'replay'
+_DUPLICATE_NOTE = 'Duplicate scan on '
+
+
+def _module_for(status, note):
+    """Return the module a log entry was scanned on, or None if it was not a scan."""
+    if note.startswith(_DUPLICATE_NOTE):
+        return note[len(_DUPLICATE_NOTE):].split()[0]
+    if note:
+        return None
+    return {'on_water': 'departure', 'ashore': 'arrival'}.get(status)
+
+
+def build_events(entries, tickets, include_manual=False):
+    """Turn log entries into scan events.
+
+    ``entries`` are dicts with ticket_id, status, changed_at, note and
+    changed_by (as loaded by ``analysis/ticket_analysis.py``), in chronological
+    order; ``tickets`` maps ticket_id to a dict with code and rfid_uid.
+    Entries made by a user at InfoDesk are skipped unless ``include_manual``.
+
+    Returns a list of dicts with offset (seconds since the first scan),
+    ticket_id, module_id and rfid_uid.
+    """
+    events = []
+    start = None
+    for entry in entries:
+        if entry['changed_by'] and not include_manual:
+            continue
+        module_id = _module_for(entry['status'], entry['note'] or '')
+        if module_id is None:
+            continue
+        start = start or entry['changed_at']
+        ticket = tickets.get(entry['ticket_id'], {})
+        events.append({
+            'offset': (entry['changed_at'] - start).total_seconds(),
+            'ticket_id': entry['ticket_id'],
+            'module_id': module_id,
+            'rfid_uid': ticket.get('rfid_uid') or f"REPLAY-{entry['ticket_id']}",
+        })
+    return events
+
+
+def load_from_sqlite(path):
+    """Load (entries, tickets) from a PlachtIS SQLite database file."""
+    if not os.path.exists(path):
+        raise CommandError(f'Database not found: {path}')
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        tickets = {
+            r['id']: dict(r)
+            for r in conn.execute('SELECT id, code, rfid_uid FROM SkaRe_sailticket')
+        }
+        entries = []
+        for r in conn.execute("""
+            SELECT ticket_id, status, changed_at, note, changed_by_id AS changed_by
+            FROM SkaRe_sailticketlog
+            ORDER BY changed_at ASC, id ASC
+        """):
+            d = dict(r)
+            d['changed_at'] = datetime.fromisoformat(d['changed_at']).replace(tzinfo=timezone.utc)
+            entries.append(d)
+    finally:
+        conn.close()
+    return entries, tickets
+
+
+def load_from_database():
+    """Load (entries, tickets) from the configured database."""
+    from SkaRe.models import SailTicket, SailTicketLog
+    tickets = {
+        t['id']: t for t in SailTicket.objects.values('id', 'code', 'rfid_uid')
+    }
+    entries = []
+    for entry in SailTicketLog.objects.order_by('changed_at', 'id').values(
+        'ticket_id', 'status', 'changed_at', 'note', 'changed_by_id',
+    ):
+        entry['changed_by'] = entry.pop('changed_by_id')
+        entries.append(entry)
+    return entries, tickets
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list (None when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def replay(events, send, readers=1, speedup=1.0):
+    """Send ``events`` through ``send(event) -> outcome`` on ``readers`` threads.
+
+    Each event is sent at ``offset / speedup`` seconds after the start, or as
+    soon as its reader is free if it is late. Returns (results, wall_seconds),
+    results being dicts with outcome, latency (seconds) and lag (seconds late).
+    """
+    queues = [[] for _ in range(readers)]
+    for event in events:
+        queues[event['ticket_id'] % readers].append(event)
+    results = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def run(queue):
+        try:
+            for event in queue:
+                due = started + event['offset'] / speedup
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                sent = time.perf_counter()
+                outcome = send(event)
+                result = {
+                    'outcome': outcome,
+                    'latency': time.perf_counter() - sent,
+                    'lag': max(0.0, sent - due),
+                }
+                with lock:
+                    results.append(result)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(q,)) for q in queues if q]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def _outcome(data):
+    return data.get('result') if data.get('result') == 'ok' else data.get('error', 'error')
+
+
+def client_sender():
+    """Return a ``send`` function posting through the Django test client."""
+    from django.test import Client
+    from django.urls import reverse
+    url = reverse('SkaRe:rfid_scan')
+    local = threading.local()
+
+    def send(event):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client()
+        try:
+            response = client.post(
+                url,
+                data=json.dumps({'module_id': event['module_id'], 'rfid_uid': event['rfid_uid']}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {REPLAY_API_KEY}',
+            )
+        except OperationalError as e:
+            return 'lock' if 'locked' in str(e) else 'db_error'
+        if response.status_code != 200:
+            return f'http_{response.status_code}'
+        return _outcome(response.json())
+    return send
+
+
+def replay_settings():
+    """Settings for replaying through the test client.
+
+    The replay API key, a private in-memory cache (the configured one may be
+    the live server's file cache, whose reader state, debounce windows and
+    UID index a replay must not touch), and no rate limits: they would turn
+    the benchmark into a throttling test.
+    """
+    from django.test.utils import override_settings
+    return override_settings(
+        RFID_API_KEY=REPLAY_API_KEY,
+        ALLOWED_HOSTS=['testserver'],
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'replay',
+        }},
+        RFID_RATE_LIMIT_KEY=(0, 0),
+        RFID_RATE_LIMIT_MODULE=(0, 0),
+    )
+
+
+def url_sender(base_url, api_key, timeout):
+    """Return a ``send`` function posting to a live server."""
+    url = base_url.rstrip('/') + '/api/rfid/scan/'
+
+    def send(event):
+        request = urllib.request.Request(
+            url,
+            data=json.dumps({'module_id': event['module_id'], 'rfid_uid': event['rfid_uid']}).encode(),
+            headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {api_key}'},
+            method='POST',
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return _outcome(json.loads(response.read()))
+        except urllib.error.HTTPError as e:
+            return f'http_{e.code}'
+        except (socket.timeout, TimeoutError):
+            return 'timeout'
+        except urllib.error.URLError as e:
+            return 'timeout' if isinstance(e.reason, (socket.timeout, TimeoutError)) else 'connection_error'
+    return send
+
+
+def seed_replay_tickets(events):
+    """Create a boat and a ticket for every replayed card in the (test) database.
+
+    Each ticket starts in the state preceding its first replayed scan.
+    """
+    from django.contrib.auth.models import User
+    from SkaRe.models import Boat, SailTicket
+    owner = User.objects.create_user(username='replay')
+    first = {}
+    for event in events:
+        first.setdefault(event['ticket_id'], event)
+    boats = Boat.objects.bulk_create([
+        Boat(created_by=owner, name=f'Replay {tid}', hull_color='white',
+             contact_person='Replay', contact_phone='000000000')
+        for tid in first
+    ])
+    SailTicket.objects.bulk_create([
+        SailTicket(
+            code=f'REPLAY-{tid}',
+            color=SailTicket.Color.OTHER,
+            rfid_uid=event['rfid_uid'],
+            boat=boat,
+            status=(SailTicket.Status.ON_WATER if event['module_id'] == 'arrival'
+                    else SailTicket.Status.ASHORE),
+        )
+        for (tid, event), boat in zip(first.items(), boats)
+    ])
+
+
+class Command(BaseCommand):
+    help = 'Replay historical SailTicketLog traffic against the RFID scan API and report capacity'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            help='PlachtIS SQLite file to read the log from (default: the configured database)',
+        )
+        parser.add_argument('--url', help='Base URL of a running server to replay against')
+        parser.add_argument('--api-key', help='RFID API key for --url (default: RFID_API_KEY)')
+        parser.add_argument('--speedup', type=float, default=60.0, help='Time compression factor (default: 60)')
+        parser.add_argument('--readers', type=int, default=4, help='Number of simulated concurrent readers (default: 4)')
+        parser.add_argument('--limit', type=int, help='Replay only the first N scans')
+        parser.add_argument('--timeout', type=float, default=10.0, help='Request timeout for --url in seconds (default: 10)')
+        parser.add_argument(
+            '--include-manual',
+            action='store_true',
+            help='Also replay status changes made by InfoDesk users',
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+        if options['speedup'] <= 0 or options['readers'] < 1:
+            raise CommandError('--speedup must be positive and --readers at least 1')
+
+        if options['source']:
+            entries, tickets = load_from_sqlite(options['source'])
+        else:
+            entries, tickets = load_from_database()
+        events = build_events(entries, tickets, include_manual=options['include_manual'])
+        if options['limit']:
+            events = events[:options['limit']]
+        if not events:
+            raise CommandError('No scans to replay')
+        span = events[-1]['offset']
+        self.stdout.write(
+            f"Replaying {len(events)} scans spanning {span / 60:.1f} min "
+            f"at {options['speedup']:g}x with {options['readers']} readers..."
+        )
+
+        if options['url']:
+            api_key = options['api_key'] or settings.RFID_API_KEY
+            if not api_key:
+                raise CommandError('No API key: pass --api-key or set RFID_API_KEY')
+            send = url_sender(options['url'], api_key, options['timeout'])
+            results, wall = replay(events, send, options['readers'], options['speedup'])
+        else:
+            results, wall = self._replay_in_test_database(events, options)
+        self._report(results, wall)
+
+    def _replay_in_test_database(self, events, options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Replay through the test client needs SQLite; use --url instead')
+        tmpdir = tempfile.mkdtemp(prefix='plachtis-replay-')
+        old_name = connection.settings_dict['NAME']
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(tmpdir, 'replay.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        # Failed requests (e.g. lock errors) are counted, not logged one by one
+        request_logger = logging.getLogger('django.request')
+        request_log_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        rfid_rate_limit.reset()
+        try:
+            with replay_settings():
+                cache.clear()
+                seed_replay_tickets(events)
+                return replay(events, client_sender(), options['readers'], options['speedup'])
+        finally:
+            rfid_rate_limit.reset()
+            request_logger.setLevel(request_log_level)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            os.rmdir(tmpdir)
+
+    def _report(self, results, wall):
+        latencies = sorted(r['latency'] * 1000 for r in results)
+        outcomes = Counter(r['outcome'] for r in results)
+        failures = sum(
+            n for outcome, n in outcomes.items()
+            if outcome in ('lock', 'timeout', 'db_error', 'connection_error')
+            or outcome.startswith('http_')
+        )
+        self.stdout.write(f'Scans:       {len(results)} in {wall:.2f} s')
+        self.stdout.write(f'Throughput:  {len(results) / wall:.1f} scans/s')
+        self.stdout.write(
+            'Latency:     p50 {:.1f} ms, p95 {:.1f} ms, p99 {:.1f} ms, max {:.1f} ms'.format(
+                percentile(latencies, 50), percentile(latencies, 95),
+                percentile(latencies, 99), latencies[-1],
+            )
+        )
+        self.stdout.write(f"Max lag:     {max(r['lag'] for r in results) * 1000:.1f} ms behind schedule")
+        self.stdout.write('Outcomes:')
+        for outcome, n in outcomes.most_common():
+            self.stdout.write(f'  {outcome:<20} {n}')
+        if failures:
+            self.stdout.write(self.style.ERROR(
+                f"Failures:    {failures} (lock {outcomes['lock']}, timeout {outcomes['timeout']})"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Failures:    none'))
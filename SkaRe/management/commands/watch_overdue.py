@@ -0,0 +1,62 @@
+"""
+Watch for boats that stay on water longer than their class allows.
+
+Every --interval seconds the overdue boats are evaluated with one indexed
+query and published in the cache for the InfoDesk alert page and its JSON
+feed. Boats becoming overdue or coming back are reported on stdout. The web
+workers only see the published result when they share the cache with this
+process (CACHE_DIR); otherwise they evaluate on each request.
+
+Usage: python manage.py watch_overdue [--interval 5] [--once]
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.timezone import localtime, now
+
+from SkaRe import overdue
+
+
+class Command(BaseCommand):
+    help = 'Flag boats on water longer than their class threshold'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.OVERDUE_CHECK_INTERVAL,
+            help='Seconds between evaluations (default: OVERDUE_CHECK_INTERVAL)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Evaluate once and exit',
+        )
+
+    def handle(self, *args, **options):
+        flagged = set()
+        while True:
+            flagged = self.check(flagged)
+            if options['once']:
+                return
+            close_old_connections()
+            time.sleep(options['interval'])
+
+    def check(self, flagged):
+        """Evaluate and publish; report changes against ``flagged`` ticket IDs."""
+        at = now()
+        boats = overdue.find_overdue(at)
+        overdue.publish(boats, at)
+        current = {boat['ticket_id'] for boat in boats}
+        stamp = localtime(at).strftime('%H:%M:%S')
+        for boat in boats:
+            if boat['ticket_id'] not in flagged:
+                self.stdout.write(self.style.WARNING(
+                    f"{stamp} OVERDUE {boat['ticket_code']} {boat['boat']}: "
+                    f"{boat['minutes_out']} min on water (limit {boat['limit_minutes']})"
+                ))
+        for ticket_id in flagged - current:
+            self.stdout.write(f'{stamp} cleared ticket #{ticket_id}')
+        return current
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-17 00:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0033_crew_add_sk_mss_categories'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sailticketlog',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
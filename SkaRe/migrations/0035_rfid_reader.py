@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-17 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0034_sailticketlog_changed_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RfidReader',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module_id', models.CharField(max_length=50, unique=True)),
+                ('label', models.CharField(blank=True, max_length=100, verbose_name='Label')),
+                ('last_heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('last_scan_at', models.DateTimeField(blank=True, null=True)),
+                ('scans', models.PositiveBigIntegerField(default=0)),
+                ('ok_count', models.PositiveBigIntegerField(default=0)),
+                ('unknown_card_count', models.PositiveBigIntegerField(default=0)),
+                ('lost_count', models.PositiveBigIntegerField(default=0)),
+                ('no_boat_count', models.PositiveBigIntegerField(default=0)),
+                ('duplicate_count', models.PositiveBigIntegerField(default=0)),
+                ('other_error_count', models.PositiveBigIntegerField(default=0)),
+                ('latency_total_ms', models.FloatField(default=0)),
+                ('latency_max_ms', models.FloatField(default=0)),
+            ],
+            options={
+                'ordering': ['module_id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RfidReaderMinute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minute', models.DateTimeField()),
+                ('scans', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('latency_total_ms', models.FloatField(default=0)),
+                ('latency_max_ms', models.FloatField(default=0)),
+                ('reader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='minutes', to='SkaRe.rfidreader')),
+            ],
+            options={
+                'ordering': ['-minute'],
+                'unique_together': {('reader', 'minute')},
+            },
+        ),
+    ]
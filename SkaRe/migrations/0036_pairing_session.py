@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0035_rfid_reader'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PairingSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module_id', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PairingSessionItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('paired_at', models.DateTimeField(blank=True, null=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='SkaRe.pairingsession')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pairing_items', to='SkaRe.sailticket')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pairingsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('closed_at__isnull', True)), fields=('module_id',), name='unique_open_pairing_session_per_module'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='pairingsessionitem',
+            unique_together={('session', 'position')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0036_pairing_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rfidreader',
+            name='throttled_count',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0037_rfid_reader_throttled_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('departed_at', models.DateTimeField()),
+                ('returned_at', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.DurationField(blank=True, null=True)),
+                ('departure_module', models.CharField(blank=True, max_length=50)),
+                ('arrival_module', models.CharField(blank=True, max_length=50)),
+                ('boat', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips', to='SkaRe.boat')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trips', to='SkaRe.sailticket')),
+            ],
+            options={
+                'ordering': ['-departed_at'],
+                'indexes': [models.Index(fields=['returned_at', 'departed_at'], name='SkaRe_trip_returne_ad7eae_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('returned_at__isnull', True)), fields=('ticket',), name='unique_open_trip_per_ticket')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def set_on_water_since(apps, schema_editor):
+    """Take the departure time of tickets already on water from their open trip."""
+    SailTicket = apps.get_model('SkaRe', 'SailTicket')
+    Trip = apps.get_model('SkaRe', 'Trip')
+    open_trip = Trip.objects.filter(
+        ticket=OuterRef('pk'), returned_at__isnull=True,
+    ).values('departed_at')[:1]
+    on_water = SailTicket.objects.filter(status='on_water')
+    on_water.update(on_water_since=Subquery(open_trip))
+    # No trip recorded yet (trips not backfilled): best known time of the change
+    on_water.filter(on_water_since__isnull=True).update(on_water_since=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0038_trip'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='boatclass',
+            name='max_on_water_minutes',
+            field=models.PositiveIntegerField(blank=True, help_text='Boats of this class on water longer than this are flagged as overdue. Empty uses the default.', null=True, verbose_name='Max. time on water (minutes)'),
+        ),
+        migrations.AddField(
+            model_name='sailticket',
+            name='on_water_since',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(set_on_water_since, migrations.RunPython.noop),
+    ]
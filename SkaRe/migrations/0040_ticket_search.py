@@ -0,0 +1,80 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:40
+
+from django.db import migrations
+
+# Search row of the ticket ``{t}`` and its boat (if any). ``compact`` holds
+# the code and sail number without separators, and the ticket number after
+# the dash without leading zeros, so that "42" finds "P550-042".
+_ROW = """
+    SELECT {t}.id, {t}.code, b.name, b.sail_number, b.contact_person,
+           replace(replace(replace({t}.code, '-', ''), ' ', ''), '/', '') || ' ' ||
+           replace(replace(replace(coalesce(b.sail_number, ''), '-', ''), ' ', ''), '/', '') || ' ' ||
+           ltrim(substr({t}.code, instr({t}.code, '-') + 1), '0')
+    FROM SkaRe_sailticket AS {t} LEFT JOIN SkaRe_boat AS b ON b.id = {t}.boat_id
+"""
+
+_INSERT = 'INSERT INTO SkaRe_ticket_search (rowid, code, boat_name, sail_number, contact_person, compact)'
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE SkaRe_ticket_search USING fts5(
+        code, boat_name, sail_number, contact_person, compact,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '1 2 3'
+    )
+    """,
+    _INSERT + _ROW.format(t='t'),
+    f"""
+    CREATE TRIGGER SkaRe_ticket_search_ticket_insert AFTER INSERT ON SkaRe_sailticket BEGIN
+        {_INSERT} {_ROW.format(t='t')} WHERE t.id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER SkaRe_ticket_search_ticket_update AFTER UPDATE OF code, boat_id ON SkaRe_sailticket BEGIN
+        DELETE FROM SkaRe_ticket_search WHERE rowid = old.id;
+        {_INSERT} {_ROW.format(t='t')} WHERE t.id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER SkaRe_ticket_search_ticket_delete AFTER DELETE ON SkaRe_sailticket BEGIN
+        DELETE FROM SkaRe_ticket_search WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER SkaRe_ticket_search_boat_update
+    AFTER UPDATE OF name, sail_number, contact_person ON SkaRe_boat BEGIN
+        DELETE FROM SkaRe_ticket_search
+        WHERE rowid IN (SELECT id FROM SkaRe_sailticket WHERE boat_id = new.id);
+        {_INSERT} {_ROW.format(t='t')} WHERE t.boat_id = new.id;
+    END
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS SkaRe_ticket_search_boat_update',
+    'DROP TRIGGER IF EXISTS SkaRe_ticket_search_ticket_delete',
+    'DROP TRIGGER IF EXISTS SkaRe_ticket_search_ticket_update',
+    'DROP TRIGGER IF EXISTS SkaRe_ticket_search_ticket_insert',
+    'DROP TABLE IF EXISTS SkaRe_ticket_search',
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # FTS5 is SQLite only; SkaRe.ticket_search falls back to LIKE elsewhere
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0039_on_water_since'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
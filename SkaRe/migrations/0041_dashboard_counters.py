@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0040_ticket_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unconfirmed_entities', models.IntegerField(default=0)),
+                ('arrived', models.IntegerField(default=0)),
+                ('expected', models.IntegerField(default=0)),
+                ('not_coming', models.IntegerField(default=0)),
+                ('on_water', models.IntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Dashboard counters',
+                'verbose_name_plural': 'Dashboard counters',
+            },
+        ),
+    ]
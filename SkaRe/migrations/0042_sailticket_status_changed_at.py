@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+def set_status_changed_at(apps, schema_editor):
+    """Take the time of the last status change of existing tickets from their log.
+
+    As when trips are rebuilt, only entries whose status differs from the
+    previous entry count: duplicate scans and boat assignment notes repeat
+    the status and are skipped.
+    """
+    SailTicket = apps.get_model('SkaRe', 'SailTicket')
+    SailTicketLog = apps.get_model('SkaRe', 'SailTicketLog')
+    entries = (
+        SailTicketLog.objects.order_by('ticket_id', 'changed_at', 'pk')
+        .values_list('ticket_id', 'status', 'changed_at')
+    )
+    previous = {}
+    last_change = {}
+    for ticket_id, status, changed_at in entries.iterator():
+        if previous.get(ticket_id) == status:
+            continue
+        previous[ticket_id] = status
+        last_change[ticket_id] = changed_at
+    tickets = list(SailTicket.objects.filter(pk__in=last_change).only('pk'))
+    for ticket in tickets:
+        ticket.status_changed_at = last_change[ticket.pk]
+    SailTicket.objects.bulk_update(tickets, ['status_changed_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SkaRe', '0041_dashboard_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sailticket',
+            name='status_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(set_status_changed_at, migrations.RunPython.noop),
+    ]
@@ -10,4 +10,6 @@ from .registration import (
 )
 from .boats import BoatClass, Boat, Crew, CrewMember
 from .attendance import AttendanceLog
-from .tickets import SailTicket, SailTicketLog
+from .tickets import SailTicket, SailTicketLog, Trip
+from .rfid import RfidReader, RfidReaderMinute, PairingSession, PairingSessionItem
+from .dashboard import DashboardCounters
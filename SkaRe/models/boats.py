@@ -25,6 +25,12 @@ class BoatClass(models.Model):
         help_text=_("Controls display order in dropdowns."),
         verbose_name=_("Order"),
     )
+    max_on_water_minutes = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text=_("Boats of this class on water longer than this are flagged as overdue. Empty uses the default."),
+        verbose_name=_("Max. time on water (minutes)"),
+    )
 
     class Meta:
         ordering = ['order', 'name']
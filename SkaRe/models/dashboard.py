@@ -0,0 +1,25 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from solo.models import SingletonModel
+
+
+class DashboardCounters(SingletonModel):
+    """Counts shown on the InfoDesk dashboard, kept up to date incrementally.
+
+    Maintained by SkaRe.dashboard_counters; ``reconciled_at`` is the last
+    time they were recomputed from scratch.
+    """
+
+    unconfirmed_entities = models.IntegerField(default=0)
+    arrived = models.IntegerField(default=0)
+    expected = models.IntegerField(default=0)
+    not_coming = models.IntegerField(default=0)
+    on_water = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Dashboard counters')
+        verbose_name_plural = _('Dashboard counters')
+
+    def __str__(self):
+        return 'Dashboard counters'
@@ -0,0 +1,111 @@
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from .tickets import SailTicket
+
+
+class RfidReader(models.Model):
+    """A gate reader, identified by the module_id it reports to the RFID API.
+
+    Rows are created on the first flush of telemetry for a module. Counters
+    are running totals; recent throughput lives in RfidReaderMinute.
+    """
+
+    module_id = models.CharField(max_length=50, unique=True)
+    label = models.CharField(_('Label'), max_length=100, blank=True)
+    last_heartbeat_at = models.DateTimeField(null=True, blank=True)
+    last_scan_at = models.DateTimeField(null=True, blank=True)
+    scans = models.PositiveBigIntegerField(default=0)
+    ok_count = models.PositiveBigIntegerField(default=0)
+    unknown_card_count = models.PositiveBigIntegerField(default=0)
+    lost_count = models.PositiveBigIntegerField(default=0)
+    no_boat_count = models.PositiveBigIntegerField(default=0)
+    duplicate_count = models.PositiveBigIntegerField(default=0)
+    other_error_count = models.PositiveBigIntegerField(default=0)
+    throttled_count = models.PositiveBigIntegerField(default=0)
+    latency_total_ms = models.FloatField(default=0)
+    latency_max_ms = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['module_id']
+
+    def __str__(self):
+        return self.label or self.module_id
+
+
+class RfidReaderMinute(models.Model):
+    """Scan throughput and latency of one reader within one minute."""
+
+    reader = models.ForeignKey(
+        RfidReader,
+        on_delete=models.CASCADE,
+        related_name='minutes',
+    )
+    minute = models.DateTimeField()
+    scans = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    latency_total_ms = models.FloatField(default=0)
+    latency_max_ms = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['-minute']
+        unique_together = ('reader', 'minute')
+
+    def __str__(self):
+        return f'{self.reader} @ {self.minute:%H:%M}'
+
+
+class PairingSession(models.Model):
+    """An ordered queue of tickets paired to cards scanned on one reader module.
+
+    While the session is open every scan on ``module_id`` pairs the card with
+    the next unpaired ticket. Sessions on different modules run in parallel.
+    """
+
+    module_id = models.CharField(max_length=50)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # At most one open session per reader module
+            models.UniqueConstraint(
+                fields=['module_id'],
+                condition=models.Q(closed_at__isnull=True),
+                name='unique_open_pairing_session_per_module',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.module_id} ({self.created_at:%Y-%m-%d %H:%M})'
+
+
+class PairingSessionItem(models.Model):
+    """A ticket queued in a pairing session at ``position``."""
+
+    session = models.ForeignKey(
+        PairingSession,
+        on_delete=models.CASCADE,
+        related_name='items',
+    )
+    ticket = models.ForeignKey(
+        SailTicket,
+        on_delete=models.CASCADE,
+        related_name='pairing_items',
+    )
+    position = models.PositiveIntegerField()
+    paired_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['position']
+        unique_together = ('session', 'position')
+
+    def __str__(self):
+        return f'{self.session.module_id} #{self.position}: {self.ticket.code}'
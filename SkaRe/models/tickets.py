@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from .boats import Boat
 
@@ -34,6 +35,11 @@ class SailTicket(models.Model):
         default=Status.ASHORE,
     )
     pending_pairing = models.BooleanField(default=False)
+    # Departure time of the current trip; null while not on water
+    on_water_since = models.DateTimeField(null=True, blank=True, db_index=True)
+    # When the current status was reached (scan time for gate scans); late
+    # batched scans older than this are logged but not applied
+    status_changed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -53,7 +59,8 @@ class SailTicketLog(models.Model):
         related_name='logs',
     )
     status = models.CharField(max_length=20, choices=SailTicket.Status.choices)
-    changed_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: batched RFID scans carry the time the card was read.
+    changed_at = models.DateTimeField(default=timezone.now)
     changed_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -67,3 +74,48 @@ class SailTicketLog(models.Model):
 
     def __str__(self):
         return f'{self.ticket.code} → {self.status} at {self.changed_at}'
+
+
+class Trip(models.Model):
+    """One departure of a sail ticket and its return.
+
+    Opened when the ticket goes on water and closed when it comes ashore or
+    is marked lost, in the same transaction as the status change. A trip with
+    ``returned_at`` unset is still out.
+    """
+
+    ticket = models.ForeignKey(
+        SailTicket,
+        on_delete=models.CASCADE,
+        related_name='trips',
+    )
+    boat = models.ForeignKey(
+        Boat,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='trips',
+    )
+    departed_at = models.DateTimeField()
+    returned_at = models.DateTimeField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True)
+    # Reader module_id; blank when the status was changed at the InfoDesk
+    departure_module = models.CharField(max_length=50, blank=True)
+    arrival_module = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        ordering = ['-departed_at']
+        indexes = [
+            models.Index(fields=['returned_at', 'departed_at']),
+        ]
+        constraints = [
+            # At most one trip still out per ticket
+            models.UniqueConstraint(
+                fields=['ticket'],
+                condition=models.Q(returned_at__isnull=True),
+                name='unique_open_trip_per_ticket',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.ticket.code} {self.departed_at:%Y-%m-%d %H:%M}'
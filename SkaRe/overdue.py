@@ -0,0 +1,86 @@
+"""Detection of boats that have been on water longer than their class allows.
+
+Each boat class may set ``max_on_water_minutes``; boats without a class or
+threshold use ``OVERDUE_DEFAULT_MINUTES``. ``find_overdue`` is one range scan
+of the ``SailTicket.on_water_since`` index: only tickets out longer than the
+smallest threshold are read, and the exact per-class limit is checked on that
+short list. The ``watch_overdue`` command evaluates it every few seconds and
+publishes the result in the cache, where the InfoDesk alert page and the JSON
+feed pick it up.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from .models import BoatClass, SailTicket
+
+_THRESHOLDS_KEY = 'overdue:thresholds'
+_SNAPSHOT_KEY = 'overdue:snapshot'
+
+
+def thresholds():
+    """Per-class limits in minutes, ``{boat_class_id: minutes}``; cached briefly."""
+    limits = cache.get(_THRESHOLDS_KEY)
+    if limits is None:
+        limits = dict(
+            BoatClass.objects.filter(max_on_water_minutes__isnull=False)
+            .values_list('pk', 'max_on_water_minutes')
+        )
+        cache.set(_THRESHOLDS_KEY, limits, settings.OVERDUE_THRESHOLD_CACHE_SECONDS)
+    return limits
+
+
+def find_overdue(at=None):
+    """Return the overdue boats as dicts, longest out first."""
+    at = at or now()
+    limits = thresholds()
+    default = settings.OVERDUE_DEFAULT_MINUTES
+    cutoff = at - timedelta(minutes=min([default, *limits.values()]))
+    candidates = (
+        SailTicket.objects.filter(on_water_since__lt=cutoff)
+        .select_related('boat', 'boat__boat_class')
+        .order_by('on_water_since')
+    )
+    overdue = []
+    for ticket in candidates:
+        boat = ticket.boat
+        limit = limits.get(boat.boat_class_id, default) if boat else default
+        minutes_out = int((at - ticket.on_water_since).total_seconds() // 60)
+        if minutes_out < limit:
+            continue
+        overdue.append({
+            'ticket_id': ticket.pk,
+            'ticket_code': ticket.code,
+            'boat': boat.name if boat else '',
+            'sail_number': boat.sail_number if boat else '',
+            'boat_class': boat.boat_class.name if boat and boat.boat_class else '',
+            'contact_person': boat.contact_person if boat else '',
+            'contact_phone': boat.contact_phone if boat else '',
+            'on_water_since': ticket.on_water_since,
+            'minutes_out': minutes_out,
+            'limit_minutes': limit,
+        })
+    return overdue
+
+
+def publish(overdue, at):
+    """Store a watchdog evaluation for the alert page and feed."""
+    cache.set(
+        _SNAPSHOT_KEY,
+        {'evaluated_at': at, 'overdue': overdue},
+        settings.OVERDUE_CHECK_INTERVAL * 3,
+    )
+
+
+def current_overdue():
+    """The latest watchdog evaluation, or a fresh one when the watchdog is not running.
+
+    Returns ``(overdue, evaluated_at)``.
+    """
+    snapshot = cache.get(_SNAPSHOT_KEY)
+    if snapshot is not None:
+        return snapshot['overdue'], snapshot['evaluated_at']
+    at = now()
+    return find_overdue(at), at
@@ -0,0 +1,200 @@
+"""Cache-backed state for the RFID reader API hot path.
+
+The UID index maps ``rfid_uid`` to a small ticket entry (id, code, lost flag
+and the precomputed boat payload) so that scans of unknown, lost and
+boat-less cards are answered without touching the database. Entries live
+under a generation number; bumping the generation invalidates the whole index
+at once, which keeps invalidation cheap for the rare InfoDesk edits that
+change pairings or boat assignments, and for boat edits (signal handlers
+connected in ``connect_signals``).
+
+The reader state document is what ``rfid_alive`` reports (mode, counts,
+pairing ticket). It is tagged with a version that every ticket transition and
+pairing change bumps, so readers can poll with ``If-None-Match``.
+
+Recent scan responses are kept by client ``scan_id`` so that a reader retrying
+a scan whose response was lost gets the original answer back, and by
+(module, UID) so that a burst of reads from a card held near the antenna is
+answered without database writes.
+
+Everything is stored in the default Django cache, so it is shared by
+all workers whenever the configured cache backend is.
+"""
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+_GENERATION_KEY = 'rfid:index:generation'
+
+
+def _seed():
+    """Return a starting value that is larger than any previously used one.
+
+    Milliseconds since the epoch keep counters monotonic even if the cache
+    loses the key (restart, eviction) while older entries survive.
+    """
+    return int(time.time() * 1000)
+
+
+def _generation():
+    generation = cache.get(_GENERATION_KEY)
+    if generation is None:
+        cache.add(_GENERATION_KEY, _seed(), None)
+        generation = cache.get(_GENERATION_KEY)
+    return generation
+
+
+def invalidate_rfid_index():
+    """Drop every cached index entry (UID lookups and pending pairing)."""
+    try:
+        cache.incr(_GENERATION_KEY)
+    except ValueError:
+        cache.set(_GENERATION_KEY, _seed(), None)
+
+
+def _boat_changed(sender, instance, created=False, raw=False, **kwargs):
+    # A new boat has no tickets yet; anything else may change cached payloads
+    if not created and not raw:
+        transaction.on_commit(invalidate_rfid_index)
+
+
+def connect_signals():
+    """Invalidate the index when a boat or boat class shown to readers changes.
+
+    Covers every edit path (owner pages, InfoDesk, the admin). The index is
+    dropped after the commit, so it is never refilled from the old data.
+    """
+    from .models import Boat, BoatClass
+    for model in (Boat, BoatClass):
+        post_save.connect(_boat_changed, sender=model)
+        post_delete.connect(_boat_changed, sender=model)
+
+
+def cached_index_value(name, loader):
+    """Return the index value stored under ``name``, calling ``loader`` on a miss.
+
+    ``loader`` must not return None. The generation is read before loading, so
+    a value loaded while an invalidation happens is stored under the old
+    generation and never served.
+    """
+    key = f'rfid:index:{_generation()}:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, value, settings.RFID_INDEX_TTL)
+    return value
+
+
+_STATE_VERSION_KEY = 'rfid:state:version'
+_STATE_KEY = 'rfid:state'
+
+
+def reader_state_version():
+    """Return the current reader state version (monotonically increasing)."""
+    version = cache.get(_STATE_VERSION_KEY)
+    if version is None:
+        cache.add(_STATE_VERSION_KEY, _seed(), None)
+        version = cache.get(_STATE_VERSION_KEY)
+    return version
+
+
+def bump_reader_state():
+    """Mark the reader state as changed.
+
+    Call through ``transaction.on_commit`` so the state is never recomputed
+    from data that is not yet committed.
+    """
+    try:
+        cache.incr(_STATE_VERSION_KEY)
+    except ValueError:
+        cache.set(_STATE_VERSION_KEY, _seed(), None)
+
+
+def cached_reader_state(loader):
+    """Return the reader state document, recomputing it with ``loader`` when stale.
+
+    The returned dict carries the ``version`` it was computed for.
+    """
+    version = reader_state_version()
+    state = cache.get(_STATE_KEY)
+    if state is None or state['version'] != version:
+        state = loader()
+        state['version'] = version
+        cache.set(_STATE_KEY, state, None)
+    return state
+
+
+def _scan_key(module_id, scan_id):
+    return f'rfid:scan:{module_id}:{scan_id}'
+
+
+def get_scan_response(module_id, scan_id):
+    """Return the response already sent for ``scan_id``, or None."""
+    return cache.get(_scan_key(module_id, scan_id))
+
+
+def remember_scan_response(module_id, scan_id, data):
+    """Store the response for ``scan_id`` for ``RFID_SCAN_DEDUP_WINDOW`` seconds.
+
+    Entries expire after the window and are culled with the rest of the cache
+    when it reaches ``MAX_ENTRIES``, which keeps the dedup store bounded.
+    """
+    cache.set(_scan_key(module_id, scan_id), data, settings.RFID_SCAN_DEDUP_WINDOW)
+
+
+def _debounce_key(module_id, rfid_uid):
+    # Scoped to the index generation: a pairing or assignment change ends
+    # every debounce window.
+    return f'rfid:debounce:{_generation()}:{module_id}:{rfid_uid}'
+
+
+def get_debounced_response(module_id, rfid_uid, scanned_at, pending=None):
+    """Return the previous answer if this read falls inside the debounce window.
+
+    The window is fixed from the first answered read; it is not extended by
+    repeats, so a card held at the antenna produces at most one logged
+    duplicate per window. ``pending`` holds the windows opened and closed by
+    the current transaction, which are not in the cache yet.
+    """
+    window = settings.RFID_SCAN_DEBOUNCE_SECONDS
+    if not window:
+        return None
+    key = _debounce_key(module_id, rfid_uid)
+    if pending is not None and key in pending:
+        entry = pending[key]
+    else:
+        entry = cache.get(key)
+    if entry is None:
+        return None
+    if 0 <= scanned_at.timestamp() - entry['at'] < window:
+        return entry['data']
+    return None
+
+
+def remember_debounced_response(module_id, rfid_uid, scanned_at, data, pending=None):
+    """Open a debounce window for (module, UID) starting at ``scanned_at``.
+
+    The window is stored once the transaction commits, so a retry of a scan
+    that was rolled back is processed again; pass ``pending`` to see it
+    within the same transaction.
+    """
+    window = settings.RFID_SCAN_DEBOUNCE_SECONDS
+    if window:
+        key = _debounce_key(module_id, rfid_uid)
+        entry = {'at': scanned_at.timestamp(), 'data': data}
+        if pending is not None:
+            pending[key] = entry
+        transaction.on_commit(partial(cache.set, key, entry, window))
+
+
+def clear_debounce(rfid_uid, module_ids, pending=None):
+    """Close the debounce windows of ``rfid_uid`` on ``module_ids`` once the
+    transaction commits."""
+    keys = [_debounce_key(m, rfid_uid) for m in module_ids]
+    if pending is not None:
+        pending.update(dict.fromkeys(keys))
+    transaction.on_commit(partial(cache.delete_many, keys))
@@ -0,0 +1,145 @@
+"""Bulk RFID pairing from a card supplier manifest (CSV of ticket code → rfid_uid).
+
+Used by the ``import_rfid_manifest`` management command and the InfoDesk
+upload. The manifest is validated against the existing tickets and the rule
+enforced by ``rfid_scan`` pairing (a UID belongs to at most one ticket), then
+applied with a single ``bulk_update`` in one transaction.
+"""
+import csv
+import io
+
+from django.db import transaction
+from django.utils.timezone import now
+from django.utils.translation import gettext as _
+
+from . import rfid_cache
+from .models import SailTicket, SailTicketLog
+
+_CODE_HEADERS = {'code', 'ticket', 'ticket_code'}
+_UID_HEADERS = {'rfid_uid', 'uid', 'rfid'}
+
+
+def decode_manifest(data):
+    """Decode an uploaded manifest: UTF-8 (with or without BOM), else Windows-1250."""
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('cp1250')
+
+
+def parse_manifest(text):
+    """Return ``[(line_number, code, rfid_uid), ...]`` from manifest CSV text.
+
+    Two columns, comma, semicolon or tab separated; an optional header row
+    naming the columns (e.g. ``code,rfid_uid``) is skipped. Blank lines are
+    ignored; missing values are kept as '' and reported by ``import_manifest``.
+    """
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    rows = []
+    for line_number, row in enumerate(csv.reader(io.StringIO(text), dialect), start=1):
+        cells = [cell.strip() for cell in row]
+        if not any(cells):
+            continue
+        cells += [''] * (2 - len(cells))
+        code, rfid_uid = cells[0], cells[1]
+        if not rows and code.lower() in _CODE_HEADERS and rfid_uid.lower() in _UID_HEADERS:
+            continue
+        rows.append((line_number, code, rfid_uid))
+    return rows
+
+
+def _conflict(line, code, rfid_uid, reason):
+    return {'line': line, 'code': code, 'rfid_uid': rfid_uid, 'reason': reason}
+
+
+def import_manifest(rows, user=None, replace=False, skip_conflicts=False, dry_run=False):
+    """Validate manifest ``rows`` (from :func:`parse_manifest`) and pair the tickets.
+
+    A row conflicts when its ticket does not exist, a value is missing, the
+    ticket or UID appears on another row, the ticket is already paired to a
+    different card (unless ``replace``), or the UID would end up on two
+    tickets. Nothing is saved when there is any conflict, unless
+    ``skip_conflicts`` is set, in which case the remaining rows are applied.
+
+    Returns a report dict: ``paired`` (tickets updated, or that would be with
+    ``dry_run``), ``unchanged`` (already paired to the same card),
+    ``conflicts`` (list of dicts with line, code, rfid_uid and reason) and
+    ``applied`` (whether changes were saved).
+    """
+    conflicts = []
+    code_lines, uid_lines = {}, {}
+    for line, code, rfid_uid in rows:
+        code_lines.setdefault(code, []).append(line)
+        uid_lines.setdefault(rfid_uid, []).append(line)
+
+    with transaction.atomic():
+        tickets = {
+            t.code: t
+            for t in SailTicket.objects.select_for_update().only('pk', 'code', 'rfid_uid', 'status')
+        }
+        candidates = []
+        for line, code, rfid_uid in rows:
+            if not code or not rfid_uid:
+                conflicts.append(_conflict(line, code, rfid_uid, _('Missing ticket code or UID')))
+            elif len(code_lines[code]) > 1:
+                conflicts.append(_conflict(line, code, rfid_uid, _('Ticket listed more than once')))
+            elif len(uid_lines[rfid_uid]) > 1:
+                conflicts.append(_conflict(line, code, rfid_uid, _('UID listed more than once')))
+            elif code not in tickets:
+                conflicts.append(_conflict(line, code, rfid_uid, _('Unknown ticket')))
+            elif tickets[code].rfid_uid and tickets[code].rfid_uid != rfid_uid and not replace:
+                conflicts.append(_conflict(
+                    line, code, rfid_uid,
+                    _('Ticket already paired to %(uid)s') % {'uid': tickets[code].rfid_uid},
+                ))
+            else:
+                candidates.append((line, tickets[code], rfid_uid))
+
+        # A UID may only stay on a ticket the manifest does not re-pair
+        repaired = {ticket.pk for _line, ticket, _uid in candidates}
+        owners = {
+            t.rfid_uid: t for t in tickets.values()
+            if t.rfid_uid and t.pk not in repaired
+        }
+        updates, unchanged = [], 0
+        for line, ticket, rfid_uid in candidates:
+            owner = owners.get(rfid_uid)
+            if owner is not None and owner.pk != ticket.pk:
+                conflicts.append(_conflict(
+                    line, ticket.code, rfid_uid,
+                    _('UID already paired to ticket %(code)s') % {'code': owner.code},
+                ))
+            elif ticket.rfid_uid == rfid_uid:
+                unchanged += 1
+            else:
+                ticket.rfid_uid = rfid_uid
+                updates.append(ticket)
+
+        applied = not dry_run and bool(updates) and (skip_conflicts or not conflicts)
+        if applied:
+            changed_at = now()
+            for ticket in updates:
+                ticket.updated_at = changed_at
+            SailTicket.objects.bulk_update(updates, ['rfid_uid', 'updated_at'])
+            SailTicketLog.objects.bulk_create([
+                SailTicketLog(
+                    ticket=ticket,
+                    status=ticket.status,
+                    changed_at=changed_at,
+                    changed_by=user,
+                    note='RFID card paired from manifest',
+                )
+                for ticket in updates
+            ])
+    if applied:
+        rfid_cache.invalidate_rfid_index()
+    conflicts.sort(key=lambda c: c['line'])
+    return {
+        'paired': len(updates),
+        'unchanged': unchanged,
+        'conflicts': conflicts,
+        'applied': applied,
+    }
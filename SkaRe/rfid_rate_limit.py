@@ -0,0 +1,77 @@
+"""In-process token buckets guarding the RFID reader API.
+
+Every request with a valid API key takes a token from that key's bucket, and
+requests naming a ``module_id`` also take one from the module's bucket. An
+empty bucket means the request is answered with a 429 before any database or
+cache access. A bucket refills at ``rate`` tokens per second up to ``burst``
+(``RFID_RATE_LIMIT_KEY`` and ``RFID_RATE_LIMIT_MODULE`` settings, as
+``(rate, burst)``; a rate of 0 disables that limit).
+
+All readers share one API key, so the key bucket caps the total reader load
+on the worker, while module buckets stop a single device stuck in a scan loop
+long before it can starve the others. Buckets are kept per worker process.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+# Module IDs come from the request; bound the number of buckets kept
+_MAX_BUCKETS = 1024
+_MAX_IDENT_LENGTH = 64
+
+_lock = threading.Lock()
+_buckets = {}  # (scope, ident) → [tokens, updated_at]
+_rejected = {'key': 0, 'module': 0}
+
+
+def _limit(scope):
+    return settings.RFID_RATE_LIMIT_KEY if scope == 'key' else settings.RFID_RATE_LIMIT_MODULE
+
+
+def take(scope, ident):
+    """Take a token for ``ident`` in ``scope`` ('key' or 'module').
+
+    Returns 0 when the request may proceed, otherwise the number of seconds
+    until a token becomes available.
+    """
+    rate, burst = _limit(scope)
+    if not rate:
+        return 0
+    key = (scope, ident[:_MAX_IDENT_LENGTH])
+    current = time.monotonic()
+    with _lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            if len(_buckets) >= _MAX_BUCKETS:
+                _prune(current)
+            bucket = _buckets[key] = [burst, current]
+        else:
+            bucket[0] = min(burst, bucket[0] + (current - bucket[1]) * rate)
+            bucket[1] = current
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0
+        _rejected[scope] += 1
+        return (1 - bucket[0]) / rate
+
+
+def _prune(current):
+    """Drop buckets that have refilled completely; they carry no state."""
+    for key, (tokens, updated_at) in list(_buckets.items()):
+        rate, burst = _limit(key[0])
+        if not rate or tokens + (current - updated_at) * rate >= burst:
+            del _buckets[key]
+
+
+def rejected_counts():
+    """Requests rejected by this worker since it started, per scope."""
+    with _lock:
+        return dict(_rejected)
+
+
+def reset():
+    """Forget all buckets and counters."""
+    with _lock:
+        _buckets.clear()
+        _rejected.update(dict.fromkeys(_rejected, 0))
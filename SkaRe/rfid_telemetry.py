@@ -0,0 +1,184 @@
+"""In-memory reader telemetry for the RFID API, flushed to the database periodically.
+
+Every processed scan is appended to a per-module ring buffer together with its
+outcome and server-side processing time; heartbeats (``rfid_alive`` calls that
+name their ``module_id``) only remember the last time seen. Nothing is written
+per scan: ``maybe_flush`` drains the buffers at most once per
+``RFID_TELEMETRY_FLUSH_INTERVAL`` into ``RfidReader`` totals and
+``RfidReaderMinute`` buckets using ``F()`` increments, so several workers can
+flush into the same rows.
+
+Requests rejected by the rate limiter are counted per module as well.
+
+The flush runs when a request has finished (``request_finished``, connected
+in ``connect_signals``), after its response went out, so no scan waits for
+the multi-row write. Telemetry is best-effort: a failed flush or a buffer
+overflow drops data instead of slowing down scans.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.timezone import now
+
+from .models import RfidReader, RfidReaderMinute
+
+logger = logging.getLogger(__name__)
+
+# Outcome kind → RfidReader counter field
+_KIND_FIELDS = {
+    'ok': 'ok_count',
+    'unknown_card': 'unknown_card_count',
+    'lost': 'lost_count',
+    'no_boat': 'no_boat_count',
+    'duplicate': 'duplicate_count',
+    'other_error': 'other_error_count',
+}
+
+_lock = threading.Lock()
+_scans = {}  # module_id → deque of (at, kind, latency_ms)
+_heartbeats = {}  # module_id → datetime
+_throttled = {}  # module_id → rejected requests
+_overflowed = set()
+_last_flush = time.monotonic()
+
+
+def scan_kind(data):
+    """Classify a scan response dict as one of the telemetry outcome kinds."""
+    if data.get('result') == 'ok':
+        return 'ok'
+    error = data.get('error')
+    if error in ('already_on_water', 'already_ashore'):
+        return 'duplicate'
+    if error in _KIND_FIELDS:
+        return error
+    return 'other_error'
+
+
+def record_scan(module_id, kind, latency_ms):
+    """Buffer one processed scan of ``module_id``."""
+    at = now()
+    with _lock:
+        buffer = _scans.get(module_id)
+        if buffer is None:
+            buffer = _scans[module_id] = deque(maxlen=settings.RFID_TELEMETRY_BUFFER_SIZE)
+        if len(buffer) == buffer.maxlen:
+            _overflowed.add(module_id)
+        buffer.append((at, kind, latency_ms))
+        _heartbeats[module_id] = at
+
+
+def record_heartbeat(module_id):
+    """Remember that ``module_id`` was seen alive now."""
+    with _lock:
+        _heartbeats[module_id] = now()
+
+
+def record_throttled(module_id):
+    """Count a request of ``module_id`` rejected by the rate limiter."""
+    with _lock:
+        _throttled[module_id] = _throttled.get(module_id, 0) + 1
+        _heartbeats[module_id] = now()
+
+
+def flush_due():
+    return time.monotonic() - _last_flush >= settings.RFID_TELEMETRY_FLUSH_INTERVAL
+
+
+def maybe_flush():
+    """Flush the buffers if the flush interval has elapsed."""
+    if flush_due():
+        flush()
+
+
+def _flush_after_request(sender, **kwargs):
+    maybe_flush()
+
+
+def connect_signals():
+    """Flush due telemetry once a request has been answered."""
+    request_finished.connect(_flush_after_request)
+
+
+def flush():
+    """Write buffered telemetry to the database and empty the buffers."""
+    global _scans, _heartbeats, _throttled, _overflowed, _last_flush
+    with _lock:
+        scans, heartbeats, throttled, overflowed = _scans, _heartbeats, _throttled, _overflowed
+        _scans, _heartbeats, _throttled, _overflowed = {}, {}, {}, set()
+        _last_flush = time.monotonic()
+    if overflowed:
+        logger.warning(
+            'RFID telemetry buffer overflowed for %s; oldest scans were dropped',
+            ', '.join(sorted(overflowed)),
+        )
+    if not heartbeats:
+        return
+    try:
+        with transaction.atomic():
+            for module_id, seen_at in heartbeats.items():
+                _write_reader(
+                    module_id, seen_at, scans.get(module_id, ()), throttled.get(module_id, 0),
+                )
+            retention = timedelta(hours=settings.RFID_TELEMETRY_RETENTION_HOURS)
+            RfidReaderMinute.objects.filter(minute__lt=now() - retention).delete()
+    except DatabaseError:
+        logger.warning('RFID telemetry flush failed; buffered data dropped', exc_info=True)
+
+
+def _latest(field, value):
+    """Expression keeping the later of the stored ``field`` and ``value``."""
+    return Greatest(Coalesce(F(field), Value(value)), Value(value))
+
+
+def _write_reader(module_id, seen_at, scans, throttled):
+    reader, _ = RfidReader.objects.get_or_create(module_id=module_id)
+    updates = {'last_heartbeat_at': _latest('last_heartbeat_at', seen_at)}
+    if throttled:
+        updates['throttled_count'] = F('throttled_count') + throttled
+    if scans:
+        counts = dict.fromkeys(_KIND_FIELDS.values(), 0)
+        minutes = {}
+        for at, kind, latency_ms in scans:
+            counts[_KIND_FIELDS[kind]] += 1
+            bucket = minutes.setdefault(
+                at.replace(second=0, microsecond=0), [0, 0, 0.0, 0.0],
+            )
+            bucket[0] += 1
+            bucket[1] += kind != 'ok'
+            bucket[2] += latency_ms
+            bucket[3] = max(bucket[3], latency_ms)
+        updates.update({
+            field: F(field) + count for field, count in counts.items() if count
+        })
+        updates['scans'] = F('scans') + len(scans)
+        updates['latency_total_ms'] = F('latency_total_ms') + sum(s[2] for s in scans)
+        updates['latency_max_ms'] = Greatest(
+            F('latency_max_ms'), Value(max(s[2] for s in scans)),
+        )
+        updates['last_scan_at'] = _latest('last_scan_at', scans[-1][0])
+        for minute, (count, errors, latency_total, latency_max) in minutes.items():
+            row, created = RfidReaderMinute.objects.get_or_create(
+                reader=reader, minute=minute,
+                defaults={
+                    'scans': count,
+                    'errors': errors,
+                    'latency_total_ms': latency_total,
+                    'latency_max_ms': latency_max,
+                },
+            )
+            if not created:
+                RfidReaderMinute.objects.filter(pk=row.pk).update(
+                    scans=F('scans') + count,
+                    errors=F('errors') + errors,
+                    latency_total_ms=F('latency_total_ms') + latency_total,
+                    latency_max_ms=Greatest(F('latency_max_ms'), Value(latency_max)),
+                )
+    RfidReader.objects.filter(pk=reader.pk).update(**updates)
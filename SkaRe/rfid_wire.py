@@ -0,0 +1,219 @@
+"""Compact wire format for the RFID reader API, and a reference client.
+
+An alternative to the JSON bodies of ``api/rfid/scan/`` and
+``api/rfid/alive/`` for microcontroller readers, with the same semantics:
+
+* Scan requests may be form-encoded (``Content-Type:
+  application/x-www-form-urlencoded``) with the short keys ``m`` (module_id),
+  ``u`` (rfid_uid) and ``s`` (scan_id)::
+
+      m=departure&u=AABBCCDD&s=dep-123
+
+* A reader that sends ``Accept: text/plain`` gets a single ``|``-separated
+  line instead of JSON. Trailing empty fields are omitted::
+
+      scan:  <result>|<ticket_code>|<new_status>|<boat_name>|<sail_number>|<next_ticket>|<remaining>
+             OK|P550-001|W|Albatros|CZE1234
+             UC
+      alive: <version>|<boats_on_water>|<boats_ashore>|<pairing_ticket>
+             1776508200123|12|8
+
+``<result>`` is ``OK`` or one of the two-letter error codes in
+:data:`RESULT_CODES`; ``<new_status>`` is ``W`` (on water) or ``A`` (ashore).
+The reader state is in pairing mode exactly when ``<pairing_ticket>`` is
+present. Timestamps are left out: the reader knows when it scanned.
+
+This module only uses the standard library, so the encoder and decoder can be
+shared by the server and by reader firmware tooling.
+"""
+import urllib.error
+import urllib.parse
+import urllib.request
+
+CONTENT_TYPE = 'text/plain'
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+SEPARATOR = '|'
+
+RESULT_CODES = {
+    'unknown_card': 'UC',
+    'lost': 'LO',
+    'no_boat': 'NB',
+    'already_on_water': 'AW',
+    'already_ashore': 'AA',
+    'already_paired': 'AP',
+    'session_closed': 'SC',
+    'invalid_record': 'IR',
+    'stale_scan': 'SS',
+}
+RESULT_OK = 'OK'
+RESULT_OTHER = 'ER'
+
+STATUS_CODES = {
+    'on_water': 'W',
+    'ashore': 'A',
+}
+
+_FORM_KEYS = {'m': 'module_id', 'u': 'rfid_uid', 's': 'scan_id'}
+
+_ERRORS = {code: error for error, code in RESULT_CODES.items()}
+_STATUSES = {code: status for status, code in STATUS_CODES.items()}
+
+
+def _field(value):
+    """A text field with the separator and line breaks replaced by spaces."""
+    if value is None:
+        return ''
+    return str(value).replace(SEPARATOR, ' ').replace('\r', ' ').replace('\n', ' ')
+
+
+def _line(fields):
+    fields = [_field(f) for f in fields]
+    while fields and not fields[-1]:
+        fields.pop()
+    return SEPARATOR.join(fields)
+
+
+def encode_scan_request(module_id, rfid_uid, scan_id=''):
+    """Form-encode a scan request body."""
+    fields = {'m': module_id, 'u': rfid_uid}
+    if scan_id:
+        fields['s'] = scan_id
+    return urllib.parse.urlencode(fields)
+
+
+def scan_request_fields(form):
+    """Read ``module_id``, ``rfid_uid`` and ``scan_id`` from a decoded form.
+
+    Accepts both the short keys and the JSON field names.
+    """
+    data = {}
+    for short, name in _FORM_KEYS.items():
+        data[name] = form.get(short, form.get(name, ''))
+    return data
+
+
+def encode_scan_result(data):
+    """Encode a scan response dict (as returned to JSON clients) as one line."""
+    if data['result'] == 'ok':
+        result = RESULT_OK
+    else:
+        result = RESULT_CODES.get(data.get('error'), RESULT_OTHER)
+    boat = data.get('boat') or {}
+    remaining = data.get('remaining')
+    return _line([
+        result,
+        data.get('ticket_code'),
+        STATUS_CODES.get(data.get('new_status'), ''),
+        boat.get('name'),
+        boat.get('sail_number'),
+        data.get('next_ticket'),
+        '' if remaining is None else remaining,
+    ])
+
+
+def decode_scan_result(line):
+    """Decode a compact scan response into a dict shaped like the JSON response.
+
+    Only the fields carried by the compact format are present: ``boat`` holds
+    at most ``name`` and ``sail_number``, and there is no ``timestamp``.
+    """
+    fields = line.strip().split(SEPARATOR)
+    fields += [''] * (7 - len(fields))
+    result, ticket_code, status, boat_name, sail_number, next_ticket, remaining = fields[:7]
+    if result == RESULT_OK:
+        data = {'result': 'ok'}
+    else:
+        data = {'result': 'error', 'error': _ERRORS.get(result, 'error')}
+    if ticket_code:
+        data['ticket_code'] = ticket_code
+    if status:
+        data['new_status'] = _STATUSES.get(status, status)
+    if boat_name or sail_number:
+        data['boat'] = {'name': boat_name}
+        if sail_number:
+            data['boat']['sail_number'] = sail_number
+    if next_ticket:
+        data['next_ticket'] = next_ticket
+    if remaining:
+        data['remaining'] = int(remaining)
+    return data
+
+
+def encode_reader_state(state):
+    """Encode the reader state document (``alive`` response) as one line."""
+    return _line([
+        state['version'],
+        state['boats_on_water'],
+        state['boats_ashore'],
+        state.get('pairing_ticket'),
+    ])
+
+
+def decode_reader_state(line):
+    """Decode a compact ``alive`` response into the reader state document."""
+    fields = line.strip().split(SEPARATOR)
+    state = {
+        'version': int(fields[0]),
+        'boats_on_water': int(fields[1]),
+        'boats_ashore': int(fields[2]),
+        'mode': 'scanning',
+    }
+    if len(fields) > 3 and fields[3]:
+        state['mode'] = 'pairing'
+        state['pairing_ticket'] = fields[3]
+    return state
+
+
+def _urllib_transport(method, url, body, headers):
+    request = urllib.request.Request(url, data=body, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+class RfidCompactClient:
+    """Reference reader client speaking the compact format.
+
+    ``transport(method, url, body, headers)`` performs the HTTP request and
+    returns ``(status, body_bytes)``; it defaults to ``urllib``. Reader
+    firmware implements the same two calls.
+    """
+
+    def __init__(self, base_url, api_key, module_id, transport=None):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.module_id = module_id
+        self.transport = transport or _urllib_transport
+        self.version = None
+
+    def _headers(self):
+        return {'Authorization': f'Bearer {self.api_key}', 'Accept': CONTENT_TYPE}
+
+    def alive(self):
+        """Send a heartbeat; return the reader state, or None when unchanged."""
+        query = {'module_id': self.module_id}
+        if self.version is not None:
+            query['version'] = self.version
+        url = f'{self.base_url}/api/rfid/alive/?{urllib.parse.urlencode(query)}'
+        status, body = self.transport('GET', url, None, self._headers())
+        if status == 304:
+            return None
+        if status != 200:
+            raise RuntimeError(f'alive failed with HTTP {status}')
+        state = decode_reader_state(body.decode('utf-8'))
+        self.version = state['version']
+        return state
+
+    def scan(self, rfid_uid, scan_id=''):
+        """Report a scanned card; return the decoded scan result."""
+        headers = dict(self._headers(), **{'Content-Type': FORM_CONTENT_TYPE})
+        body = encode_scan_request(self.module_id, rfid_uid, scan_id).encode('ascii')
+        status, response = self.transport(
+            'POST', f'{self.base_url}/api/rfid/scan/', body, headers,
+        )
+        if status != 200:
+            raise RuntimeError(f'scan failed with HTTP {status}')
+        return decode_scan_result(response.decode('utf-8'))
@@ -3,6 +3,7 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User, Group
 from django.utils import timezone
+from SkaRe import dashboard_counters
 from SkaRe.models import (
     Entity, Unit, RegularParticipant, IndividualParticipant,
     Organizer, Person, AttendanceLog,
@@ -208,6 +209,63 @@ class AttendanceMarkAllArrivedTest(TestCase):
         self.assertEqual(AttendanceLog.objects.count(), 2)
 
 
+class AttendanceUnitSetStatusTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.desk = _make_infodesk()
+        self.client.login(username='desk', password='pw')
+        self.owner = User.objects.create_user(username='owner', password='pw')
+        self.unit = _make_unit(self.owner)
+        self.people = [_make_participant(self.unit, f'Jan {n}') for n in range(13)]
+        self.url = reverse('SkaRe:attendance_unit_set_status', kwargs={'unit_id': self.unit.pk})
+
+    def _statuses(self):
+        return list(
+            Person.objects.order_by('pk').values_list('attendance_status', flat=True)
+        )
+
+    def test_all_but_exceptions(self):
+        missing = self.people[4]
+        response = self.client.post(self.url, {'new_status': 'arrived', 'exclude_ids': [missing.pk]})
+        self.assertRedirects(
+            response, reverse('SkaRe:attendance_unit_detail', kwargs={'unit_id': self.unit.pk}),
+        )
+        self.assertEqual(self._statuses().count('arrived'), 12)
+        missing.refresh_from_db()
+        self.assertEqual(missing.attendance_status, 'expected')
+        self.assertEqual(AttendanceLog.objects.filter(changed_by=self.desk).count(), 12)
+        self.assertIsNotNone(Person.objects.filter(attendance_status='arrived').first().arrived_at)
+
+    def test_explicit_people_and_any_status(self):
+        chosen = [self.people[0].pk, self.people[1].pk]
+        self.client.post(self.url, {'new_status': 'not_coming', 'person_ids': chosen})
+        self.assertEqual(self._statuses().count('not_coming'), 2)
+        # Repeating the change only reports the people as unchanged
+        response = self.client.post(self.url, {'new_status': 'not_coming', 'person_ids': chosen}, follow=True)
+        self.assertContains(response, '0 participants set to')
+        self.assertEqual(AttendanceLog.objects.count(), 2)
+
+    def test_other_units_are_not_touched(self):
+        other = _make_participant(_make_unit(self.owner, 'Vlci'), 'Petr')
+        self.client.post(self.url, {'new_status': 'arrived', 'person_ids': [other.pk]})
+        other.refresh_from_db()
+        self.assertEqual(other.attendance_status, 'expected')
+
+    def test_one_request_for_the_whole_unit(self):
+        dashboard_counters.reconcile()
+        # session, user, group check, unit, people, savepoint, update,
+        # dashboard counters, log insert, release
+        with self.assertNumQueries(10):
+            self.client.post(self.url, {'new_status': 'arrived'})
+        self.assertEqual(self._statuses().count('arrived'), 13)
+
+    def test_invalid_input(self):
+        self.assertEqual(self.client.post(self.url, {'new_status': 'flying'}).status_code, 400)
+        response = self.client.post(self.url, {'new_status': 'arrived', 'exclude_ids': ['x']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+
 class AttendanceIndividualsListTest(TestCase):
     def setUp(self):
         self.client = Client()
@@ -0,0 +1,147 @@
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from SkaRe import dashboard_counters
+from SkaRe.models import (
+    DashboardCounters, Entity, Unit, RegularParticipant, Person, SailTicket,
+)
+
+
+def _make_infodesk():
+    user = User.objects.create_user(username='desk', password='pw')
+    user.groups.add(Group.objects.get_or_create(name='InfoDesk')[0])
+    return user
+
+
+def _make_unit(user, participants=2):
+    entity = Entity.objects.create(
+        created_by=user, contact_email='u@example.com',
+        contact_phone='123456789', scout_unit_name='Bobři',
+    )
+    unit = Unit.objects.create(entity=entity, contact_person_name='Leader')
+    for n in range(participants):
+        RegularParticipant.objects.create(
+            unit=unit, first_name=f'Jan {n}', last_name='Novák', date_of_birth=date(2000, 1, 1),
+        )
+    return unit
+
+
+class DashboardCountersTest(TestCase):
+    def setUp(self):
+        self.desk = _make_infodesk()
+        self.client = Client()
+        self.client.login(username='desk', password='pw')
+        self.unit = _make_unit(self.desk)
+        self.ticket = SailTicket.objects.create(code='P550-1', color=SailTicket.Color.P550)
+        dashboard_counters.reconcile()
+
+    def _counters(self):
+        return DashboardCounters.objects.get()
+
+    def assertMatchesRecount(self):
+        counters = self._counters()
+        recount = dashboard_counters.reconcile()
+        for name in ('unconfirmed_entities', 'arrived', 'expected', 'not_coming', 'on_water'):
+            self.assertEqual(getattr(counters, name), getattr(recount, name), name)
+
+    def test_dashboard_reads_one_row(self):
+        url = reverse('SkaRe:infodesk_dashboard')
+        # session, user, group check, counters, group check of the menu
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.context['expected_count'], 2)
+        self.assertEqual(response.context['unconfirmed_count'], 1)
+
+    def test_attendance_changes_move_counters(self):
+        person = Person.objects.first()
+        self.client.post(
+            reverse('SkaRe:attendance_set_status', kwargs={'person_id': person.pk}),
+            {'new_status': 'not_coming'},
+        )
+        self.assertEqual(self._counters().not_coming, 1)
+        self.assertEqual(self._counters().expected, 1)
+        self.client.post(reverse('SkaRe:attendance_unit_mark_all_arrived', kwargs={'unit_id': self.unit.pk}))
+        self.assertEqual(self._counters().arrived, 1)
+        self.assertMatchesRecount()
+
+    def test_unit_status_change_moves_counters(self):
+        DashboardCounters.objects.all().delete()
+        person = Person.objects.first()
+        self.client.post(
+            reverse('SkaRe:attendance_unit_set_status', kwargs={'unit_id': self.unit.pk}),
+            {'new_status': 'arrived', 'exclude_ids': [person.pk]},
+        )
+        self.assertEqual(self._counters().arrived, 1)
+        self.assertMatchesRecount()
+
+    def test_confirmations_move_counters(self):
+        entity = self.unit.entity
+        self.client.post(reverse('SkaRe:infodesk_confirm_entity', kwargs={'entity_id': entity.pk}))
+        self.client.post(reverse('SkaRe:infodesk_confirm_entity', kwargs={'entity_id': entity.pk}))
+        self.assertEqual(self._counters().unconfirmed_entities, 0)
+        self.client.post(reverse('SkaRe:infodesk_reject_entity', kwargs={'entity_id': entity.pk}))
+        self.assertEqual(self._counters().unconfirmed_entities, 1)
+        self.client.post(reverse('SkaRe:infodesk_bulk_confirm'), {'entity_ids': [entity.pk, entity.pk]})
+        self.assertEqual(self._counters().unconfirmed_entities, 0)
+        self.assertMatchesRecount()
+
+    def test_ticket_changes_move_counters(self):
+        url = reverse('SkaRe:ticket_set_status', kwargs={'ticket_id': self.ticket.pk})
+        self.client.post(url, {'new_status': 'on_water'})
+        self.assertEqual(self._counters().on_water, 1)
+        self.client.post(reverse('SkaRe:ticket_bulk_set_status'), {
+            'new_status': 'lost', 'scope': 'filter',
+        })
+        self.assertEqual(self._counters().on_water, 0)
+        self.assertMatchesRecount()
+
+    @override_settings(DASHBOARD_COUNTERS_RECONCILE_SECONDS=60)
+    def test_stale_counters_are_recounted(self):
+        # A change that reports no delta, e.g. a queryset update
+        Person.objects.update(attendance_status='arrived')
+        self.assertEqual(dashboard_counters.current().expected, 2)
+        DashboardCounters.objects.update(reconciled_at=now() - timedelta(seconds=61))
+        self.assertEqual(dashboard_counters.current().expected, 0)
+
+    def test_registrations_and_deletes_move_counters(self):
+        unit = _make_unit(self.desk, participants=3)
+        self.assertEqual(self._counters().expected, 5)
+        self.assertEqual(self._counters().unconfirmed_entities, 2)
+        RegularParticipant.objects.filter(unit=unit).first().delete()
+        self.assertEqual(self._counters().expected, 4)
+        RegularParticipant.objects.filter(unit=unit).delete()
+        unit.entity.delete()
+        self.assertEqual(self._counters().expected, 2)
+        self.assertEqual(self._counters().unconfirmed_entities, 1)
+        self.assertMatchesRecount()
+
+    def test_instance_edits_move_counters(self):
+        # As the admin and the organizer pages save them
+        participant = RegularParticipant.objects.first()
+        participant.attendance_status = 'not_coming'
+        participant.save()
+        entity = Entity.objects.get()
+        entity.confirmed = True
+        entity.save()
+        self.assertEqual(self._counters().not_coming, 1)
+        self.assertEqual(self._counters().unconfirmed_entities, 0)
+        participant.first_name = 'Petr'
+        participant.save()
+        self.assertEqual(self._counters().not_coming, 1)
+        self.assertMatchesRecount()
+
+    def test_missing_row_is_created_on_adjust(self):
+        DashboardCounters.objects.all().delete()
+        dashboard_counters.adjust(on_water=1)
+        self.assertEqual(self._counters().expected, 2)
+
+    def test_reconcile_command_reports_drift(self):
+        DashboardCounters.objects.update(expected=7)
+        out = StringIO()
+        call_command('reconcile_dashboard_counters', stdout=out)
+        self.assertIn('expected: 7 -> 2', out.getvalue())
+        self.assertEqual(self._counters().expected, 2)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from SkaRe import overdue
+from SkaRe.models import SailTicket, Boat, BoatClass
+
+
+def _make_ticket(code, minutes_out=None, boat_class=None):
+    user = User.objects.get_or_create(username='owner')[0]
+    boat = Boat.objects.create(
+        created_by=user, boat_class=boat_class, name=f'Boat {code}',
+        contact_person='Leader', contact_phone='123456789', hull_color='white',
+    )
+    on_water = minutes_out is not None
+    return SailTicket.objects.create(
+        code=code, color=SailTicket.Color.P550, boat=boat,
+        status=SailTicket.Status.ON_WATER if on_water else SailTicket.Status.ASHORE,
+        on_water_since=now() - timedelta(minutes=minutes_out) if on_water else None,
+    )
+
+
+@override_settings(OVERDUE_DEFAULT_MINUTES=180)
+class FindOverdueTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.short = BoatClass.objects.create(
+            name='Kayak', category=BoatClass.Category.OTHER, max_on_water_minutes=60,
+        )
+
+    def test_applies_class_threshold_and_default(self):
+        _make_ticket('K-1', minutes_out=90, boat_class=self.short)
+        _make_ticket('K-2', minutes_out=30, boat_class=self.short)
+        _make_ticket('P-1', minutes_out=90)
+        _make_ticket('P-2', minutes_out=200)
+        _make_ticket('P-3')
+        boats = overdue.find_overdue()
+        self.assertEqual([b['ticket_code'] for b in boats], ['P-2', 'K-1'])
+        self.assertEqual(boats[1]['limit_minutes'], 60)
+        self.assertEqual(boats[1]['minutes_out'], 90)
+        self.assertEqual(boats[1]['boat_class'], 'Kayak')
+
+    def test_evaluation_is_a_single_query(self):
+        _make_ticket('P-1', minutes_out=200)
+        overdue.thresholds()
+        with self.assertNumQueries(1):
+            overdue.find_overdue()
+
+    def test_watchdog_publishes_and_reports(self):
+        ticket = _make_ticket('P-1', minutes_out=200)
+        out = StringIO()
+        call_command('watch_overdue', '--once', stdout=out)
+        self.assertIn('OVERDUE P-1', out.getvalue())
+        SailTicket.objects.filter(pk=ticket.pk).update(on_water_since=None)
+        # The feed serves the published evaluation until the next one
+        boats, _evaluated_at = overdue.current_overdue()
+        self.assertEqual([b['ticket_code'] for b in boats], ['P-1'])
+
+
+class OverdueViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='desk', password='pw')
+        user.groups.add(Group.objects.get_or_create(name='InfoDesk')[0])
+        self.client = Client()
+        self.client.login(username='desk', password='pw')
+        _make_ticket('P-1', minutes_out=500)
+
+    def test_page_lists_overdue_boats(self):
+        response = self.client.get(reverse('SkaRe:ticket_overdue'))
+        self.assertContains(response, 'Boat P-1')
+
+    def test_feed(self):
+        data = self.client.get(reverse('SkaRe:ticket_overdue_feed')).json()
+        self.assertEqual(data['overdue'][0]['ticket_code'], 'P-1')
+        self.assertEqual(data['overdue'][0]['limit_minutes'], 180)
+        self.assertIn('evaluated_at', data)
+
+    def test_requires_infodesk(self):
+        self.client.logout()
+        response = self.client.get(reverse('SkaRe:ticket_overdue_feed'))
+        self.assertNotEqual(response.status_code, 200)
@@ -0,0 +1,125 @@
+import threading
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from SkaRe import rfid_cache, rfid_rate_limit
+from SkaRe.management.commands.replay_rfid_traffic import (
+    REPLAY_API_KEY, build_events, client_sender, load_from_database, percentile, replay,
+    replay_settings, seed_replay_tickets,
+)
+from SkaRe.models import SailTicket, SailTicketLog
+
+
+class BuildEventsTest(TestCase):
+    def setUp(self):
+        self.start = now()
+        self.tickets = {1: {'code': 'P550-001', 'rfid_uid': 'AA'}, 2: {'code': 'P550-002', 'rfid_uid': ''}}
+
+    def _entry(self, seconds, status, ticket_id=1, note='', changed_by=None):
+        return {
+            'ticket_id': ticket_id,
+            'status': status,
+            'changed_at': self.start + timedelta(seconds=seconds),
+            'note': note,
+            'changed_by': changed_by,
+        }
+
+    def test_maps_log_entries_to_scans(self):
+        events = build_events([
+            self._entry(0, 'on_water'),
+            self._entry(30, 'on_water', note='Duplicate scan on departure module'),
+            self._entry(60, 'ashore', ticket_id=2),
+            self._entry(90, 'lost'),
+            self._entry(120, 'ashore', note='Boat assigned: X by desk', changed_by=5),
+            self._entry(150, 'ashore', changed_by=5),
+        ], self.tickets)
+        self.assertEqual(
+            [(e['offset'], e['module_id'], e['rfid_uid']) for e in events],
+            [(0, 'departure', 'AA'), (30, 'departure', 'AA'), (60, 'arrival', 'REPLAY-2')],
+        )
+
+    def test_include_manual(self):
+        events = build_events([self._entry(0, 'ashore', changed_by=5)], self.tickets, include_manual=True)
+        self.assertEqual(events[0]['module_id'], 'arrival')
+
+    def test_load_from_database(self):
+        ticket = SailTicket.objects.create(code='P550-001', color=SailTicket.Color.P550, rfid_uid='AA')
+        user = User.objects.create_user(username='desk')
+        SailTicketLog.objects.create(ticket=ticket, status='on_water')
+        SailTicketLog.objects.create(ticket=ticket, status='ashore', changed_by=user)
+        entries, tickets = load_from_database()
+        self.assertEqual(len(build_events(entries, tickets)), 1)
+        self.assertEqual(tickets[ticket.pk]['rfid_uid'], 'AA')
+
+
+class PercentileTest(TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+
+class ReplayTest(TestCase):
+    def setUp(self):
+        rfid_rate_limit.reset()
+        self.addCleanup(rfid_rate_limit.reset)
+
+    def test_sends_every_event_keeping_ticket_order(self):
+        events = [
+            {'offset': i * 0.01, 'ticket_id': i % 3, 'module_id': 'departure', 'rfid_uid': str(i)}
+            for i in range(12)
+        ]
+        seen = {}
+        lock = threading.Lock()
+
+        def send(event):
+            with lock:
+                seen.setdefault(event['ticket_id'], []).append(int(event['rfid_uid']))
+            return 'ok'
+
+        results, wall = replay(events, send, readers=2, speedup=10)
+        self.assertEqual(len(results), 12)
+        self.assertTrue(all(r['outcome'] == 'ok' for r in results))
+        for order in seen.values():
+            self.assertEqual(order, sorted(order))
+
+    @override_settings(RFID_API_KEY=REPLAY_API_KEY, RFID_SCAN_DEBOUNCE_SECONDS=0)
+    def test_client_sender_against_seeded_tickets(self):
+        events = [
+            {'offset': 0, 'ticket_id': 1, 'module_id': 'departure', 'rfid_uid': 'AA'},
+            {'offset': 1, 'ticket_id': 2, 'module_id': 'arrival', 'rfid_uid': 'BB'},
+        ]
+        seed_replay_tickets(events)
+        self.assertEqual(SailTicket.objects.get(rfid_uid='BB').status, SailTicket.Status.ON_WATER)
+        send = client_sender()
+        self.assertEqual([send(e) for e in events], ['ok', 'ok'])
+        self.assertEqual(send(events[0]), 'already_on_water')
+
+    @override_settings(
+        RFID_RATE_LIMIT_KEY=(1, 1), RFID_RATE_LIMIT_MODULE=(1, 1), RFID_SCAN_DEBOUNCE_SECONDS=0,
+    )
+    def test_replay_settings_lift_rate_limits(self):
+        events = [
+            {'offset': i, 'ticket_id': 1, 'module_id': module_id, 'rfid_uid': 'AA'}
+            for i, module_id in enumerate(['departure', 'arrival', 'departure'])
+        ]
+        seed_replay_tickets(events)
+        with replay_settings():
+            send = client_sender()
+            self.assertEqual([send(e) for e in events], ['ok', 'ok', 'ok'])
+
+    @override_settings(RFID_SCAN_DEBOUNCE_SECONDS=60)
+    def test_replay_settings_keep_the_configured_cache_untouched(self):
+        cache.clear()
+        cache.set('live', 'value')
+        events = [{'offset': 0, 'ticket_id': 1, 'module_id': 'departure', 'rfid_uid': 'AA'}]
+        with replay_settings():
+            self.assertIsNone(cache.get('live'))
+            seed_replay_tickets(events)
+            self.assertEqual(client_sender()(events[0]), 'ok')
+        self.assertEqual(cache.get('live'), 'value')
+        self.assertIsNone(rfid_cache.get_debounced_response('departure', 'AA', now()))
@@ -1,8 +1,20 @@
 import json
-from django.test import TestCase, Client, override_settings
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import DatabaseError
+from django.test import (
+    AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, Client, override_settings,
+)
 from django.urls import reverse
-from SkaRe.models import SailTicket, SailTicketLog, Boat, BoatClass
-from django.contrib.auth.models import User
+from django.utils.timezone import now
+from SkaRe import rfid_cache, rfid_rate_limit, rfid_telemetry, trips
+from SkaRe.models import (
+    SailTicket, SailTicketLog, Boat, BoatClass, RfidReader, RfidReaderMinute,
+    PairingSession, PairingSessionItem,
+)
+from SkaRe.views import rfid_alive_async, rfid_events_async, rfid_scan, rfid_scan_async
+from django.contrib.auth.models import User, Group
 
 
 def _make_user():
@@ -35,6 +47,8 @@ def _make_ticket(code='P550-001', color=None, status=None, boat=None,
 @override_settings(RFID_API_KEY='testkey')
 class RfidAliveAuthTest(TestCase):
     def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
         self.client = Client()
         self.url = reverse('SkaRe:rfid_alive')
 
@@ -54,6 +68,8 @@ class RfidAliveAuthTest(TestCase):
 @override_settings(RFID_API_KEY='testkey')
 class RfidAliveResponseTest(TestCase):
     def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
         self.client = Client()
         self.url = reverse('SkaRe:rfid_alive')
         self.headers = {'HTTP_AUTHORIZATION': 'Bearer testkey'}
@@ -89,9 +105,77 @@ class RfidAliveResponseTest(TestCase):
         self.assertIn('timestamp', data)
 
 
+@override_settings(RFID_API_KEY='testkey')
+class RfidAliveVersioningTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.client = Client()
+        self.url = reverse('SkaRe:rfid_alive')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer testkey'}
+
+    def test_state_computed_with_single_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url, **self.headers)
+
+    def test_cached_state_needs_no_queries(self):
+        self.client.get(self.url, **self.headers)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, **self.headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_matching_etag_returns_304(self):
+        first = self.client.get(self.url, **self.headers)
+        self.assertIn('version', json.loads(first.content))
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=first['ETag'], **self.headers,
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], first['ETag'])
+
+    def test_matching_version_param_returns_304(self):
+        version = json.loads(self.client.get(self.url, **self.headers).content)['version']
+        response = self.client.get(self.url, {'version': version}, **self.headers)
+        self.assertEqual(response.status_code, 304)
+
+    def test_transition_bumps_version(self):
+        user = _make_user()
+        _make_ticket('P550-001', boat=_make_boat(user), rfid_uid='AABBCCDD')
+        first = json.loads(self.client.get(self.url, **self.headers).content)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('SkaRe:rfid_scan'),
+                json.dumps({'module_id': 'departure', 'rfid_uid': 'AABBCCDD'}),
+                content_type='application/json', **self.headers,
+            )
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=f'"{first["version"]}"', **self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertGreater(data['version'], first['version'])
+        self.assertEqual(data['boats_on_water'], 1)
+
+    def test_pair_rfid_bumps_version(self):
+        desk = User.objects.create_user(username='desk', password='pw')
+        desk.groups.add(Group.objects.get_or_create(name='InfoDesk')[0])
+        ticket = _make_ticket('P550-001')
+        first = json.loads(self.client.get(self.url, **self.headers).content)
+        desk_client = Client()
+        desk_client.login(username='desk', password='pw')
+        with self.captureOnCommitCallbacks(execute=True):
+            desk_client.post(reverse('SkaRe:ticket_pair_rfid', args=[ticket.pk]))
+        data = json.loads(self.client.get(self.url, **self.headers).content)
+        self.assertGreater(data['version'], first['version'])
+        self.assertEqual(data['mode'], 'pairing')
+        self.assertEqual(data['pairing_ticket'], 'P550-001')
+
+
 @override_settings(RFID_API_KEY='testkey')
 class RfidScanValidationTest(TestCase):
     def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
         self.client = Client()
         self.url = reverse('SkaRe:rfid_scan')
 
@@ -132,6 +216,8 @@ class RfidScanValidationTest(TestCase):
 @override_settings(RFID_API_KEY='testkey')
 class RfidScanPairingModeTest(TestCase):
     def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
         self.client = Client()
         self.url = reverse('SkaRe:rfid_scan')
 
@@ -179,6 +265,8 @@ class RfidScanPairingModeTest(TestCase):
 @override_settings(RFID_API_KEY='testkey')
 class RfidScanScanningModeTest(TestCase):
     def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
         self.client = Client()
         self.url = reverse('SkaRe:rfid_scan')
         self.user = _make_user()
@@ -282,3 +370,767 @@ class RfidScanScanningModeTest(TestCase):
         self.assertNotIn('class', boat)
         self.assertNotIn('harbor_number', boat)
         self.assertNotIn('harbor_name', boat)
+
+
+@override_settings(RFID_API_KEY='testkey')
+class RfidScanBatchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.client = Client()
+        self.url = reverse('SkaRe:rfid_scan_batch')
+        self.user = _make_user()
+        self.boat = _make_boat(self.user)
+
+    def _post(self, scans):
+        response = self.client.post(
+            self.url, json.dumps({'scans': scans}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer testkey',
+        )
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)['results']
+
+    def test_no_key_returns_401(self):
+        response = self.client.post(self.url, json.dumps({'scans': []}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_missing_scans_returns_400(self):
+        response = self.client.post(
+            self.url, json.dumps({'module_id': 'departure'}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer testkey',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_applies_in_timestamp_order_and_returns_request_order(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        results = self._post([
+            {'module_id': 'arrival', 'rfid_uid': 'AABBCCDD',
+             'scanned_at': '2026-07-04T11:00:00+02:00'},
+            {'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+             'scanned_at': '2026-07-04T10:00:00+02:00'},
+        ])
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['new_status'], SailTicket.Status.ASHORE)
+        self.assertEqual(results[1]['new_status'], SailTicket.Status.ON_WATER)
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.status, SailTicket.Status.ASHORE)
+
+    def test_log_uses_scanned_at(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        self._post([{'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+                     'scanned_at': '2026-07-04T10:00:00+02:00'}])
+        log = SailTicketLog.objects.get(ticket=ticket)
+        self.assertEqual(log.changed_at.isoformat(), '2026-07-04T08:00:00+00:00')
+
+    def test_future_timestamp_is_clamped_to_now(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        self._post([{'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+                     'scanned_at': '2999-01-01T00:00:00+00:00'}])
+        log = SailTicketLog.objects.get(ticket=ticket)
+        self.assertLess(log.changed_at.year, 2999)
+
+    def test_invalid_record_reported_without_blocking_others(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        results = self._post([
+            {'module_id': 'exit', 'rfid_uid': 'AABBCCDD',
+             'scanned_at': '2026-07-04T10:00:00+02:00'},
+            {'module_id': 'departure', 'rfid_uid': 'AABBCCDD'},
+            {'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+             'scanned_at': '2026-07-04T10:00:00+02:00'},
+        ])
+        self.assertEqual(results[0]['error'], 'invalid_record')
+        self.assertEqual(results[1]['error'], 'invalid_record')
+        self.assertEqual(results[2]['result'], 'ok')
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.status, SailTicket.Status.ON_WATER)
+
+    def test_batch_does_not_pair_while_pairing_is_pending(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        pending = _make_ticket('P550-002', pending_pairing=True)
+        results = self._post([
+            {'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+             'scanned_at': '2026-07-04T10:00:00+02:00'},
+            {'module_id': 'departure', 'rfid_uid': 'UNKNOWN',
+             'scanned_at': '2026-07-04T10:05:00+02:00'},
+        ])
+        self.assertEqual(results[0]['new_status'], SailTicket.Status.ON_WATER)
+        self.assertEqual(results[1]['error'], 'unknown_card')
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.status, SailTicket.Status.ON_WATER)
+        pending.refresh_from_db()
+        self.assertTrue(pending.pending_pairing)
+        self.assertEqual(pending.rfid_uid, '')
+
+    def test_late_batch_after_desk_change_is_only_logged(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        self._post([{'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+                     'scanned_at': '2026-07-04T10:00:00+02:00'}])
+        desk = User.objects.create_user(username='desk', password='pw')
+        desk.groups.add(Group.objects.get_or_create(name='InfoDesk')[0])
+        desk_client = Client()
+        desk_client.login(username='desk', password='pw')
+        desk_client.post(
+            reverse('SkaRe:ticket_set_status', args=[ticket.pk]),
+            {'new_status': SailTicket.Status.ASHORE},
+        )
+        # An offline reader uploads an "out" scan taken before the landing
+        results = self._post([{'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+                               'scanned_at': '2026-07-04T11:00:00+02:00'}])
+        self.assertEqual(results[0]['error'], 'stale_scan')
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.status, SailTicket.Status.ASHORE)
+        self.assertIsNone(ticket.on_water_since)
+        self.assertEqual(ticket.trips.count(), 1)
+        self.assertFalse(ticket.trips.filter(returned_at__isnull=True).exists())
+        late = SailTicketLog.objects.filter(ticket=ticket).latest('pk')
+        self.assertEqual(late.status, SailTicket.Status.ASHORE)
+        self.assertIn('Late scan', late.note)
+
+
+@override_settings(RFID_API_KEY='testkey', RFID_SCAN_DEBOUNCE_SECONDS=0)
+class RfidUidIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.client = Client()
+        self.url = reverse('SkaRe:rfid_scan')
+        self.user = _make_user()
+        self.boat = _make_boat(self.user)
+        desk = User.objects.create_user(username='desk', password='pw')
+        desk.groups.add(Group.objects.get_or_create(name='InfoDesk')[0])
+        self.desk_client = Client()
+        self.desk_client.login(username='desk', password='pw')
+
+    def _post(self, module_id, rfid_uid):
+        response = self.client.post(
+            self.url,
+            json.dumps({'module_id': module_id, 'rfid_uid': rfid_uid}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer testkey',
+        )
+        return json.loads(response.content)
+
+    def test_repeated_unknown_card_needs_no_queries(self):
+        self._post('departure', 'UNKNOWN')
+        with self.assertNumQueries(0):
+            data = self._post('departure', 'UNKNOWN')
+        self.assertEqual(data['error'], 'unknown_card')
+
+    def test_repeated_no_boat_needs_no_queries(self):
+        _make_ticket('P550-001', rfid_uid='AABBCCDD')
+        self._post('departure', 'AABBCCDD')
+        with self.assertNumQueries(0):
+            data = self._post('departure', 'AABBCCDD')
+        self.assertEqual(data['error'], 'no_boat')
+        self.assertEqual(data['ticket_code'], 'P550-001')
+
+    def test_assign_boat_invalidates_index(self):
+        ticket = _make_ticket('P550-001', rfid_uid='AABBCCDD')
+        self.assertEqual(self._post('departure', 'AABBCCDD')['error'], 'no_boat')
+        self.desk_client.post(
+            reverse('SkaRe:ticket_assign_boat', args=[ticket.pk]),
+            {'boat_id': self.boat.pk},
+        )
+        data = self._post('departure', 'AABBCCDD')
+        self.assertEqual(data['result'], 'ok')
+        self.assertEqual(data['boat']['name'], 'Albatros')
+
+    def test_boat_edit_invalidates_index(self):
+        _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        self._post('departure', 'AABBCCDD')
+        # Saved as the admin would, outside the owner boat views
+        self.boat.name = 'Racek'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.boat.save()
+        self.assertEqual(self._post('arrival', 'AABBCCDD')['boat']['name'], 'Racek')
+        self.boat.boat_class.name = 'P550 Sport'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.boat.boat_class.save()
+        self.assertEqual(self._post('departure', 'AABBCCDD')['boat']['class'], 'P550 Sport')
+
+    def test_unpair_invalidates_index(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        self.assertEqual(self._post('departure', 'AABBCCDD')['result'], 'ok')
+        self.desk_client.post(reverse('SkaRe:ticket_unpair_rfid', args=[ticket.pk]))
+        self.assertEqual(self._post('arrival', 'AABBCCDD')['error'], 'unknown_card')
+
+    def test_pair_rfid_switches_to_pairing_mode(self):
+        self.assertEqual(self._post('departure', 'AABBCCDD')['error'], 'unknown_card')
+        ticket = _make_ticket('P550-001')
+        self.desk_client.post(reverse('SkaRe:ticket_pair_rfid', args=[ticket.pk]))
+        data = self._post('departure', 'AABBCCDD')
+        self.assertEqual(data['result'], 'ok')
+        self.assertEqual(data['ticket_code'], 'P550-001')
+        # The newly paired card is now known
+        self.assertEqual(self._post('departure', 'AABBCCDD')['error'], 'no_boat')
+
+    def test_set_status_lost_invalidates_index(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        self._post('departure', 'AABBCCDD')
+        self.desk_client.post(
+            reverse('SkaRe:ticket_set_status', args=[ticket.pk]),
+            {'new_status': SailTicket.Status.LOST},
+        )
+        self.assertEqual(self._post('arrival', 'AABBCCDD')['error'], 'lost')
+
+    def test_stale_entry_is_refreshed_from_database(self):
+        ticket = _make_ticket('P550-001', boat=self.boat, rfid_uid='AABBCCDD')
+        self._post('departure', 'AABBCCDD')
+        # Boat removed behind the app's back: the cached entry is stale
+        SailTicket.objects.filter(pk=ticket.pk).update(boat=None)
+        self.assertEqual(self._post('arrival', 'AABBCCDD')['error'], 'no_boat')
+
+
+@override_settings(
+    RFID_API_KEY='testkey',
+    RFID_EVENTS_POLL_INTERVAL=0,
+    RFID_EVENTS_KEEPALIVE=3600,
+    RFID_EVENTS_MAX_DURATION=3600,
+)
+class RfidEventsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.client = Client()
+        self.url = reverse('SkaRe:rfid_events')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer testkey'}
+
+    def _events(self, **extra):
+        response = self.client.get(self.url, **self.headers, **extra)
+        self.assertEqual(response.status_code, 200)
+        self.addCleanup(response.close)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        self.assertTrue(next(stream).startswith(b'retry:'))
+        return stream
+
+    def _parse(self, message):
+        fields = dict(
+            line.split(': ', 1) for line in message.decode().strip().split('\n')
+        )
+        return fields['id'], fields['event'], json.loads(fields['data'])
+
+    def test_no_key_returns_401(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_initial_state_is_sent(self):
+        event_id, event, data = self._parse(next(self._events()))
+        self.assertEqual(event, 'state')
+        self.assertEqual(data['mode'], 'scanning')
+        self.assertEqual(event_id, str(data['version']))
+
+    def test_pairing_start_is_pushed(self):
+        stream = self._events()
+        next(stream)
+        _make_ticket('P550-001', pending_pairing=True)
+        rfid_cache.bump_reader_state()
+        _, _, data = self._parse(next(stream))
+        self.assertEqual(data['mode'], 'pairing')
+        self.assertEqual(data['pairing_ticket'], 'P550-001')
+
+    @override_settings(RFID_EVENTS_MAX_SYNC_STREAMS=1)
+    def test_streams_over_the_cap_get_503_until_one_closes(self):
+        response = self.client.get(self.url, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        busy = self.client.get(self.url, **self.headers)
+        self.assertEqual(busy.status_code, 503)
+        self.assertEqual(busy['Retry-After'], '60')
+        response.close()  # also when the stream was never read
+        self._events()
+
+    @override_settings(RFID_EVENTS_MAX_DURATION=0)
+    def test_reconnect_with_current_version_sends_nothing(self):
+        _, _, data = self._parse(next(self._events()))
+        stream = self._events(HTTP_LAST_EVENT_ID=str(data['version']))
+        self.assertEqual(list(stream), [])
+
+
+@override_settings(RFID_API_KEY='testkey', RFID_SCAN_DEBOUNCE_SECONDS=0)
+class RfidScanIdempotencyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.client = Client()
+        self.user = _make_user()
+        self.ticket = _make_ticket(
+            'P550-001', boat=_make_boat(self.user), rfid_uid='AABBCCDD',
+        )
+
+    def _post(self, url_name, body):
+        response = self.client.post(
+            reverse(url_name), json.dumps(body),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer testkey',
+        )
+        return response
+
+    def _scan(self, scan_id, module_id='departure'):
+        return json.loads(self._post('SkaRe:rfid_scan', {
+            'module_id': module_id, 'rfid_uid': 'AABBCCDD', 'scan_id': scan_id,
+        }).content)
+
+    def test_retry_returns_cached_response_without_side_effects(self):
+        first = self._scan('dep-1')
+        with self.assertNumQueries(0):
+            retry = self._scan('dep-1')
+        self.assertEqual(retry, first)
+        self.assertEqual(retry['result'], 'ok')
+        self.assertEqual(SailTicketLog.objects.filter(ticket=self.ticket).count(), 1)
+
+    def test_different_scan_id_is_processed(self):
+        self._scan('dep-1')
+        data = self._scan('dep-2')
+        self.assertEqual(data['error'], 'already_on_water')
+
+    def test_scan_id_is_scoped_per_module(self):
+        self._scan('1', module_id='departure')
+        data = self._scan('1', module_id='arrival')
+        self.assertEqual(data['new_status'], SailTicket.Status.ASHORE)
+
+    def test_invalid_scan_id_returns_400(self):
+        response = self._post('SkaRe:rfid_scan', {
+            'module_id': 'departure', 'rfid_uid': 'AABBCCDD', 'scan_id': 'a b',
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_retry_and_in_batch_duplicate(self):
+        record = {'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+                  'scan_id': 'dep-1', 'scanned_at': '2026-07-04T10:00:00+02:00'}
+        results = json.loads(self._post(
+            'SkaRe:rfid_scan_batch', {'scans': [record, record]},
+        ).content)['results']
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0]['result'], 'ok')
+        # The single-scan endpoint shares the dedup store
+        self.assertEqual(self._scan('dep-1'), results[0])
+        self.assertEqual(SailTicketLog.objects.filter(ticket=self.ticket).count(), 1)
+
+
+@override_settings(RFID_API_KEY='testkey', RFID_SCAN_DEBOUNCE_SECONDS=5)
+class RfidScanDebounceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.client = Client()
+        self.user = _make_user()
+        self.ticket = _make_ticket(
+            'P550-001', boat=_make_boat(self.user), rfid_uid='AABBCCDD',
+        )
+
+    def _scan(self, module_id='departure'):
+        # Debounce windows are stored when the scan commits
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('SkaRe:rfid_scan'),
+                json.dumps({'module_id': module_id, 'rfid_uid': 'AABBCCDD'}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION='Bearer testkey',
+            )
+        return json.loads(response.content)
+
+    def _batch(self, *records):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('SkaRe:rfid_scan_batch'),
+                json.dumps({'scans': [
+                    {'module_id': module_id, 'rfid_uid': 'AABBCCDD', 'scanned_at': at}
+                    for module_id, at in records
+                ]}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION='Bearer testkey',
+            )
+        return json.loads(response.content)['results']
+
+    def test_repeat_within_window_returns_previous_answer_without_queries(self):
+        first = self._scan()
+        with self.assertNumQueries(0):
+            repeat = self._scan()
+        self.assertEqual(repeat, first)
+        self.assertEqual(SailTicketLog.objects.filter(ticket=self.ticket).count(), 1)
+
+    def test_other_module_is_not_debounced(self):
+        self._scan('departure')
+        data = self._scan('arrival')
+        self.assertEqual(data['new_status'], SailTicket.Status.ASHORE)
+
+    def test_transition_clears_other_module_window(self):
+        self._scan('arrival')  # already_ashore, opens an arrival window
+        self._scan('departure')
+        data = self._scan('arrival')
+        self.assertEqual(data['new_status'], SailTicket.Status.ASHORE)
+
+    def test_batch_burst_logs_one_duplicate_per_window(self):
+        results = self._batch(
+            ('departure', '2026-07-04T10:00:00+02:00'),
+            ('departure', '2026-07-04T10:00:01+02:00'),
+            ('departure', '2026-07-04T10:00:04+02:00'),
+            ('departure', '2026-07-04T10:00:06+02:00'),
+            ('departure', '2026-07-04T10:00:07+02:00'),
+        )
+        self.assertEqual([r['result'] for r in results],
+                         ['ok', 'ok', 'ok', 'error', 'error'])
+        self.assertEqual(results[3]['error'], 'already_on_water')
+        # One transition and one duplicate (the first read outside the window)
+        self.assertEqual(SailTicketLog.objects.filter(ticket=self.ticket).count(), 2)
+
+    def test_rolled_back_batch_is_applied_on_retry(self):
+        other = _make_ticket(
+            'P550-002', boat=_make_boat(self.user, 'Vlna', 'CZE99'), rfid_uid='11223344',
+        )
+        scans = [
+            {'module_id': 'departure', 'rfid_uid': 'AABBCCDD',
+             'scanned_at': now().isoformat()},
+            {'module_id': 'departure', 'rfid_uid': '11223344',
+             'scanned_at': now().isoformat()},
+        ]
+        original = trips.record_status_change
+
+        def fail_for_other(ticket, *args):
+            if ticket.pk == other.pk:
+                raise DatabaseError('disk I/O error')
+            return original(ticket, *args)
+
+        with patch('SkaRe.views.rfid_api.trips.record_status_change', fail_for_other):
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(DatabaseError):
+                    self.client.post(
+                        reverse('SkaRe:rfid_scan_batch'), json.dumps({'scans': scans}),
+                        content_type='application/json', HTTP_AUTHORIZATION='Bearer testkey',
+                    )
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, SailTicket.Status.ASHORE)
+
+        # The reader retries within the debounce window
+        response = self.client.post(
+            reverse('SkaRe:rfid_scan_batch'), json.dumps({'scans': scans}),
+            content_type='application/json', HTTP_AUTHORIZATION='Bearer testkey',
+        )
+        results = json.loads(response.content)['results']
+        self.assertEqual([r['new_status'] for r in results], ['on_water', 'on_water'])
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, SailTicket.Status.ON_WATER)
+
+
+@override_settings(
+    RFID_API_KEY='testkey',
+    RFID_EVENTS_POLL_INTERVAL=0,
+    RFID_EVENTS_KEEPALIVE=3600,
+    RFID_EVENTS_MAX_DURATION=0,
+)
+class RfidAsyncViewsTest(TransactionTestCase):
+    """The async views query outside the request thread, on their own
+    connection, so they only see committed data."""
+
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.factory = AsyncRequestFactory()
+        self.headers = {'Authorization': 'Bearer testkey'}
+        self.user = _make_user()
+        self.ticket = _make_ticket(
+            'P550-001', boat=_make_boat(self.user), rfid_uid='AABBCCDD',
+        )
+
+    async def test_alive_requires_key(self):
+        response = await rfid_alive_async(self.factory.get('/'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_alive_reports_state_and_304(self):
+        response = await rfid_alive_async(self.factory.get('/', headers=self.headers))
+        data = json.loads(response.content)
+        self.assertEqual(data['mode'], 'scanning')
+        self.assertEqual(data['boats_ashore'], 1)
+        response = await rfid_alive_async(self.factory.get(
+            '/', headers={**self.headers, 'If-None-Match': response['ETag']},
+        ))
+        self.assertEqual(response.status_code, 304)
+
+    async def test_scan_invalid_module_returns_400(self):
+        request = self.factory.post(
+            '/', json.dumps({'module_id': 'exit', 'rfid_uid': 'AABBCCDD'}),
+            content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual((await rfid_scan_async(request)).status_code, 400)
+
+    async def test_events_stream_sends_state(self):
+        response = await rfid_events_async(self.factory.get('/', headers=self.headers))
+        messages = [m async for m in response.streaming_content]
+        self.assertTrue(messages[0].startswith(b'retry:'))
+        self.assertIn(b'event: state', messages[1])
+
+
+@override_settings(RFID_API_KEY='testkey')
+class RfidAsyncScanTest(TransactionTestCase):
+    """The async scan runs outside the request thread, on its own connection,
+    so it only sees committed data."""
+
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.ticket = _make_ticket(
+            'P550-001', boat=_make_boat(_make_user()), rfid_uid='AABBCCDD',
+        )
+
+    async def test_scan_transitions_ticket(self):
+        request = AsyncRequestFactory().post(
+            '/', json.dumps({'module_id': 'departure', 'rfid_uid': 'AABBCCDD'}),
+            content_type='application/json', headers={'Authorization': 'Bearer testkey'},
+        )
+        data = json.loads((await rfid_scan_async(request)).content)
+        self.assertEqual(data['result'], 'ok')
+        self.assertEqual(data['new_status'], SailTicket.Status.ON_WATER)
+        await self.ticket.arefresh_from_db()
+        self.assertEqual(self.ticket.status, SailTicket.Status.ON_WATER)
+
+
+@override_settings(
+    RFID_API_KEY='testkey',
+    RFID_SCAN_DEBOUNCE_SECONDS=5,
+    RFID_TELEMETRY_FLUSH_INTERVAL=3600,
+)
+class RfidReaderTelemetryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        # Drain what earlier tests buffered
+        rfid_telemetry.flush()
+        RfidReader.objects.all().delete()
+        self.client = Client()
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer testkey'}
+        self.url = reverse('SkaRe:rfid_scan')
+        boat = _make_boat(_make_user())
+        _make_ticket('P550-001', boat=boat, rfid_uid='AABBCCDD')
+        _make_ticket('P550-002', rfid_uid='NOBOAT')
+        _make_ticket('P550-003', status=SailTicket.Status.LOST, rfid_uid='LOSTCARD')
+
+    def _scan(self, rfid_uid, module_id='departure'):
+        return self.client.post(
+            self.url,
+            data=json.dumps({'module_id': module_id, 'rfid_uid': rfid_uid}),
+            content_type='application/json',
+            **self.headers,
+        )
+
+    def test_scans_are_buffered_until_flush(self):
+        self._scan('AABBCCDD')
+        self.assertFalse(RfidReader.objects.exists())
+        rfid_telemetry.flush()
+        reader = RfidReader.objects.get(module_id='departure')
+        self.assertEqual(reader.scans, 1)
+        self.assertEqual(reader.ok_count, 1)
+        self.assertIsNotNone(reader.last_scan_at)
+
+    def test_counts_outcome_kinds(self):
+        for uid in ('AABBCCDD', 'AABBCCDD', 'UNKNOWN', 'NOBOAT', 'LOSTCARD'):
+            self._scan(uid)
+        rfid_telemetry.flush()
+        reader = RfidReader.objects.get(module_id='departure')
+        self.assertEqual(reader.scans, 5)
+        self.assertEqual(reader.ok_count, 1)
+        self.assertEqual(reader.duplicate_count, 1)
+        self.assertEqual(reader.unknown_card_count, 1)
+        self.assertEqual(reader.no_boat_count, 1)
+        self.assertEqual(reader.lost_count, 1)
+        minute = RfidReaderMinute.objects.get(reader=reader)
+        self.assertEqual(minute.scans, 5)
+        self.assertEqual(minute.errors, 4)
+        self.assertGreater(reader.latency_max_ms, 0)
+
+    def test_flushes_accumulate(self):
+        self._scan('UNKNOWN')
+        rfid_telemetry.flush()
+        self._scan('UNKNOWN', module_id='arrival')
+        self._scan('NOBOAT')
+        rfid_telemetry.flush()
+        reader = RfidReader.objects.get(module_id='departure')
+        self.assertEqual(reader.scans, 2)
+        self.assertEqual(RfidReaderMinute.objects.filter(reader=reader).get().scans, 2)
+        self.assertEqual(RfidReader.objects.get(module_id='arrival').scans, 1)
+
+    @override_settings(RFID_TELEMETRY_FLUSH_INTERVAL=0)
+    def test_scan_flushes_when_interval_elapsed(self):
+        self._scan('UNKNOWN')
+        self.assertEqual(RfidReader.objects.get(module_id='departure').scans, 1)
+
+    @override_settings(RFID_TELEMETRY_FLUSH_INTERVAL=0)
+    def test_flush_waits_until_the_response_is_sent(self):
+        request = RequestFactory().post(
+            self.url, json.dumps({'module_id': 'departure', 'rfid_uid': 'UNKNOWN'}),
+            content_type='application/json', **self.headers,
+        )
+        response = rfid_scan(request)
+        self.assertFalse(RfidReader.objects.exists())
+        request_finished.send(sender=self.__class__)
+        self.assertEqual(RfidReader.objects.get(module_id='departure').scans, 1)
+        self.assertEqual(response.status_code, 200)
+
+    def test_alive_with_module_id_records_heartbeat(self):
+        self.client.get(reverse('SkaRe:rfid_alive') + '?module_id=arrival', **self.headers)
+        self.client.get(reverse('SkaRe:rfid_alive') + '?module_id=bogus', **self.headers)
+        self.client.get(reverse('SkaRe:rfid_alive'), **self.headers)
+        rfid_telemetry.flush()
+        reader = RfidReader.objects.get()
+        self.assertEqual(reader.module_id, 'arrival')
+        self.assertIsNotNone(reader.last_heartbeat_at)
+        self.assertEqual(reader.scans, 0)
+
+
+@override_settings(
+    RFID_API_KEY='testkey',
+    RFID_RATE_LIMIT_KEY=(1, 5),
+    RFID_RATE_LIMIT_MODULE=(1, 2),
+    RFID_TELEMETRY_FLUSH_INTERVAL=3600,
+)
+class RfidRateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.addCleanup(rfid_rate_limit.reset)
+        rfid_telemetry.flush()
+        RfidReader.objects.all().delete()
+        self.client = Client()
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer testkey'}
+        _make_ticket('P550-001', rfid_uid='AABBCCDD')
+
+    def _scan(self, module_id='departure'):
+        return self.client.post(
+            reverse('SkaRe:rfid_scan'),
+            data=json.dumps({'module_id': module_id, 'rfid_uid': 'AABBCCDD'}),
+            content_type='application/json',
+            **self.headers,
+        )
+
+    def test_module_over_limit_gets_429_with_retry_after(self):
+        self.assertEqual(self._scan().status_code, 200)
+        self.assertEqual(self._scan().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self._scan()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_other_modules_are_not_affected(self):
+        for _ in range(3):
+            self._scan()
+        self.assertEqual(self._scan('arrival').status_code, 200)
+
+    def test_non_string_module_id_returns_400(self):
+        for module_id in (5, ['departure']):
+            response = self._scan(module_id)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(json.loads(response.content)['error'], 'Invalid module_id')
+
+    def test_heartbeats_share_the_module_bucket(self):
+        self._scan()
+        self._scan()
+        response = self.client.get(reverse('SkaRe:rfid_alive') + '?module_id=departure', **self.headers)
+        self.assertEqual(response.status_code, 429)
+
+    def test_api_key_limit_caps_all_readers(self):
+        for _ in range(5):
+            self.client.get(reverse('SkaRe:rfid_alive'), **self.headers)
+        response = self.client.get(reverse('SkaRe:rfid_alive'), **self.headers)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(rfid_rate_limit.rejected_counts(), {'key': 1, 'module': 0})
+
+    def test_bad_key_does_not_drain_the_bucket(self):
+        for _ in range(6):
+            self.client.get(reverse('SkaRe:rfid_alive'), HTTP_AUTHORIZATION='Bearer wrong')
+        response = self.client.get(reverse('SkaRe:rfid_alive'), **self.headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_rejections_are_counted_per_reader(self):
+        for _ in range(4):
+            self._scan()
+        self._scan('bogus')
+        self._scan('bogus')
+        self._scan('bogus')
+        rfid_telemetry.flush()
+        self.assertEqual(RfidReader.objects.get().throttled_count, 2)
+
+    @override_settings(RFID_RATE_LIMIT_MODULE=(0, 0))
+    def test_zero_rate_disables_limit(self):
+        for _ in range(4):
+            self.assertEqual(self._scan().status_code, 200)
+
+
+@override_settings(RFID_API_KEY='testkey', RFID_SCAN_DEBOUNCE_SECONDS=0)
+class RfidPairingSessionScanTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.client = Client()
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer testkey'}
+        self.url = reverse('SkaRe:rfid_scan')
+        self.tickets = [_make_ticket(f'P550-00{n}') for n in (1, 2, 3)]
+        self.session = self._start('desk-1', self.tickets[:2])
+
+    def _start(self, module_id, tickets):
+        session = PairingSession.objects.create(module_id=module_id)
+        for position, ticket in enumerate(tickets):
+            PairingSessionItem.objects.create(session=session, ticket=ticket, position=position)
+        rfid_cache.invalidate_rfid_index()
+        return session
+
+    def _scan(self, rfid_uid, module_id='desk-1'):
+        return self.client.post(
+            self.url,
+            data=json.dumps({'module_id': module_id, 'rfid_uid': rfid_uid}),
+            content_type='application/json',
+            **self.headers,
+        )
+
+    def test_scans_pair_tickets_in_order(self):
+        data = self._scan('CARD01').json()
+        self.assertEqual(data['result'], 'ok')
+        self.assertEqual(data['ticket_code'], 'P550-001')
+        self.assertEqual(data['remaining'], 1)
+        self.assertEqual(data['next_ticket'], 'P550-002')
+        data = self._scan('CARD02').json()
+        self.assertEqual(data['ticket_code'], 'P550-002')
+        self.assertEqual(data['remaining'], 0)
+        self.assertNotIn('next_ticket', data)
+        self.tickets[0].refresh_from_db()
+        self.tickets[1].refresh_from_db()
+        self.assertEqual(self.tickets[0].rfid_uid, 'CARD01')
+        self.assertEqual(self.tickets[1].rfid_uid, 'CARD02')
+
+    def test_session_closes_when_complete(self):
+        self._scan('CARD01')
+        self._scan('CARD02')
+        self.session.refresh_from_db()
+        self.assertIsNotNone(self.session.closed_at)
+        response = self._scan('CARD03')
+        self.assertEqual(response.status_code, 400)
+
+    def test_paired_card_is_rejected(self):
+        self._scan('CARD01')
+        data = self._scan('CARD01').json()
+        self.assertEqual(data['error'], 'already_paired')
+        self.assertEqual(data['ticket_code'], 'P550-001')
+        self.tickets[1].refresh_from_db()
+        self.assertEqual(self.tickets[1].rfid_uid, '')
+
+    def test_ticket_paired_elsewhere_is_skipped(self):
+        SailTicket.objects.filter(pk=self.tickets[0].pk).update(rfid_uid='OTHER')
+        data = self._scan('CARD01').json()
+        self.assertEqual(data['ticket_code'], 'P550-002')
+
+    def test_parallel_sessions_on_different_modules(self):
+        self._start('desk-2', self.tickets[2:])
+        self.assertEqual(self._scan('CARD03', module_id='desk-2').json()['ticket_code'], 'P550-003')
+        self.assertEqual(self._scan('CARD01').json()['ticket_code'], 'P550-001')
+
+    def test_paired_card_scans_normally_on_gate(self):
+        boat = _make_boat(_make_user())
+        SailTicket.objects.filter(pk=self.tickets[0].pk).update(boat=boat)
+        self._scan('CARD01')
+        data = self._scan('CARD01', module_id='departure').json()
+        self.assertEqual(data['result'], 'ok')
+        self.assertEqual(data['new_status'], SailTicket.Status.ON_WATER)
+
+    def test_unknown_module_without_session_is_invalid(self):
+        self.assertEqual(self._scan('CARD01', module_id='desk-9').status_code, 400)
@@ -0,0 +1,122 @@
+import os
+import tempfile
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from SkaRe.models import SailTicket, SailTicketLog
+from SkaRe.rfid_manifest import decode_manifest, import_manifest, parse_manifest
+
+
+def _make_ticket(code, rfid_uid=''):
+    return SailTicket.objects.create(code=code, color=SailTicket.Color.P550, rfid_uid=rfid_uid)
+
+
+class ParseManifestTest(TestCase):
+    def test_skips_header_and_blank_lines(self):
+        rows = parse_manifest('code,rfid_uid\nP550-001,AABB\n\nP550-002, CCDD \n')
+        self.assertEqual(rows, [(2, 'P550-001', 'AABB'), (4, 'P550-002', 'CCDD')])
+
+    def test_semicolon_separated_without_header(self):
+        rows = parse_manifest('P550-001;AABB\nP550-002;CCDD\n')
+        self.assertEqual(rows, [(1, 'P550-001', 'AABB'), (2, 'P550-002', 'CCDD')])
+
+    def test_missing_column_kept_empty(self):
+        self.assertEqual(parse_manifest('P550-001\n'), [(1, 'P550-001', '')])
+
+    def test_decodes_utf8_bom_and_cp1250(self):
+        self.assertEqual(decode_manifest('﻿kód'.encode('utf-8')), 'kód')
+        self.assertEqual(decode_manifest('kód'.encode('cp1250')), 'kód')
+
+
+class ImportManifestTest(TestCase):
+    def setUp(self):
+        self.t1 = _make_ticket('P550-001')
+        self.t2 = _make_ticket('P550-002')
+        self.t3 = _make_ticket('P550-003', rfid_uid='OLD3')
+
+    def test_pairs_tickets_in_bulk(self):
+        report = import_manifest([(1, 'P550-001', 'AA'), (2, 'P550-002', 'BB'), (3, 'P550-003', 'OLD3')])
+        self.assertTrue(report['applied'])
+        self.assertEqual(report['paired'], 2)
+        self.assertEqual(report['unchanged'], 1)
+        self.assertEqual(report['conflicts'], [])
+        self.t1.refresh_from_db()
+        self.assertEqual(self.t1.rfid_uid, 'AA')
+        self.assertEqual(SailTicketLog.objects.count(), 2)
+
+    def test_uses_few_queries(self):
+        rows = [(1, 'P550-001', 'AA'), (2, 'P550-002', 'BB')]
+        # select + bulk update + bulk log insert, plus savepoint handling
+        with self.assertNumQueries(5):
+            import_manifest(rows)
+
+    def test_conflicts_block_the_whole_import(self):
+        report = import_manifest([
+            (1, 'P550-001', 'AA'),
+            (2, 'P550-002', 'OLD3'),
+            (3, 'P550-003', 'CC'),
+            (4, 'P550-999', 'DD'),
+            (5, 'P550-001', 'EE'),
+        ])
+        self.assertFalse(report['applied'])
+        reasons = {c['line']: c['reason'] for c in report['conflicts']}
+        self.assertEqual(sorted(reasons), [1, 2, 3, 4, 5])
+        self.assertIn('P550-003', reasons[2])
+        self.assertIn('OLD3', reasons[3])
+        self.assertFalse(SailTicket.objects.exclude(rfid_uid='').exclude(pk=self.t3.pk).exists())
+
+    def test_skip_conflicts_applies_valid_rows(self):
+        report = import_manifest(
+            [(1, 'P550-001', 'AA'), (2, 'P550-002', 'OLD3')], skip_conflicts=True,
+        )
+        self.assertTrue(report['applied'])
+        self.assertEqual(report['paired'], 1)
+        self.assertEqual(len(report['conflicts']), 1)
+
+    def test_replace_can_move_a_card_between_tickets(self):
+        report = import_manifest(
+            [(1, 'P550-003', 'NEW3'), (2, 'P550-002', 'OLD3')], replace=True,
+        )
+        self.assertTrue(report['applied'])
+        self.t2.refresh_from_db()
+        self.t3.refresh_from_db()
+        self.assertEqual((self.t2.rfid_uid, self.t3.rfid_uid), ('OLD3', 'NEW3'))
+
+    def test_duplicate_uid_in_file(self):
+        report = import_manifest([(1, 'P550-001', 'AA'), (2, 'P550-002', 'AA')])
+        self.assertEqual(len(report['conflicts']), 2)
+
+    def test_dry_run_saves_nothing(self):
+        report = import_manifest([(1, 'P550-001', 'AA')], dry_run=True)
+        self.assertFalse(report['applied'])
+        self.assertEqual(report['paired'], 1)
+        self.t1.refresh_from_db()
+        self.assertEqual(self.t1.rfid_uid, '')
+
+
+class ImportRfidManifestCommandTest(TestCase):
+    def _manifest(self, content):
+        f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+        f.write(content)
+        f.close()
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def test_imports_manifest(self):
+        ticket = _make_ticket('P550-001')
+        call_command('import_rfid_manifest', self._manifest('code,rfid_uid\nP550-001,AA\n'), stdout=open(os.devnull, 'w'))
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.rfid_uid, 'AA')
+
+    def test_conflicts_raise(self):
+        _make_ticket('P550-001')
+        path = self._manifest('P550-001,AA\nP550-999,BB\n')
+        with self.assertRaises(CommandError):
+            call_command('import_rfid_manifest', path, stdout=open(os.devnull, 'w'), stderr=open(os.devnull, 'w'))
+        self.assertFalse(SailTicket.objects.exclude(rfid_uid='').exists())
+
+    def test_undecodable_manifest_raises(self):
+        path = self._manifest('')
+        with open(path, 'wb') as f:
+            f.write(b'P550-001,\x81\x83\n')
+        with self.assertRaisesMessage(CommandError, 'not valid UTF-8/CP1250'):
+            call_command('import_rfid_manifest', path, stdout=open(os.devnull, 'w'))
@@ -0,0 +1,211 @@
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import (
+    AsyncRequestFactory, Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+from SkaRe import rfid_rate_limit, rfid_telemetry, rfid_wire
+from SkaRe.models import Boat, BoatClass, PairingSession, PairingSessionItem, SailTicket
+from SkaRe.views import rfid_scan_async
+
+
+class RfidWireFormatTest(SimpleTestCase):
+    def test_scan_ok_round_trip(self):
+        data = {
+            'result': 'ok',
+            'ticket_code': 'P550-001',
+            'new_status': 'on_water',
+            'boat': {'name': 'Albatros', 'sail_number': 'CZE1234', 'contact_person': 'Leader',
+                     'contact_phone': '123456789', 'class': 'P550'},
+            'timestamp': '2026-04-18T10:30:00+00:00',
+        }
+        line = rfid_wire.encode_scan_result(data)
+        self.assertEqual(line, 'OK|P550-001|W|Albatros|CZE1234')
+        self.assertEqual(rfid_wire.decode_scan_result(line), {
+            'result': 'ok',
+            'ticket_code': 'P550-001',
+            'new_status': 'on_water',
+            'boat': {'name': 'Albatros', 'sail_number': 'CZE1234'},
+        })
+
+    def test_every_error_round_trips(self):
+        for error in rfid_wire.RESULT_CODES:
+            data = {'result': 'error', 'error': error, 'timestamp': ''}
+            decoded = rfid_wire.decode_scan_result(rfid_wire.encode_scan_result(data))
+            self.assertEqual(decoded, {'result': 'error', 'error': error})
+
+    def test_stale_scan_round_trips_with_ticket(self):
+        data = {
+            'result': 'error', 'error': 'stale_scan', 'ticket_code': 'P550-001',
+            'boat': {'name': 'Albatros', 'sail_number': 'CZE1234'}, 'timestamp': '',
+        }
+        line = rfid_wire.encode_scan_result(data)
+        self.assertTrue(line.startswith('SS|P550-001'))
+        self.assertEqual(rfid_wire.decode_scan_result(line), {
+            'result': 'error', 'error': 'stale_scan', 'ticket_code': 'P550-001',
+            'boat': {'name': 'Albatros', 'sail_number': 'CZE1234'},
+        })
+
+    def test_pairing_session_fields_round_trip(self):
+        data = {'result': 'ok', 'ticket_code': 'P550-001', 'next_ticket': 'P550-002', 'remaining': 0}
+        line = rfid_wire.encode_scan_result(data)
+        self.assertEqual(line, 'OK|P550-001||||P550-002|0')
+        self.assertEqual(rfid_wire.decode_scan_result(line), data)
+
+    def test_separator_in_text_is_replaced(self):
+        line = rfid_wire.encode_scan_result({
+            'result': 'error', 'error': 'lost', 'ticket_code': 'P550-001',
+            'boat': {'name': 'A|B\nC'},
+        })
+        self.assertEqual(rfid_wire.decode_scan_result(line)['boat'], {'name': 'A B C'})
+
+    def test_reader_state_round_trip(self):
+        for state in (
+            {'mode': 'scanning', 'boats_on_water': 12, 'boats_ashore': 8, 'version': 1776508200123},
+            {'mode': 'pairing', 'boats_on_water': 0, 'boats_ashore': 0, 'version': 5,
+             'pairing_ticket': 'P550-027'},
+        ):
+            line = rfid_wire.encode_reader_state(state)
+            self.assertEqual(rfid_wire.decode_reader_state(line), state)
+        self.assertEqual(rfid_wire.encode_reader_state(state), '5|0|0|P550-027')
+
+    def test_form_fields_accept_short_and_long_keys(self):
+        self.assertEqual(
+            rfid_wire.scan_request_fields({'m': 'departure', 'rfid_uid': 'AA'}),
+            {'module_id': 'departure', 'rfid_uid': 'AA', 'scan_id': ''},
+        )
+
+
+@override_settings(RFID_API_KEY='testkey')
+class RfidCompactClientTest(TestCase):
+    """The reference client against the real views."""
+
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        rfid_telemetry.flush()
+        self.http = Client()
+        user = User.objects.create_user(username='owner')
+        boat_class = BoatClass.objects.get_or_create(
+            name='P550', defaults={'category': BoatClass.Category.SAIL, 'order': 1},
+        )[0]
+        self.boat = Boat.objects.create(
+            created_by=user, boat_class=boat_class, name='Albatros', sail_number='CZE1234',
+            contact_person='Leader', contact_phone='123456789', hull_color='white',
+        )
+        self.ticket = SailTicket.objects.create(
+            code='P550-001', color=SailTicket.Color.P550, boat=self.boat, rfid_uid='AABBCCDD',
+        )
+        base_url = reverse('SkaRe:rfid_alive').removesuffix('/api/rfid/alive/')
+        self.departure = rfid_wire.RfidCompactClient(
+            base_url, 'testkey', 'departure', transport=self.transport,
+        )
+        self.responses = []
+
+    def transport(self, method, url, body, headers):
+        content_type = headers.pop('Content-Type', None)
+        if method == 'GET':
+            response = self.http.get(url, headers=headers)
+        else:
+            response = self.http.post(url, body, content_type=content_type, headers=headers)
+        self.responses.append(response)
+        return response.status_code, response.content
+
+    def test_scan_transitions_ticket(self):
+        self.assertEqual(self.departure.scan('AABBCCDD', scan_id='d-1'), {
+            'result': 'ok',
+            'ticket_code': 'P550-001',
+            'new_status': 'on_water',
+            'boat': {'name': 'Albatros', 'sail_number': 'CZE1234'},
+        })
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, SailTicket.Status.ON_WATER)
+        self.assertLess(len(self.responses[-1].content), 40)
+
+    def test_scan_matches_json_response(self):
+        compact = self.departure.scan('AABBCCDD')
+        cache.clear()
+        SailTicket.objects.filter(pk=self.ticket.pk).update(status=SailTicket.Status.ASHORE)
+        response = self.http.post(
+            reverse('SkaRe:rfid_scan'),
+            json.dumps({'module_id': 'departure', 'rfid_uid': 'AABBCCDD'}),
+            content_type='application/json', HTTP_AUTHORIZATION='Bearer testkey',
+        )
+        full = response.json()
+        self.assertEqual(compact['ticket_code'], full['ticket_code'])
+        self.assertEqual(compact['new_status'], full['new_status'])
+        self.assertEqual(compact['boat']['name'], full['boat']['name'])
+
+    def test_scan_errors(self):
+        self.assertEqual(self.departure.scan('FFFF'), {'result': 'error', 'error': 'unknown_card'})
+        self.assertEqual(self.responses[-1].content, b'UC')
+        self.departure.scan('AABBCCDD')
+        cache.clear()
+        self.assertEqual(self.departure.scan('AABBCCDD')['error'], 'already_on_water')
+
+    def test_pairing_session_scan(self):
+        ticket = SailTicket.objects.create(code='P550-002', color=SailTicket.Color.P550)
+        session = PairingSession.objects.create(module_id='desk-1')
+        PairingSessionItem.objects.create(session=session, ticket=ticket, position=0)
+        desk = rfid_wire.RfidCompactClient('', 'testkey', 'desk-1', transport=self.transport)
+        self.assertEqual(desk.scan('11223344'), {
+            'result': 'ok', 'ticket_code': 'P550-002', 'remaining': 0,
+        })
+
+    def test_alive_and_not_modified(self):
+        state = self.departure.alive()
+        self.assertEqual(state['mode'], 'scanning')
+        self.assertEqual((state['boats_on_water'], state['boats_ashore']), (0, 1))
+        self.assertIsNone(self.departure.alive())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.departure.scan('AABBCCDD')
+        self.assertEqual(self.departure.alive()['boats_on_water'], 1)
+        self.assertIn('Accept', self.responses[-1]['Vary'])
+
+    def test_alive_pairing_mode(self):
+        SailTicket.objects.create(code='P550-002', color=SailTicket.Color.P550, pending_pairing=True)
+        self.assertEqual(self.departure.alive()['pairing_ticket'], 'P550-002')
+
+    def test_json_stays_default(self):
+        response = self.http.post(
+            reverse('SkaRe:rfid_scan'), 'm=departure&u=AABBCCDD',
+            content_type=rfid_wire.FORM_CONTENT_TYPE, HTTP_AUTHORIZATION='Bearer testkey',
+        )
+        self.assertEqual(response.json()['result'], 'ok')
+
+    def test_invalid_compact_request_returns_400(self):
+        response = self.http.post(
+            reverse('SkaRe:rfid_scan'), 'm=exit&u=AABBCCDD',
+            content_type=rfid_wire.FORM_CONTENT_TYPE,
+            HTTP_AUTHORIZATION='Bearer testkey', HTTP_ACCEPT='text/plain',
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(RFID_API_KEY='testkey')
+class RfidCompactAsyncScanTest(TransactionTestCase):
+    """The async scan uses its own connection and only sees committed data."""
+
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        user = User.objects.create_user(username='owner')
+        boat_class = BoatClass.objects.get_or_create(
+            name='P550', defaults={'category': BoatClass.Category.SAIL, 'order': 1},
+        )[0]
+        boat = Boat.objects.create(
+            created_by=user, boat_class=boat_class, name='Albatros', sail_number='CZE1234',
+            contact_person='Leader', contact_phone='123456789', hull_color='white',
+        )
+        SailTicket.objects.create(
+            code='P550-001', color=SailTicket.Color.P550, boat=boat, rfid_uid='AABBCCDD',
+        )
+
+    async def test_async_scan(self):
+        request = AsyncRequestFactory().post(
+            '/', 'm=departure&u=AABBCCDD', content_type=rfid_wire.FORM_CONTENT_TYPE,
+            headers={'Authorization': 'Bearer testkey', 'Accept': 'text/plain'},
+        )
+        response = await rfid_scan_async(request)
+        self.assertEqual(response.content, b'OK|P550-001|W|Albatros|CZE1234')
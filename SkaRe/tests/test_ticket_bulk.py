@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User, Group
@@ -198,6 +199,7 @@ class TicketCreateBulkViewTest(TestCase):
         self.desk = _make_infodesk()
         self.client.login(username='desk', password='pw')
         self.owner = User.objects.create_user('owner', password='pw')
+        cache.clear()
 
     def _post(self, extra=None):
         data = {
@@ -208,7 +210,12 @@ class TicketCreateBulkViewTest(TestCase):
         }
         if extra:
             data.update(extra)
-        return self.client.post(reverse('SkaRe:ticket_create_bulk'), data)
+        url = reverse('SkaRe:ticket_create_bulk')
+        if data.pop('confirm', None):
+            # Confirm the plan of a preview with the same values
+            data['plan_token'] = self.client.post(url, data).context['plan_token']
+            data['confirm'] = '1'
+        return self.client.post(url, data)
 
     def test_get_renders_form_no_plan(self):
         response = self.client.get(reverse('SkaRe:ticket_create_bulk'))
@@ -0,0 +1,128 @@
+import glob
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from SkaRe import rfid_rate_limit, ticket_log_buffer
+from SkaRe.models import SailTicket, SailTicketLog
+from SkaRe.ticket_log_buffer import flush, log_ticket_change
+
+
+class TicketLogSyncTest(TestCase):
+    def test_writes_immediately_by_default(self):
+        ticket = SailTicket.objects.create(code='P550-001', color=SailTicket.Color.P550)
+        log_ticket_change(ticket, status=SailTicket.Status.ON_WATER, note='x')
+        log = SailTicketLog.objects.get()
+        self.assertEqual((log.ticket, log.status, log.note), (ticket, 'on_water', 'x'))
+
+
+class TicketLogWriteBehindTest(TestCase):
+    def setUp(self):
+        rfid_rate_limit.reset()
+        self.spill_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spill_dir)
+        override = override_settings(
+            TICKET_LOG_WRITE_BEHIND=True,
+            # Keep the background flusher asleep; tests flush explicitly
+            TICKET_LOG_FLUSH_INTERVAL_MS=3600 * 1000,
+            TICKET_LOG_FLUSH_BATCH=10 ** 6,
+            TICKET_LOG_QUEUE_SIZE=2,
+            TICKET_LOG_SPILL_DIR=self.spill_dir,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        flush()
+        ticket_log_buffer._queue = None
+        self.ticket = SailTicket.objects.create(code='P550-001', color=SailTicket.Color.P550)
+
+    def test_entries_are_written_on_flush(self):
+        changed_at = now() - timedelta(minutes=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            log_ticket_change(self.ticket, status='on_water', changed_at=changed_at)
+        self.assertFalse(SailTicketLog.objects.exists())
+        self.assertEqual(flush(), 1)
+        log = SailTicketLog.objects.get()
+        self.assertEqual(log.changed_at, changed_at)
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            log_ticket_change(self.ticket, status='on_water')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(flush(), 0)
+
+    def test_full_queue_spills_to_file(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                log_ticket_change(self.ticket, status='on_water')
+        self.assertEqual(len(glob.glob(os.path.join(self.spill_dir, '*.jsonl'))), 1)
+        self.assertEqual(flush(), 3)
+        self.assertEqual(SailTicketLog.objects.count(), 3)
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def _spill_entry(self, ticket_id, note):
+        ticket_log_buffer._spill([{
+            'ticket_id': ticket_id,
+            'status': 'ashore',
+            'changed_at': now(),
+            'changed_by_id': None,
+            'note': note,
+        }])
+
+    def test_entries_of_deleted_tickets_are_dropped(self):
+        doomed = SailTicket.objects.create(code='P550-002', color=SailTicket.Color.P550)
+        self._spill_entry(doomed.pk, 'orphaned')
+        self._spill_entry(self.ticket.pk, 'kept')
+        doomed.delete()
+        with self.assertLogs('SkaRe.ticket_log_buffer', 'WARNING'):
+            self.assertEqual(flush(), 1)
+        self.assertEqual(SailTicketLog.objects.get().note, 'kept')
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_unwritable_spill_file_is_set_aside(self):
+        with open(os.path.join(self.spill_dir, 'ticket-log-spill-0-bad.jsonl'), 'w') as f:
+            f.write('{"ticket_id": \n')
+        self._spill_entry(self.ticket.pk, 'after')
+        with self.assertLogs('SkaRe.ticket_log_buffer', 'ERROR'):
+            self.assertEqual(flush(), 1)
+        self.assertEqual(SailTicketLog.objects.get().note, 'after')
+        self.assertEqual(os.listdir(self.spill_dir), ['ticket-log-spill-0-bad.jsonl.failed'])
+        self.assertEqual(flush(), 0)
+
+    def test_spill_files_from_other_workers_are_written(self):
+        changed_at = now()
+        ticket_log_buffer._spill([{
+            'ticket_id': self.ticket.pk,
+            'status': 'ashore',
+            'changed_at': changed_at,
+            'changed_by_id': None,
+            'note': 'spilled',
+        }])
+        self.assertEqual(flush(), 1)
+        log = SailTicketLog.objects.get()
+        self.assertEqual((log.note, log.changed_at), ('spilled', changed_at))
+
+    def test_rfid_scan_defers_the_log(self):
+        from django.contrib.auth.models import User
+        from SkaRe.models import Boat
+        from django.urls import reverse
+        owner = User.objects.create_user(username='owner')
+        boat = Boat.objects.create(
+            created_by=owner, name='A', hull_color='white',
+            contact_person='X', contact_phone='123456789',
+        )
+        SailTicket.objects.filter(pk=self.ticket.pk).update(boat=boat, rfid_uid='AABB')
+        with self.settings(RFID_API_KEY='k'), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('SkaRe:rfid_scan'),
+                data='{"module_id": "departure", "rfid_uid": "AABB"}',
+                content_type='application/json',
+                HTTP_AUTHORIZATION='Bearer k',
+            )
+        self.assertEqual(response.json()['result'], 'ok')
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, SailTicket.Status.ON_WATER)
+        self.assertFalse(SailTicketLog.objects.exists())
+        flush()
+        self.assertEqual(SailTicketLog.objects.get().status, 'on_water')
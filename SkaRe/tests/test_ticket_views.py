@@ -1,7 +1,14 @@
-from django.test import TestCase, Client
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from django.utils.timezone import now
 from django.contrib.auth.models import User, Group
-from SkaRe.models import SailTicket, SailTicketLog, Boat, BoatClass
+from SkaRe import dashboard_counters, rfid_telemetry
+from SkaRe.models import (
+    SailTicket, SailTicketLog, Boat, BoatClass, RfidReader, PairingSession,
+)
 
 
 def _make_infodesk():
@@ -69,6 +76,55 @@ class TicketListViewTest(TestCase):
         self.assertContains(response, 'P550-001')
         self.assertNotContains(response, 'SAIL-001')
 
+    def test_list_script_tags_are_balanced(self):
+        _make_ticket('P550-001')
+        response = self.client.get(reverse('SkaRe:ticket_list'))
+        tags = re.findall(r'<(/?)script\b', response.content.decode())
+        self.assertTrue(tags)
+        # every block closes before the next one opens
+        self.assertEqual(tags, ['', '/'] * (len(tags) // 2))
+
+    def _codes(self, response):
+        return [t.code for t in response.context['tickets']]
+
+    @override_settings(TICKET_LIST_PAGE_SIZE=2)
+    def test_list_pages_by_code(self):
+        for code in ('P550-1', 'P550-2', 'P550-3', 'P550-4', 'P550-5'):
+            _make_ticket(code)
+        _make_ticket('SAIL-1', SailTicket.Color.SAIL)
+        url = reverse('SkaRe:ticket_list')
+        response = self.client.get(url, {'color': 'p550'})
+        self.assertEqual(self._codes(response), ['P550-1', 'P550-2'])
+        self.assertIsNone(response.context['previous_query'])
+        self.assertEqual(response.context['next_query'], 'color=p550&after=P550-2')
+
+        response = self.client.get(url + '?' + response.context['next_query'])
+        self.assertEqual(self._codes(response), ['P550-3', 'P550-4'])
+        response = self.client.get(url + '?' + response.context['next_query'])
+        self.assertEqual(self._codes(response), ['P550-5'])
+        self.assertIsNone(response.context['next_query'])
+
+        response = self.client.get(url + '?' + response.context['previous_query'])
+        self.assertEqual(self._codes(response), ['P550-3', 'P550-4'])
+        response = self.client.get(url + '?' + response.context['previous_query'])
+        self.assertEqual(self._codes(response), ['P550-1', 'P550-2'])
+        self.assertIsNone(response.context['previous_query'])
+
+    def test_list_counts_in_one_query(self):
+        _make_ticket('P550-1', status=SailTicket.Status.ON_WATER)
+        _make_ticket('P550-2', status=SailTicket.Status.LOST)
+        _make_ticket('SAIL-1', SailTicket.Color.SAIL, status=SailTicket.Status.ON_WATER)
+        url = reverse('SkaRe:ticket_list')
+        # session, user, group check, page, counts, group check of the menu
+        with self.assertNumQueries(6):
+            response = self.client.get(url, {'color': 'p550'})
+        self.assertEqual(response.context['ticket_count'], 2)
+        self.assertEqual(response.context['ticket_total'], 3)
+        self.assertEqual(
+            response.context['status_counts'],
+            {'ashore': 0, 'on_water': 1, 'lost': 1},
+        )
+
 
 class TicketDetailViewTest(TestCase):
     def setUp(self):
@@ -94,6 +150,40 @@ class TicketDetailViewTest(TestCase):
         self.assertContains(response, 'on_water')
 
 
+class TicketBoatSuggestTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.desk = _make_infodesk()
+        self.client.login(username='desk', password='pw')
+        self.owner = User.objects.create_user(username='owner', password='pw')
+
+    def _suggest(self, q):
+        response = self.client.get(reverse('SkaRe:ticket_boat_suggest'), {'q': q})
+        return [r['name'] for r in response.json()['results']]
+
+    def test_suggests_only_boats_without_ticket(self):
+        assigned = _make_boat(self.owner, name='Albatros', sail_number='CZE 1')
+        _make_boat(self.owner, name='Albatros II', sail_number='CZE 2')
+        _make_ticket('P550-1', boat=assigned)
+        self.assertEqual(self._suggest('albatros'), ['Albatros II'])
+        self.assertEqual(self._suggest('CZE 2'), ['Albatros II'])
+        self.assertEqual(self._suggest('CZE 1'), [])
+        self.assertEqual(self._suggest(''), [])
+
+    def test_suggestions_are_limited(self):
+        for n in range(20):
+            _make_boat(self.owner, name=f'Racek {n}', sail_number='')
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self._suggest('racek')), 15)
+
+    def test_detail_does_not_list_boats(self):
+        _make_boat(self.owner, name='Racek')
+        ticket = _make_ticket('P550-1')
+        response = self.client.get(reverse('SkaRe:ticket_detail', kwargs={'ticket_id': ticket.pk}))
+        self.assertContains(response, reverse('SkaRe:ticket_boat_suggest'))
+        self.assertNotContains(response, 'Racek')
+
+
 class TicketSetStatusTest(TestCase):
     def setUp(self):
         self.client = Client()
@@ -142,6 +232,71 @@ class TicketSetStatusTest(TestCase):
         )
 
 
+class TicketBulkSetStatusTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.desk = _make_infodesk()
+        self.client.login(username='desk', password='pw')
+        self.url = reverse('SkaRe:ticket_bulk_set_status')
+
+    def test_sets_status_of_filtered_tickets(self):
+        sail = [
+            _make_ticket(f'SAIL-{n}', color=SailTicket.Color.SAIL, status=SailTicket.Status.ON_WATER)
+            for n in range(1, 4)
+        ]
+        other = _make_ticket('P550-1', status=SailTicket.Status.ON_WATER)
+        ashore = _make_ticket('SAIL-9', color=SailTicket.Color.SAIL)
+        next_url = reverse('SkaRe:ticket_list') + '?color=sail'
+        response = self.client.post(self.url, {
+            'new_status': 'ashore', 'scope': 'filter',
+            'status': 'on_water', 'color': 'sail', 'next': next_url,
+        })
+        self.assertRedirects(response, next_url)
+        self.assertEqual(
+            set(SailTicket.objects.filter(status='ashore').values_list('pk', flat=True)),
+            {t.pk for t in sail} | {ashore.pk},
+        )
+        other.refresh_from_db()
+        self.assertEqual(other.status, SailTicket.Status.ON_WATER)
+        self.assertEqual(SailTicketLog.objects.filter(changed_by=self.desk).count(), 3)
+
+    def test_sets_status_of_selected_tickets(self):
+        first, second, third = (_make_ticket(f'P550-{n}') for n in range(1, 4))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {
+                'new_status': 'on_water', 'ticket_ids': [first.pk, third.pk],
+            })
+        self.assertEqual(
+            list(SailTicket.objects.filter(status='on_water').values_list('code', flat=True)),
+            ['P550-1', 'P550-3'],
+        )
+        first.refresh_from_db()
+        self.assertIsNotNone(first.on_water_since)
+
+    def test_skips_tickets_already_in_status(self):
+        _make_ticket('P550-1', status=SailTicket.Status.LOST)
+        _make_ticket('P550-2')
+        response = self.client.post(self.url, {'new_status': 'lost', 'scope': 'filter'}, follow=True)
+        self.assertEqual(SailTicketLog.objects.count(), 1)
+        self.assertContains(response, '1 tickets set to')
+
+    def test_query_count_does_not_grow_with_selection(self):
+        tickets = [_make_ticket(f'P550-{n}') for n in range(1, 21)]
+        ids = [t.pk for t in tickets]
+        dashboard_counters.reconcile()
+        # session, user, group check, savepoint, tickets, open trips, trip insert,
+        # ticket update, dashboard counter, log insert, release
+        with self.assertNumQueries(11):
+            self.client.post(self.url, {'new_status': 'on_water', 'ticket_ids': ids})
+        self.assertEqual(SailTicket.objects.filter(status='on_water').count(), 20)
+
+    def test_invalid_input(self):
+        self.assertEqual(self.client.post(self.url, {'new_status': 'flying'}).status_code, 400)
+        response = self.client.post(self.url, {'new_status': 'lost', 'ticket_ids': ['x']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+
 class TicketPairRfidTest(TestCase):
     def setUp(self):
         self.client = Client()
@@ -199,6 +354,42 @@ class TicketLookupTest(TestCase):
         response = self.client.get(url)
         self.assertContains(response, 'P550-002')
 
+    def _suggest(self, q):
+        response = self.client.get(reverse('SkaRe:ticket_lookup_suggest'), {'q': q})
+        return [r['code'] for r in response.json()['results']]
+
+    def test_suggest_ignores_diacritics_and_matches_prefixes(self):
+        _make_ticket('P550-001', boat=_make_boat(self.owner, name='Žlutá Žába'))
+        _make_ticket('P550-002', boat=_make_boat(self.owner, name='Albatros'))
+        self.assertEqual(self._suggest('zlut zab'), ['P550-001'])
+        self.assertEqual(self._suggest('ŽÁBA'), ['P550-001'])
+        self.assertEqual(self._suggest('alba'), ['P550-002'])
+        self.assertEqual(self._suggest('zaba alba'), [])
+
+    def test_suggest_matches_codes_and_sail_numbers(self):
+        _make_ticket('P550-042', boat=_make_boat(self.owner, sail_number='CZE 12'))
+        self.assertEqual(self._suggest('42'), ['P550-042'])
+        self.assertEqual(self._suggest('p550-04'), ['P550-042'])
+        self.assertEqual(self._suggest('CZE12'), ['P550-042'])
+
+    def test_index_follows_boat_and_ticket_changes(self):
+        boat = _make_boat(self.owner, name='Albatros')
+        ticket = _make_ticket('P550-001', boat=boat)
+        Boat.objects.filter(pk=boat.pk).update(name='Racek')
+        self.assertEqual(self._suggest('racek'), ['P550-001'])
+        self.assertEqual(self._suggest('albatros'), [])
+        SailTicket.objects.filter(pk=ticket.pk).update(boat=None)
+        self.assertEqual(self._suggest('racek'), [])
+        ticket.delete()
+        self.assertEqual(self._suggest('p550'), [])
+
+    def test_suggest_is_limited(self):
+        for n in range(15):
+            _make_ticket(f'P550-{n:03}')
+        self.assertEqual(len(self._suggest('p550')), 10)
+        self.assertEqual(self._suggest(''), [])
+        self.assertEqual(self._suggest('"*'), [])
+
 
 class BulkTicketCreateTest(TestCase):
     def setUp(self):
@@ -206,6 +397,13 @@ class BulkTicketCreateTest(TestCase):
         self.desk = _make_infodesk()
         self.client.login(username='desk', password='pw')
         self.owner = User.objects.create_user(username='owner', password='pw')
+        cache.clear()
+
+    def _confirm(self, data):
+        """Preview the plan, then confirm it with the token from the preview."""
+        url = reverse('SkaRe:ticket_create_bulk')
+        token = self.client.post(url, data).context['plan_token']
+        return self.client.post(url, {**data, 'confirm': '1', 'plan_token': token})
 
     def test_get_shows_form(self):
         url = reverse('SkaRe:ticket_create_bulk')
@@ -214,13 +412,11 @@ class BulkTicketCreateTest(TestCase):
 
     def test_creates_boat_tickets_and_reserves(self):
         _make_boat(self.owner)  # one P550 boat
-        url = reverse('SkaRe:ticket_create_bulk')
-        response = self.client.post(url, {
+        response = self._confirm({
             'p550_reserves': 2,
             'sail_reserves': 0,
             'other_reserves': 0,
             'spare_count': 1,
-            'confirm': '1',
         })
         self.assertRedirects(response, reverse('SkaRe:ticket_list'))
         # 1 boat ticket + 2 reserves + 1 spare = 4
@@ -228,21 +424,17 @@ class BulkTicketCreateTest(TestCase):
 
     def test_boat_ticket_has_boat_fk_set(self):
         boat = _make_boat(self.owner)
-        url = reverse('SkaRe:ticket_create_bulk')
-        self.client.post(url, {
+        self._confirm({
             'p550_reserves': 0, 'sail_reserves': 0,
             'other_reserves': 0, 'spare_count': 0,
-            'confirm': '1',
         })
         ticket = SailTicket.objects.filter(boat=boat).first()
         self.assertIsNotNone(ticket)
 
     def test_spare_tickets_have_no_boat(self):
-        url = reverse('SkaRe:ticket_create_bulk')
-        self.client.post(url, {
+        self._confirm({
             'p550_reserves': 0, 'sail_reserves': 0,
             'other_reserves': 0, 'spare_count': 3,
-            'confirm': '1',
         })
         spares = SailTicket.objects.filter(color=SailTicket.Color.SPARE)
         self.assertEqual(spares.count(), 3)
@@ -251,17 +443,121 @@ class BulkTicketCreateTest(TestCase):
     def test_skips_boats_already_assigned_a_ticket(self):
         boat = _make_boat(self.owner)
         _make_ticket('P550-001', boat=boat)
-        url = reverse('SkaRe:ticket_create_bulk')
-        self.client.post(url, {
+        self._confirm({
             'p550_reserves': 0, 'sail_reserves': 0,
             'other_reserves': 0, 'spare_count': 0,
-            'confirm': '1',
         })
         # Bulk create wipes all tickets and re-creates; boat gets exactly one ticket
         self.assertEqual(SailTicket.objects.filter(boat=boat).count(), 1)
         # Total tickets: 1 (just the one boat)
         self.assertEqual(SailTicket.objects.count(), 1)
 
+    def test_confirm_commits_previewed_plan(self):
+        data = {'p550_reserves': 1, 'sail_reserves': 0, 'other_reserves': 0, 'spare_count': 0}
+        url = reverse('SkaRe:ticket_create_bulk')
+        token = self.client.post(url, data).context['plan_token']
+        # Confirming with other form values than previewed is refused
+        response = self.client.post(url, {**data, 'spare_count': 5, 'confirm': '1', 'plan_token': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SailTicket.objects.count(), 0)
+        response = self.client.post(url, {**data, 'confirm': '1', 'plan_token': token})
+        self.assertRedirects(response, reverse('SkaRe:ticket_list'))
+        self.assertEqual(list(SailTicket.objects.values_list('code', flat=True)), ['P550-1'])
+        # The token is single-use
+        response = self.client.post(url, {**data, 'confirm': '1', 'plan_token': token})
+        self.assertEqual(response.status_code, 200)
+
+    def test_confirm_rejects_plan_when_boats_changed(self):
+        data = {'p550_reserves': 0, 'sail_reserves': 0, 'other_reserves': 0, 'spare_count': 0}
+        url = reverse('SkaRe:ticket_create_bulk')
+        token = self.client.post(url, data).context['plan_token']
+        boat = _make_boat(self.owner)
+        response = self.client.post(url, {**data, 'confirm': '1', 'plan_token': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SailTicket.objects.count(), 0)
+        # The preview shown instead includes the new boat
+        self.assertEqual([t.boat for t in response.context['plan']], [boat])
+
+        token = response.context['plan_token']
+        boat.name = 'Racek'
+        boat.save()
+        response = self.client.post(url, {**data, 'confirm': '1', 'plan_token': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SailTicket.objects.count(), 0)
+
+    def _reconcile(self, confirm=True, **counts):
+        data = {
+            'mode': 'reconcile', 'p550_reserves': 0, 'sail_reserves': 0,
+            'other_reserves': 0, 'spare_count': 0, **counts,
+        }
+        if confirm:
+            return self._confirm(data)
+        return self.client.post(reverse('SkaRe:ticket_create_bulk'), data)
+
+    def test_reconcile_keeps_existing_tickets(self):
+        boat = _make_boat(self.owner)
+        self._reconcile(spare_count=1)
+        ticket = SailTicket.objects.get(boat=boat)
+        ticket.rfid_uid = 'AA:BB'
+        ticket.status = SailTicket.Status.ON_WATER
+        ticket.save()
+        SailTicketLog.objects.create(ticket=ticket, status=ticket.status)
+
+        late = _make_boat(self.owner, name='Racek', sail_number='')
+        response = self._reconcile(spare_count=1)
+        self.assertRedirects(response, reverse('SkaRe:ticket_list'))
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.rfid_uid, 'AA:BB')
+        self.assertEqual(ticket.status, SailTicket.Status.ON_WATER)
+        self.assertEqual(ticket.logs.count(), 1)
+        self.assertEqual(SailTicket.objects.get(boat=late).code, 'P550-1')
+        self.assertEqual(SailTicket.objects.count(), 3)
+
+    def test_reconcile_reassigns_reserves_and_retires_used_tickets(self):
+        self._reconcile(p550_reserves=2)
+        used = SailTicket.objects.get(code='P550-2')
+        SailTicketLog.objects.create(ticket=used, status=used.status)
+
+        boat = _make_boat(self.owner, sail_number='')
+        self._reconcile(p550_reserves=0)
+        self.assertEqual(SailTicket.objects.get(code='P550-1').boat, boat)
+        # P550-2 is no longer planned; it has history, so it is kept without a boat
+        used.refresh_from_db()
+        self.assertIsNone(used.boat)
+        self.assertEqual(SailTicket.objects.count(), 2)
+        self.assertTrue(SailTicketLog.objects.filter(
+            ticket__code='P550-1', note__startswith='Boat reassigned',
+        ).exists())
+
+        self._reconcile(p550_reserves=0, spare_count=0)
+        self.assertEqual(SailTicket.objects.count(), 2)
+
+    def test_reconcile_deletes_unused_obsolete_tickets(self):
+        self._reconcile(spare_count=3)
+        self._reconcile(spare_count=1)
+        self.assertEqual(
+            list(SailTicket.objects.values_list('code', flat=True)), ['SPARE-1'],
+        )
+
+    def test_reconcile_leaves_tickets_on_water_alone(self):
+        boat = _make_boat(self.owner, sail_number='')
+        _make_ticket('P550-7', boat=boat, status=SailTicket.Status.ON_WATER)
+        response = self._reconcile(confirm=False)
+        self.assertContains(response, 'P550-7')
+        self.assertEqual(len(response.context['diff']['locked']), 1)
+        self._reconcile()
+        # The boat keeps its ticket on water; P550-1 is not created for it
+        self.assertEqual(
+            list(SailTicket.objects.values_list('code', 'boat')), [('P550-7', boat.pk)],
+        )
+
+    def test_reconcile_preview_changes_nothing(self):
+        _make_boat(self.owner)
+        response = self._reconcile(confirm=False, spare_count=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['diff']['create']), 3)
+        self.assertEqual(SailTicket.objects.count(), 0)
+
 
 class TicketOnWaterTest(TestCase):
     def setUp(self):
@@ -279,6 +575,167 @@ class TicketOnWaterTest(TestCase):
         self.assertContains(response, 'P550-001')
         self.assertNotContains(response, 'P550-002')
 
+    def _changes(self, after):
+        return self.client.get(reverse('SkaRe:ticket_on_water_changes'), {'after': after}).json()
+
+    def _set_status(self, ticket, status):
+        self.client.post(
+            reverse('SkaRe:ticket_set_status', kwargs={'ticket_id': ticket.pk}),
+            {'new_status': status},
+        )
+
+    def test_changes_since_cursor(self):
+        boat = _make_boat(self.owner, 'Albatros')
+        ticket = _make_ticket('P550-001', boat=boat)
+        cursor = self.client.get(reverse('SkaRe:ticket_on_water')).context['cursor']
+        self.assertEqual(self._changes(cursor), {'cursor': cursor, 'upsert': [], 'remove': []})
+
+        self._set_status(ticket, 'on_water')
+        data = self._changes(cursor)
+        self.assertEqual([row['id'] for row in data['upsert']], [ticket.pk])
+        self.assertIn('Albatros', data['upsert'][0]['html'])
+        self.assertGreater(data['cursor'], cursor)
+
+        self._set_status(ticket, 'ashore')
+        data = self._changes(data['cursor'])
+        self.assertEqual((data['upsert'], data['remove']), ([], [ticket.pk]))
+
+    def test_changes_query_count_does_not_grow_with_fleet(self):
+        for n in range(20):
+            _make_ticket(f'P550-{n:03}', status=SailTicket.Status.ON_WATER)
+        ticket = SailTicket.objects.first()
+        SailTicketLog.objects.create(ticket=ticket, status='on_water')
+        # Session, user and InfoDesk group for the permission check, then logs and tickets
+        with self.assertNumQueries(5):
+            data = self._changes(0)
+        self.assertEqual(len(data['upsert']), 1)
+
+    def test_unknown_cursor_asks_for_reload(self):
+        self.assertEqual(self._changes(999), {'reset': True})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('SkaRe:ticket_on_water_changes'), {'after': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TicketReadersTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.desk = _make_infodesk()
+        self.client.login(username='desk', password='pw')
+        self.url = reverse('SkaRe:ticket_readers')
+        # Drain telemetry buffered by other tests
+        rfid_telemetry.flush()
+        RfidReader.objects.all().delete()
+
+    def test_lists_known_modules_as_offline(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        modules = [r.module_id for r in response.context['readers']]
+        self.assertEqual(modules, ['arrival', 'departure'])
+        self.assertFalse(any(r.online for r in response.context['readers']))
+
+    def test_shows_reader_totals(self):
+        RfidReader.objects.create(
+            module_id='departure', label='Gate A', last_heartbeat_at=now(),
+            scans=7, lost_count=2, throttled_count=3,
+        )
+        response = self.client.get(self.url)
+        reader = next(r for r in response.context['readers'] if r.module_id == 'departure')
+        self.assertTrue(reader.online)
+        self.assertContains(response, 'Gate A')
+        self.assertEqual(reader.throttled_count, 3)
+        self.assertIn('key', response.context['rate_limit_rejected'])
+
+    def test_requires_infodesk(self):
+        User.objects.create_user(username='plain', password='pw')
+        self.client.login(username='plain', password='pw')
+        response = self.client.get(self.url)
+        self.assertNotEqual(response.status_code, 200)
+
+
+class PairingSessionViewsTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.desk = _make_infodesk()
+        self.client.login(username='desk', password='pw')
+        self.url = reverse('SkaRe:pairing_session_list')
+        for code in ('P550-10', 'P550-2', 'P550-1', 'SAIL-1'):
+            _make_ticket(code)
+
+    def _start(self, **data):
+        return self.client.post(self.url, {'module_id': 'desk-1', **data})
+
+    def test_start_queues_matching_tickets_in_natural_order(self):
+        response = self._start(code_prefix='P550-')
+        session = PairingSession.objects.get()
+        self.assertRedirects(response, reverse('SkaRe:pairing_session_detail', args=[session.pk]))
+        self.assertEqual(
+            [i.ticket.code for i in session.items.all()],
+            ['P550-1', 'P550-2', 'P550-10'],
+        )
+        self.assertEqual(session.created_by, self.desk)
+
+    def test_start_skips_paired_lost_and_queued_tickets(self):
+        SailTicket.objects.filter(code='P550-1').update(rfid_uid='CARD')
+        SailTicket.objects.filter(code='P550-2').update(status=SailTicket.Status.LOST)
+        self._start(code_prefix='P550-', limit=1)
+        self._start(module_id='desk-2', color=SailTicket.Color.P550)
+        first, second = PairingSession.objects.order_by('pk')
+        self.assertEqual([i.ticket.code for i in first.items.all()], ['P550-10'])
+        self.assertEqual([i.ticket.code for i in second.items.all()], ['SAIL-1'])
+
+    def test_rejects_gate_module_and_second_open_session(self):
+        self._start(module_id='departure')
+        self.assertFalse(PairingSession.objects.exists())
+        self._start(code_prefix='P550-1')
+        self._start()
+        self.assertEqual(PairingSession.objects.count(), 1)
+
+    def test_detail_and_close(self):
+        self._start()
+        session = PairingSession.objects.get()
+        response = self.client.get(reverse('SkaRe:pairing_session_detail', args=[session.pk]))
+        self.assertContains(response, 'P550-1')
+        self.assertEqual(response.context['next_item'].ticket.code, 'P550-1')
+        self.client.post(reverse('SkaRe:pairing_session_close', args=[session.pk]))
+        session.refresh_from_db()
+        self.assertIsNotNone(session.closed_at)
+
+
+class TicketImportManifestTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.desk = _make_infodesk()
+        self.client.login(username='desk', password='pw')
+        self.url = reverse('SkaRe:ticket_import_manifest')
+        self.ticket = _make_ticket('P550-001')
+
+    def _upload(self, content, **data):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        manifest = SimpleUploadedFile('cards.csv', content.encode('utf-8'), content_type='text/csv')
+        return self.client.post(self.url, {'manifest': manifest, **data})
+
+    def test_upload_pairs_tickets(self):
+        response = self._upload('code,rfid_uid\nP550-001,AABB\n')
+        self.assertTrue(response.context['report']['applied'])
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.rfid_uid, 'AABB')
+        log = SailTicketLog.objects.get(ticket=self.ticket)
+        self.assertEqual(log.changed_by, self.desk)
+
+    def test_upload_reports_conflicts(self):
+        response = self._upload('P550-001,AABB\nP550-404,CCDD\n')
+        self.assertContains(response, 'P550-404')
+        self.assertFalse(response.context['report']['applied'])
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.rfid_uid, '')
+
+    def test_empty_file_is_rejected(self):
+        response = self._upload('\n')
+        self.assertIsNone(response.context['report'])
+        self.assertTrue(response.context['form'].errors)
+
 
 class TicketExportCsvTest(TestCase):
     def setUp(self):
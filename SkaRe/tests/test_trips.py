@@ -0,0 +1,201 @@
+import json
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from SkaRe import rfid_rate_limit, trips
+from SkaRe.models import SailTicket, SailTicketLog, Boat, Trip
+
+
+def _make_boat(name='Albatros'):
+    user = User.objects.get_or_create(username='owner')[0]
+    return Boat.objects.create(
+        created_by=user, name=name, contact_person='Leader',
+        contact_phone='123456789', hull_color='white',
+    )
+
+
+def _make_infodesk():
+    user = User.objects.create_user(username='desk', password='pw')
+    user.groups.add(Group.objects.get_or_create(name='InfoDesk')[0])
+    return user
+
+
+@override_settings(RFID_API_KEY='testkey', RFID_SCAN_DEBOUNCE_SECONDS=0)
+class TripScanTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rfid_rate_limit.reset()
+        self.boat = _make_boat()
+        self.ticket = SailTicket.objects.create(
+            code='P550-001', color=SailTicket.Color.P550, boat=self.boat, rfid_uid='AABB',
+        )
+
+    def _scan(self, module_id):
+        return self.client.post(
+            reverse('SkaRe:rfid_scan'),
+            data=json.dumps({'module_id': module_id, 'rfid_uid': 'AABB'}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer testkey',
+        ).json()
+
+    def test_departure_opens_and_arrival_closes_trip(self):
+        self._scan('departure')
+        trip = Trip.objects.get()
+        self.assertEqual((trip.ticket, trip.boat), (self.ticket, self.boat))
+        self.assertEqual(trip.departure_module, 'departure')
+        self.assertIsNone(trip.returned_at)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.on_water_since, trip.departed_at)
+        self._scan('arrival')
+        trip.refresh_from_db()
+        self.assertEqual(trip.arrival_module, 'arrival')
+        self.ticket.refresh_from_db()
+        self.assertIsNone(self.ticket.on_water_since)
+        self.assertEqual(trip.duration, trip.returned_at - trip.departed_at)
+
+    def test_duplicate_scan_keeps_single_trip(self):
+        self._scan('departure')
+        self.assertEqual(self._scan('departure')['error'], 'already_on_water')
+        self.assertEqual(Trip.objects.count(), 1)
+
+    def test_batch_uses_scan_times(self):
+        departed = now() - timedelta(hours=2)
+        returned = departed + timedelta(minutes=45)
+        self.client.post(
+            reverse('SkaRe:rfid_scan_batch'),
+            data=json.dumps({'scans': [
+                {'module_id': 'arrival', 'rfid_uid': 'AABB', 'scanned_at': returned.isoformat()},
+                {'module_id': 'departure', 'rfid_uid': 'AABB', 'scanned_at': departed.isoformat()},
+            ]}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer testkey',
+        )
+        trip = Trip.objects.get()
+        self.assertEqual(trip.duration, timedelta(minutes=45))
+
+
+class TripSetStatusTest(TestCase):
+    def setUp(self):
+        _make_infodesk()
+        self.client = Client()
+        self.client.login(username='desk', password='pw')
+        self.ticket = SailTicket.objects.create(
+            code='P550-001', color=SailTicket.Color.P550, boat=_make_boat(),
+        )
+
+    def _set_status(self, status):
+        self.client.post(
+            reverse('SkaRe:ticket_set_status', kwargs={'ticket_id': self.ticket.pk}),
+            {'new_status': status},
+        )
+
+    def test_manual_changes_open_and_close_trips(self):
+        self._set_status('on_water')
+        self.assertEqual(Trip.objects.get().departure_module, '')
+        self._set_status('lost')
+        trip = Trip.objects.get()
+        self.assertIsNotNone(trip.returned_at)
+        self._set_status('ashore')
+        self.assertEqual(Trip.objects.count(), 1)
+
+    def test_on_water_list_shows_departure_time(self):
+        self._set_status('on_water')
+        response = self.client.get(reverse('SkaRe:ticket_on_water'))
+        ticket = response.context['tickets'].get()
+        self.assertEqual(ticket.on_water_since, Trip.objects.get().departed_at)
+
+
+class TripBulkStatusTest(TestCase):
+    def setUp(self):
+        _make_infodesk()
+        self.client = Client()
+        self.client.login(username='desk', password='pw')
+        self.tickets = [
+            SailTicket.objects.create(code=f'SAIL-{n}', color=SailTicket.Color.SAIL, boat=_make_boat())
+            for n in range(3)
+        ]
+
+    def _bulk_status(self, status):
+        self.client.post(reverse('SkaRe:ticket_bulk_set_status'), {
+            'new_status': status, 'scope': 'filter', 'color': 'sail',
+        })
+
+    def test_bulk_changes_open_and_close_trips(self):
+        self._bulk_status('on_water')
+        self.assertEqual(Trip.objects.filter(returned_at__isnull=True).count(), 3)
+        self.assertEqual(
+            {t.boat_id for t in Trip.objects.all()}, {t.boat_id for t in self.tickets},
+        )
+        self._bulk_status('ashore')
+        self.assertFalse(Trip.objects.filter(returned_at__isnull=True).exists())
+        self.assertFalse(SailTicket.objects.filter(on_water_since__isnull=False).exists())
+        self._bulk_status('on_water')
+        self.assertEqual(Trip.objects.count(), 6)
+
+
+class TripBackfillTest(TestCase):
+    def setUp(self):
+        self.boat = _make_boat()
+        self.ticket = SailTicket.objects.create(
+            code='P550-001', color=SailTicket.Color.P550, boat=self.boat,
+        )
+        self.start = now() - timedelta(hours=5)
+
+    def _log(self, minutes, status):
+        SailTicketLog.objects.create(
+            ticket=self.ticket, status=status, changed_at=self.start + timedelta(minutes=minutes),
+        )
+
+    def test_trips_from_log(self):
+        self._log(0, 'on_water')
+        self._log(10, 'on_water')  # duplicate scan
+        self._log(30, 'ashore')
+        self._log(40, 'ashore')  # boat assignment note
+        self._log(60, 'on_water')
+        out = StringIO()
+        call_command('backfill_trips', stdout=out)
+        self.assertIn('2 trips created', out.getvalue())
+        closed, still_out = Trip.objects.order_by('departed_at')
+        self.assertEqual(closed.duration, timedelta(minutes=30))
+        self.assertEqual(closed.boat, self.boat)
+        self.assertIsNone(still_out.returned_at)
+
+    def test_skips_tickets_with_trips_unless_replace(self):
+        self._log(0, 'on_water')
+        self._log(20, 'lost')
+        self.assertEqual(trips.rebuild_trips(), 1)
+        self.assertEqual(trips.rebuild_trips(), 0)
+        self.assertEqual(trips.rebuild_trips(replace=True), 1)
+        self.assertEqual(Trip.objects.get().duration, timedelta(minutes=20))
+
+    def test_fills_in_history_before_the_first_recorded_trip(self):
+        self._log(0, 'on_water')
+        self._log(30, 'ashore')
+        self._log(60, 'on_water')  # never landed in the log
+        # Scanned out after the upgrade, before the backfill ran
+        departed = self.start + timedelta(minutes=120)
+        trips.record_status_change(self.ticket, 'ashore', 'on_water', departed)
+        self._log(120, 'on_water')
+        self.assertEqual(trips.rebuild_trips(), 2)
+        first, second, live = Trip.objects.order_by('departed_at')
+        self.assertEqual(first.duration, timedelta(minutes=30))
+        self.assertEqual(second.returned_at, departed)
+        self.assertIsNone(live.returned_at)
+        self.assertEqual(trips.rebuild_trips(), 0)
+
+    def test_status_changed_at_backfill_skips_repeated_statuses(self):
+        migration = import_module('SkaRe.migrations.0042_sailticket_status_changed_at')
+        self._log(0, 'on_water')
+        self._log(30, 'ashore')
+        self._log(40, 'ashore')  # boat assignment note
+        self._log(50, 'ashore')  # duplicate scan
+        migration.set_status_changed_at(django_apps, None)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status_changed_at, self.start + timedelta(minutes=30))
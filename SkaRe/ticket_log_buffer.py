@@ -0,0 +1,209 @@
+"""Optional write-behind pipeline for SailTicketLog inserts.
+
+With ``TICKET_LOG_WRITE_BEHIND`` off (the default) :func:`log_ticket_change`
+simply creates the log entry. With it on, the entry is queued once the
+surrounding transaction commits and a background thread writes queued entries
+with ``bulk_create`` every ``TICKET_LOG_FLUSH_INTERVAL_MS`` milliseconds, or
+sooner once ``TICKET_LOG_FLUSH_BATCH`` entries are waiting. The ticket state
+change itself stays synchronous; only the audit insert leaves the request.
+
+Entries are not dropped (except those of tickets deleted before the write):
+a batch that cannot be written (e.g. the SQLite database stays locked) and
+entries that do not fit in the bounded queue are spilled to JSON-lines files
+in ``TICKET_LOG_SPILL_DIR``. Spill files are
+written again on later flushes, including those of other or restarted
+workers, and the queue is flushed when the process exits.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+from .models import SailTicket, SailTicketLog
+
+logger = logging.getLogger(__name__)
+
+_SPILL_PATTERN = 'ticket-log-spill-*.jsonl'
+
+_queue = None
+_wake = threading.Event()
+_flush_lock = threading.Lock()
+_start_lock = threading.Lock()
+_thread = None
+
+
+def log_ticket_change(ticket, status, changed_by=None, note='', changed_at=None):
+    """Record a SailTicketLog entry for ``ticket``, synchronously or write-behind."""
+    record = {
+        'ticket_id': ticket.pk,
+        'status': status,
+        'changed_at': changed_at or now(),
+        'changed_by_id': changed_by.pk if changed_by else None,
+        'note': note,
+    }
+    if not settings.TICKET_LOG_WRITE_BEHIND:
+        SailTicketLog.objects.create(**record)
+        return
+    transaction.on_commit(lambda: _enqueue(record))
+
+
+def _get_queue():
+    global _queue
+    if _queue is None:
+        with _start_lock:
+            if _queue is None:
+                _queue = queue.Queue(maxsize=settings.TICKET_LOG_QUEUE_SIZE)
+    return _queue
+
+
+def _enqueue(record):
+    q = _get_queue()
+    try:
+        q.put_nowait(record)
+    except queue.Full:
+        _spill([record])
+        return
+    _ensure_thread()
+    if q.qsize() >= settings.TICKET_LOG_FLUSH_BATCH:
+        _wake.set()
+
+
+def _ensure_thread():
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    with _start_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, name='ticket-log-flusher', daemon=True)
+            _thread.start()
+
+
+def _run():
+    while True:
+        _wake.wait(settings.TICKET_LOG_FLUSH_INTERVAL_MS / 1000)
+        _wake.clear()
+        try:
+            flush()
+        except Exception:
+            logger.exception('Ticket log flush failed')
+        finally:
+            close_old_connections()
+
+
+def _drain():
+    records = []
+    q = _get_queue()
+    while True:
+        try:
+            records.append(q.get_nowait())
+        except queue.Empty:
+            return records
+
+
+def flush():
+    """Write all queued entries and any spill files now.
+
+    Returns the number of entries written to the database.
+    """
+    with _flush_lock:
+        written = _write_spilled()
+        records = _drain()
+        if records:
+            try:
+                written += _write(records)
+            except DatabaseError:
+                logger.warning('Ticket log flush failed; spilling %d entries', len(records), exc_info=True)
+                _spill(records)
+        return written
+
+
+def _write(records):
+    """Insert ``records``; return how many were written.
+
+    Entries of tickets deleted in the meantime (e.g. by a bulk regenerate)
+    are dropped with a warning, and references to deleted users cleared, so
+    that they cannot make the whole batch fail.
+    """
+    tickets = set(SailTicket.objects.filter(
+        pk__in={r['ticket_id'] for r in records},
+    ).values_list('pk', flat=True))
+    orphaned = [r for r in records if r['ticket_id'] not in tickets]
+    if orphaned:
+        logger.warning(
+            'Dropping %d ticket log entries of deleted tickets: %s', len(orphaned), orphaned,
+        )
+        records = [r for r in records if r['ticket_id'] in tickets]
+    users = set(User.objects.filter(
+        pk__in={r['changed_by_id'] for r in records if r['changed_by_id']},
+    ).values_list('pk', flat=True))
+    for record in records:
+        if record['changed_by_id'] not in users:
+            record['changed_by_id'] = None
+    with transaction.atomic():
+        SailTicketLog.objects.bulk_create([SailTicketLog(**r) for r in records])
+    return len(records)
+
+
+def _spill(records):
+    """Append ``records`` to a new spill file (written atomically)."""
+    directory = settings.TICKET_LOG_SPILL_DIR
+    name = f'ticket-log-spill-{os.getpid()}-{uuid.uuid4().hex}.jsonl'
+    tmp_path = os.path.join(directory, f'.{name}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(dict(record, changed_at=record['changed_at'].isoformat())) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(directory, name))
+
+
+def _write_spilled():
+    """Write the entries of all spill files; return how many were written.
+
+    Each file is claimed by renaming it first, so concurrent workers never
+    write the same file twice. A file that cannot be written because the
+    database is busy is put back for a later flush; one that can never be
+    written (unreadable, or rejected by a constraint) is logged and set aside
+    as ``*.failed`` so that it does not hold back the files after it.
+    """
+    written = 0
+    for path in sorted(glob.glob(os.path.join(settings.TICKET_LOG_SPILL_DIR, _SPILL_PATTERN))):
+        claimed = f'{path}.{os.getpid()}.claimed'
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            continue  # claimed by another worker
+        try:
+            with open(claimed, encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            for record in records:
+                record['changed_at'] = parse_datetime(record['changed_at'])
+            written += _write(records)
+        except (IntegrityError, ValueError, KeyError, TypeError):
+            logger.exception(
+                'Ticket log spill file %s cannot be written; moved to %s.failed', path, path,
+            )
+            os.rename(claimed, f'{path}.failed')
+            continue
+        except DatabaseError:
+            logger.warning('Ticket log spill file %s not written; retrying later', path, exc_info=True)
+            os.rename(claimed, path)
+            break
+        os.remove(claimed)
+    return written
+
+
+@atexit.register
+def _flush_at_exit():
+    if _queue is not None and not _queue.empty():
+        flush()
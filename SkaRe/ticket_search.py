@@ -0,0 +1,58 @@
+"""Full-text search over sail tickets and their boats.
+
+The ``SkaRe_ticket_search`` FTS5 table (migration 0040) holds one row per
+ticket, keyed by the ticket ID: code, boat name, sail number, contact person
+and a ``compact`` column with the code and sail number without separators,
+so that "CZE1234" finds "CZE 1234" and "42" finds "P550-042". SQLite
+triggers keep it in sync with tickets and boats, including queryset updates
+and bulk operations. The tokenizer folds case and diacritics, so "zaba"
+matches "Žába".
+
+Each word of the query matches as a word prefix (not in the middle of a
+word, unlike the former ``icontains`` lookup) and all words must match. On
+databases other than SQLite the search falls back to ``icontains``
+filtering.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import SailTicket
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def fts_query(text):
+    """Turn user input into an FTS5 query: every word as a quoted prefix term."""
+    return ' AND '.join(f'"{word}"*' for word in _WORD_RE.findall(text))
+
+
+def search_ticket_ids(text, limit=None):
+    """IDs of the tickets matching ``text``, best match first."""
+    query = fts_query(text)
+    if not query:
+        return []
+    sql = 'SELECT rowid FROM SkaRe_ticket_search WHERE SkaRe_ticket_search MATCH %s ORDER BY rank'
+    params = [query]
+    if limit:
+        sql += ' LIMIT %s'
+        params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_tickets(text, limit=None):
+    """Tickets matching ``text`` with their boats, best match first."""
+    tickets = SailTicket.objects.select_related('boat', 'boat__boat_class')
+    if connection.vendor != 'sqlite':
+        return list(tickets.filter(
+            Q(code__icontains=text) |
+            Q(boat__name__icontains=text) |
+            Q(boat__sail_number__icontains=text) |
+            Q(boat__contact_person__icontains=text)
+        ).order_by('code')[:limit])
+    ids = search_ticket_ids(text, limit)
+    by_id = tickets.in_bulk(ids)
+    return [by_id[pk] for pk in ids if pk in by_id]
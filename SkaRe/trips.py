@@ -0,0 +1,144 @@
+"""Maintenance of the Trip table from sail ticket status changes.
+
+``record_status_change`` is called next to every status change of a ticket,
+inside the transaction that saves it: going on water opens a trip, coming
+ashore or being marked lost closes the open one. ``record_bulk_status_change``
+does the same for a batch of tickets with a constant number of queries.
+``rebuild_trips`` derives the same trips from the SailTicketLog history for
+data recorded before trips existed, including the history of tickets that
+were scanned again after the upgrade.
+"""
+from django.db import transaction
+from django.db.models import F, Min, OuterRef, Q, Subquery
+
+from .models import SailTicket, SailTicketLog, Trip
+
+_TRIP_ENDS = (SailTicket.Status.ASHORE, SailTicket.Status.LOST)
+
+
+def record_status_change(ticket, old_status, new_status, changed_at, module_id=''):
+    """Open or close the trip of ``ticket`` for a status change.
+
+    Also sets ``ticket.on_water_since`` and ``ticket.status_changed_at``; the
+    caller saves them together with the new status, in the same transaction. ``module_id`` is the reader that
+    registered the change, blank for InfoDesk changes.
+    """
+    if old_status == new_status:
+        return
+    ticket.status_changed_at = changed_at
+    ticket.on_water_since = changed_at if new_status == SailTicket.Status.ON_WATER else None
+    if new_status == SailTicket.Status.ON_WATER:
+        # A trip left open by an earlier inconsistency ends where the new one starts
+        _close_open_trip(ticket, changed_at, '')
+        Trip.objects.create(
+            ticket=ticket,
+            boat_id=ticket.boat_id,
+            departed_at=changed_at,
+            departure_module=module_id,
+        )
+    elif new_status in _TRIP_ENDS:
+        _close_open_trip(ticket, changed_at, module_id)
+
+
+def record_bulk_status_change(tickets, new_status, changed_at):
+    """``record_status_change`` for many tickets changed at the InfoDesk at once.
+
+    ``tickets`` must all be changing to ``new_status`` and still carry their
+    old status. Their open trips are closed with one update and new trips
+    opened with one insert; ``on_water_since`` and ``status_changed_at`` are
+    set on the instances for the caller's bulk update.
+    """
+    for ticket in tickets:
+        ticket.status_changed_at = changed_at
+        ticket.on_water_since = changed_at if new_status == SailTicket.Status.ON_WATER else None
+    if new_status != SailTicket.Status.ON_WATER and new_status not in _TRIP_ENDS:
+        return
+    open_trips = list(Trip.objects.select_for_update().filter(
+        ticket__in=[t.pk for t in tickets], returned_at__isnull=True,
+    ))
+    for trip in open_trips:
+        trip.returned_at = max(changed_at, trip.departed_at)
+        trip.duration = trip.returned_at - trip.departed_at
+        trip.arrival_module = ''
+    Trip.objects.bulk_update(open_trips, ['returned_at', 'duration', 'arrival_module'], batch_size=500)
+    if new_status == SailTicket.Status.ON_WATER:
+        Trip.objects.bulk_create([
+            Trip(ticket=t, boat_id=t.boat_id, departed_at=changed_at) for t in tickets
+        ], batch_size=500)
+
+
+def _close_open_trip(ticket, returned_at, module_id):
+    trip = Trip.objects.select_for_update().filter(
+        ticket=ticket, returned_at__isnull=True,
+    ).first()
+    if trip is None:
+        return
+    trip.returned_at = max(returned_at, trip.departed_at)
+    trip.duration = trip.returned_at - trip.departed_at
+    trip.arrival_module = module_id
+    trip.save(update_fields=['returned_at', 'duration', 'arrival_module'])
+
+
+def trips_from_log(entries, boats):
+    """Build unsaved trips from ``(ticket_id, status, changed_at)`` log entries.
+
+    Entries must be ordered by ticket and time. Only actual status changes
+    count: entries repeating the previous status (duplicate scans, boat
+    assignments) are skipped. ``boats`` maps ticket IDs to their boat IDs;
+    the log does not record which boat held the ticket at the time.
+    """
+    trips = []
+    previous = {}
+    open_trips = {}
+    for ticket_id, status, changed_at in entries:
+        if previous.get(ticket_id) == status:
+            continue
+        previous[ticket_id] = status
+        if status == SailTicket.Status.ON_WATER:
+            trip = open_trips.pop(ticket_id, None)
+            if trip is not None:
+                trip.returned_at, trip.duration = changed_at, changed_at - trip.departed_at
+            open_trips[ticket_id] = Trip(
+                ticket_id=ticket_id, boat_id=boats.get(ticket_id), departed_at=changed_at,
+            )
+            trips.append(open_trips[ticket_id])
+        elif status in _TRIP_ENDS and ticket_id in open_trips:
+            trip = open_trips.pop(ticket_id)
+            trip.returned_at, trip.duration = changed_at, changed_at - trip.departed_at
+    return trips
+
+
+def rebuild_trips(replace=False):
+    """Create the trips of tickets from their logs; return the number created.
+
+    For tickets that already have trips only the log before their first trip
+    is used, so history recorded before trips existed is filled in even for
+    tickets scanned since the upgrade, and running it again creates nothing.
+    With ``replace`` all trips are deleted and rebuilt from the whole log.
+    """
+    with transaction.atomic():
+        if replace:
+            Trip.objects.all().delete()
+        first_departure = dict(
+            Trip.objects.values('ticket_id').annotate(first=Min('departed_at'))
+            .values_list('ticket_id', 'first')
+        )
+        first_trip = Subquery(
+            Trip.objects.filter(ticket=OuterRef('ticket'))
+            .order_by('departed_at').values('departed_at')[:1]
+        )
+        boats = dict(SailTicket.objects.values_list('pk', 'boat_id'))
+        entries = (
+            SailTicketLog.objects.annotate(first_trip=first_trip)
+            .filter(Q(first_trip__isnull=True) | Q(changed_at__lt=F('first_trip')))
+            .order_by('ticket_id', 'changed_at', 'pk')
+            .values_list('ticket_id', 'status', 'changed_at')
+        )
+        trips = trips_from_log(entries.iterator(), boats)
+        for trip in trips:
+            # A backfilled trip still open ends where the recorded ones start
+            first = first_departure.get(trip.ticket_id)
+            if first is not None and trip.returned_at is None:
+                trip.returned_at, trip.duration = first, first - trip.departed_at
+        Trip.objects.bulk_create(trips, batch_size=500)
+    return len(trips)
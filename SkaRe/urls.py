@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -56,14 +57,26 @@ urlpatterns = [
     path('infodesk/attendance/units/', views.attendance_units_list, name='attendance_units_list'),
     path('infodesk/attendance/units/<int:unit_id>/', views.attendance_unit_detail, name='attendance_unit_detail'),
     path('infodesk/attendance/units/<int:unit_id>/mark-all-arrived/', views.attendance_unit_mark_all_arrived, name='attendance_unit_mark_all_arrived'),
+    path('infodesk/attendance/units/<int:unit_id>/set-status/', views.attendance_unit_set_status, name='attendance_unit_set_status'),
     path('infodesk/attendance/individuals/', views.attendance_individuals_list, name='attendance_individuals_list'),
     path('infodesk/attendance/organizers/', views.attendance_organizers_list, name='attendance_organizers_list'),
     path('infodesk/attendance/persons/<int:person_id>/set-status/', views.attendance_set_status, name='attendance_set_status'),
     # Tickets
     path('infodesk/tickets/', views.ticket_list, name='ticket_list'),
+    path('infodesk/tickets/set-status/', views.ticket_bulk_set_status, name='ticket_bulk_set_status'),
     path('infodesk/tickets/lookup/', views.ticket_lookup, name='ticket_lookup'),
+    path('infodesk/tickets/lookup/suggest/', views.ticket_lookup_suggest, name='ticket_lookup_suggest'),
     path('infodesk/tickets/create-bulk/', views.ticket_create_bulk, name='ticket_create_bulk'),
+    path('infodesk/tickets/boats/suggest/', views.ticket_boat_suggest, name='ticket_boat_suggest'),
     path('infodesk/tickets/on-water/', views.ticket_on_water, name='ticket_on_water'),
+    path('infodesk/tickets/on-water/changes/', views.ticket_on_water_changes, name='ticket_on_water_changes'),
+    path('infodesk/tickets/overdue/', views.ticket_overdue, name='ticket_overdue'),
+    path('infodesk/tickets/overdue/feed/', views.ticket_overdue_feed, name='ticket_overdue_feed'),
+    path('infodesk/tickets/pairing/', views.pairing_session_list, name='pairing_session_list'),
+    path('infodesk/tickets/pairing/<int:session_id>/', views.pairing_session_detail, name='pairing_session_detail'),
+    path('infodesk/tickets/pairing/<int:session_id>/close/', views.pairing_session_close, name='pairing_session_close'),
+    path('infodesk/tickets/import-manifest/', views.ticket_import_manifest, name='ticket_import_manifest'),
+    path('infodesk/tickets/readers/', views.ticket_readers, name='ticket_readers'),
     path('infodesk/tickets/export/csv/', views.ticket_export_csv, name='ticket_export_csv'),
     path('infodesk/tickets/<int:ticket_id>/', views.ticket_detail, name='ticket_detail'),
     path('infodesk/tickets/<int:ticket_id>/set-status/', views.ticket_set_status, name='ticket_set_status'),
@@ -72,9 +85,11 @@ urlpatterns = [
     path('infodesk/tickets/<int:ticket_id>/cancel-pairing/', views.ticket_cancel_pairing, name='ticket_cancel_pairing'),
     path('infodesk/tickets/<int:ticket_id>/assign-boat/', views.ticket_assign_boat, name='ticket_assign_boat'),
     path('infodesk/tickets/<int:ticket_id>/unassign-boat/', views.ticket_unassign_boat, name='ticket_unassign_boat'),
-    # RFID reader API
-    path('api/rfid/alive/', views.rfid_alive, name='rfid_alive'),
-    path('api/rfid/scan/', views.rfid_scan, name='rfid_scan'),
+    # RFID reader API (async variants when served over ASGI, see DEPLOYMENT.md)
+    path('api/rfid/alive/', views.rfid_alive_async if settings.RFID_API_ASYNC else views.rfid_alive, name='rfid_alive'),
+    path('api/rfid/events/', views.rfid_events_async if settings.RFID_API_ASYNC else views.rfid_events, name='rfid_events'),
+    path('api/rfid/scan/', views.rfid_scan_async if settings.RFID_API_ASYNC else views.rfid_scan, name='rfid_scan'),
+    path('api/rfid/scan/batch/', views.rfid_scan_batch, name='rfid_scan_batch'),
     # Exports
     path('infodesk/exports/', views.exports_index, name='exports_index'),
     path('infodesk/exports/kitchen/csv/', views.exports_kitchen_csv, name='exports_kitchen_csv'),
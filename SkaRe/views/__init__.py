@@ -61,21 +61,35 @@ from .attendance import (
     attendance_organizers_list,
     attendance_set_status,
     attendance_unit_mark_all_arrived,
+    attendance_unit_set_status,
 )
 from .tickets import (
     ticket_list,
     ticket_detail,
+    ticket_boat_suggest,
     ticket_set_status,
+    ticket_bulk_set_status,
     ticket_pair_rfid,
     ticket_unpair_rfid,
     ticket_cancel_pairing,
     ticket_assign_boat,
     ticket_unassign_boat,
     ticket_lookup,
+    ticket_lookup_suggest,
     ticket_create_bulk,
     ticket_on_water,
+    ticket_on_water_changes,
+    ticket_overdue,
+    ticket_overdue_feed,
+    ticket_readers,
+    ticket_import_manifest,
     ticket_export_csv,
 )
+from .pairing import (
+    pairing_session_list,
+    pairing_session_detail,
+    pairing_session_close,
+)
 from .exports import (
     exports_index,
     exports_kitchen_csv,
@@ -87,4 +101,11 @@ from .exports import (
 from .rfid_api import (
     rfid_alive,
     rfid_scan,
+    rfid_scan_batch,
+    rfid_events,
+)
+from .rfid_api_async import (
+    rfid_alive_async,
+    rfid_events_async,
+    rfid_scan_async,
 )
@@ -1,3 +1,4 @@
+from collections import Counter
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.db import transaction
@@ -6,6 +7,7 @@ from django.http import HttpResponseBadRequest, HttpResponseNotAllowed
 from django.utils import timezone
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.utils.translation import gettext as _
+from .. import dashboard_counters
 from ..permissions import infodesk_required
 from ..models import Unit, IndividualParticipant, Organizer, Person, AttendanceLog
 
@@ -52,16 +54,8 @@ def attendance_organizers_list(request):
     })
 
 
-@infodesk_required
-def attendance_set_status(request, person_id):
-    if request.method != 'POST':
-        return HttpResponseNotAllowed(['POST'])
-    person = get_object_or_404(Person, pk=person_id)
-    new_status = request.POST.get('new_status', '')
-    if new_status not in VALID_STATUSES:
-        return HttpResponseBadRequest('Invalid status')
-
-    now = timezone.now()
+def _apply_status(person, new_status, now):
+    """Set ``person``'s attendance status and the matching timestamps (unsaved)."""
     person.attendance_status = new_status
     if new_status == Person.AttendanceStatus.ARRIVED:
         person.arrived_at = now
@@ -70,13 +64,50 @@ def attendance_set_status(request, person_id):
     else:
         person.arrived_at = None
         person.departed_at = None
-    person.save(update_fields=['attendance_status', 'arrived_at', 'departed_at'])
 
-    AttendanceLog.objects.create(
-        person=person,
-        status=new_status,
-        changed_by=request.user,
-    )
+
+def _bulk_set_status(people, new_status, user):
+    """Change the status of the ``people`` queryset with one update and one log insert.
+
+    The people are read under a row lock in the transaction of the change,
+    so the counter deltas come from their current statuses. People already
+    in ``new_status`` are skipped; returns the numbers matched and changed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        matched = list(people.select_for_update())
+        changing = [p for p in matched if p.attendance_status != new_status]
+        old_statuses = Counter(p.attendance_status for p in changing)
+        for person in changing:
+            _apply_status(person, new_status, now)
+        Person.objects.bulk_update(changing, ['attendance_status', 'arrived_at', 'departed_at'])
+        for old_status, count in old_statuses.items():
+            dashboard_counters.person_status_changed(old_status, new_status, count)
+        AttendanceLog.objects.bulk_create([
+            AttendanceLog(person=person, status=new_status, changed_by=user)
+            for person in changing
+        ])
+    return len(matched), len(changing)
+
+
+@infodesk_required
+def attendance_set_status(request, person_id):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    new_status = request.POST.get('new_status', '')
+    if new_status not in VALID_STATUSES:
+        return HttpResponseBadRequest('Invalid status')
+
+    with transaction.atomic():
+        person = get_object_or_404(Person.objects.select_for_update(), pk=person_id)
+        _apply_status(person, new_status, timezone.now())
+        person.save(update_fields=['attendance_status', 'arrived_at', 'departed_at'])
+
+        AttendanceLog.objects.create(
+            person=person,
+            status=new_status,
+            changed_by=request.user,
+        )
 
     next_url = request.POST.get('next') or request.META.get('HTTP_REFERER', '')
     if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
@@ -89,23 +120,43 @@ def attendance_unit_mark_all_arrived(request, unit_id):
     if request.method != 'POST':
         return redirect('SkaRe:attendance_unit_detail', unit_id=unit_id)
     unit = get_object_or_404(Unit, pk=unit_id)
-    now = timezone.now()
     to_mark = unit.regular_participants.filter(
         attendance_status=Person.AttendanceStatus.EXPECTED
     )
-    with transaction.atomic():
-        to_update = list(to_mark)
-        for person in to_update:
-            person.attendance_status = Person.AttendanceStatus.ARRIVED
-            person.arrived_at = now
-        Person.objects.bulk_update(to_update, ['attendance_status', 'arrived_at'])
-        AttendanceLog.objects.bulk_create([
-            AttendanceLog(
-                person=person,
-                status=Person.AttendanceStatus.ARRIVED,
-                changed_by=request.user,
-            )
-            for person in to_update
-        ])
-    messages.success(request, _('%(n)d participants marked as arrived.') % {'n': len(to_update)})
+    _matched, marked = _bulk_set_status(to_mark, Person.AttendanceStatus.ARRIVED, request.user)
+    messages.success(request, _('%(n)d participants marked as arrived.') % {'n': marked})
+    return redirect('SkaRe:attendance_unit_detail', unit_id=unit_id)
+
+
+@infodesk_required
+def attendance_unit_set_status(request, unit_id):
+    """Set the status of a unit's participants in one request.
+
+    Applies to the participants listed in ``person_ids`` if given, otherwise
+    to all of them except those in ``exclude_ids`` (e.g. 12 of 13 arrived).
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    unit = get_object_or_404(Unit, pk=unit_id)
+    new_status = request.POST.get('new_status', '')
+    if new_status not in VALID_STATUSES:
+        return HttpResponseBadRequest('Invalid status')
+    person_ids = request.POST.getlist('person_ids')
+    exclude_ids = request.POST.getlist('exclude_ids')
+    if not all(pk.isdigit() for pk in person_ids + exclude_ids):
+        return HttpResponseBadRequest('Invalid person IDs')
+
+    people = unit.regular_participants.all()
+    if 'person_ids' in request.POST:
+        people = people.filter(pk__in=person_ids)
+    else:
+        people = people.exclude(pk__in=exclude_ids)
+    matched, changed = _bulk_set_status(people, new_status, request.user)
+    messages.success(request, _(
+        '%(changed)d participants set to %(status)s; %(unchanged)d already had that status.'
+    ) % {
+        'changed': changed,
+        'status': Person.AttendanceStatus(new_status).label,
+        'unchanged': matched - changed,
+    })
     return redirect('SkaRe:attendance_unit_detail', unit_id=unit_id)
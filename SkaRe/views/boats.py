@@ -11,6 +11,7 @@ from django.conf import settings
 from django.http import JsonResponse
 from django.utils.translation import gettext as _
 from django.db import transaction
+from .. import rfid_cache
 from ..models import Entity, Unit, BoatClass, Boat
 from ..forms import BoatForm
 from ..permissions import is_infodesk
@@ -222,6 +223,7 @@ def boat_delete(request, boat_id):
         return redirect('SkaRe:boat_detail', boat_id=boat_id)
     if request.method == 'POST':
         boat.delete()
+        transaction.on_commit(rfid_cache.bump_reader_state)
         messages.success(request, _('Boat deleted successfully.'))
         return redirect('SkaRe:boat_list')
     return render(request, 'SkaRe/boats/confirm_delete.html', {'boat': boat})
@@ -1,23 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.db import transaction
 from django.utils.translation import gettext as _
+from .. import dashboard_counters
 from ..permissions import infodesk_required
-from ..models import Entity, Person, SailTicket, Organizer
+from ..models import Entity, Organizer
 
 
 @infodesk_required
 def infodesk_dashboard(request):
-    unconfirmed_count = Entity.objects.filter(confirmed=False).count()
-    arrived_count = Person.objects.filter(attendance_status=Person.AttendanceStatus.ARRIVED).count()
-    expected_count = Person.objects.filter(attendance_status=Person.AttendanceStatus.EXPECTED).count()
-    not_coming_count = Person.objects.filter(attendance_status=Person.AttendanceStatus.NOT_COMING).count()
-    on_water_count = SailTicket.objects.filter(status=SailTicket.Status.ON_WATER).count()
+    counters = dashboard_counters.current()
     return render(request, 'SkaRe/infodesk/dashboard.html', {
-        'unconfirmed_count': unconfirmed_count,
-        'arrived_count': arrived_count,
-        'expected_count': expected_count,
-        'not_coming_count': not_coming_count,
-        'on_water_count': on_water_count,
+        'unconfirmed_count': counters.unconfirmed_entities,
+        'arrived_count': counters.arrived,
+        'expected_count': counters.expected,
+        'not_coming_count': counters.not_coming,
+        'on_water_count': counters.on_water,
     })
 
 
@@ -58,9 +56,11 @@ def infodesk_registrations(request):
 def infodesk_confirm_entity(request, entity_id):
     if request.method != 'POST':
         return redirect('SkaRe:infodesk_registrations')
-    entity = get_object_or_404(Entity, pk=entity_id)
-    entity.confirmed = True
-    entity.save(update_fields=['confirmed'])
+    with transaction.atomic():
+        entity = get_object_or_404(Entity.objects.select_for_update(), pk=entity_id)
+        if not entity.confirmed:
+            entity.confirmed = True
+            entity.save(update_fields=['confirmed'])
     messages.success(request, _('Registration confirmed.'))
     return redirect('SkaRe:infodesk_registrations')
 
@@ -69,9 +69,11 @@ def infodesk_confirm_entity(request, entity_id):
 def infodesk_reject_entity(request, entity_id):
     if request.method != 'POST':
         return redirect('SkaRe:infodesk_registrations')
-    entity = get_object_or_404(Entity, pk=entity_id)
-    entity.confirmed = False
-    entity.save(update_fields=['confirmed'])
+    with transaction.atomic():
+        entity = get_object_or_404(Entity.objects.select_for_update(), pk=entity_id)
+        if entity.confirmed:
+            entity.confirmed = False
+            entity.save(update_fields=['confirmed'])
     messages.success(request, _('Registration rejected.'))
     return redirect('SkaRe:infodesk_registrations')
 
@@ -96,6 +98,8 @@ def infodesk_bulk_confirm(request):
         except (ValueError, TypeError):
             pass
     if ids:
-        Entity.objects.filter(pk__in=ids).update(confirmed=True)
+        with transaction.atomic():
+            confirmed = Entity.objects.filter(pk__in=ids, confirmed=False).update(confirmed=True)
+            dashboard_counters.adjust(unconfirmed_entities=-confirmed)
         messages.success(request, _('%(n)d registrations confirmed.') % {'n': len(ids)})
     return redirect('SkaRe:infodesk_registrations')
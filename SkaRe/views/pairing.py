@@ -0,0 +1,109 @@
+import re
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
+from django.db import transaction
+from django.db.models import Count, Q
+from django.http import HttpResponseNotAllowed
+from django.utils.timezone import now
+from django.utils.translation import gettext as _
+from .. import rfid_cache
+from ..permissions import infodesk_required
+from ..models import SailTicket, PairingSession, PairingSessionItem
+from ..forms import PairingSessionForm
+from .rfid_api import _MODULE_TRANSITIONS
+
+
+def _natural_key(code):
+    """Sort key ordering 'P550-2' before 'P550-10'."""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', code)]
+
+
+def _pairable_tickets(color, code_prefix):
+    """Unpaired, not lost tickets that are not queued in another open session."""
+    queued = PairingSessionItem.objects.filter(
+        session__closed_at__isnull=True,
+    ).values('ticket_id')
+    tickets = SailTicket.objects.filter(rfid_uid='').exclude(
+        status=SailTicket.Status.LOST,
+    ).exclude(pk__in=queued)
+    if color:
+        tickets = tickets.filter(color=color)
+    if code_prefix:
+        tickets = tickets.filter(code__startswith=code_prefix)
+    return sorted(tickets.only('pk', 'code'), key=lambda t: _natural_key(t.code))
+
+
+def _start_session(request, form):
+    """Create a pairing session from a valid form; return it, or None with a message."""
+    module_id = form.cleaned_data['module_id']
+    if module_id in _MODULE_TRANSITIONS:
+        messages.error(request, _('Module %(module)s is a gate reader and cannot be used for pairing.') % {'module': module_id})
+        return None
+    with transaction.atomic():
+        if PairingSession.objects.filter(module_id=module_id, closed_at__isnull=True).exists():
+            messages.error(request, _('Reader %(module)s already has an open pairing session.') % {'module': module_id})
+            return None
+        tickets = _pairable_tickets(form.cleaned_data['color'], form.cleaned_data['code_prefix'])
+        if form.cleaned_data['limit']:
+            tickets = tickets[:form.cleaned_data['limit']]
+        if not tickets:
+            messages.error(request, _('No unpaired tickets match the selection.'))
+            return None
+        session = PairingSession.objects.create(module_id=module_id, created_by=request.user)
+        PairingSessionItem.objects.bulk_create([
+            PairingSessionItem(session=session, ticket=ticket, position=position)
+            for position, ticket in enumerate(tickets)
+        ])
+    rfid_cache.invalidate_rfid_index()
+    messages.success(request, _('Pairing session started on %(module)s with %(n)d tickets.') % {
+        'module': module_id, 'n': len(tickets),
+    })
+    return session
+
+
+@infodesk_required
+def pairing_session_list(request):
+    if request.method == 'POST':
+        form = PairingSessionForm(request.POST)
+        if form.is_valid():
+            session = _start_session(request, form)
+            if session:
+                return redirect('SkaRe:pairing_session_detail', session_id=session.pk)
+    else:
+        form = PairingSessionForm()
+    sessions = PairingSession.objects.select_related('created_by').annotate(
+        ticket_count=Count('items'),
+        paired_count=Count('items', filter=Q(items__paired_at__isnull=False)),
+    )
+    return render(request, 'SkaRe/tickets/pairing_sessions.html', {
+        'form': form,
+        'open_sessions': [s for s in sessions if s.closed_at is None],
+        'closed_sessions': [s for s in sessions if s.closed_at is not None][:20],
+    })
+
+
+@infodesk_required
+def pairing_session_detail(request, session_id):
+    session = get_object_or_404(PairingSession, pk=session_id)
+    items = list(session.items.select_related('ticket'))
+    upcoming = [i for i in items if i.paired_at is None and not i.ticket.rfid_uid]
+    return render(request, 'SkaRe/tickets/pairing_session_detail.html', {
+        'session': session,
+        'items': items,
+        'paired_count': sum(1 for i in items if i.paired_at),
+        'next_item': upcoming[0] if upcoming and session.closed_at is None else None,
+    })
+
+
+@infodesk_required
+def pairing_session_close(request, session_id):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    updated = PairingSession.objects.filter(
+        pk=session_id, closed_at__isnull=True,
+    ).update(closed_at=now())
+    get_object_or_404(PairingSession, pk=session_id)
+    if updated:
+        rfid_cache.invalidate_rfid_index()
+        messages.info(request, _('Pairing session closed.'))
+    return redirect('SkaRe:pairing_session_detail', session_id=session_id)
@@ -1,51 +1,243 @@
 import json
+import math
+import re
+import threading
+import time
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction
 from django.conf import settings
 from django.db import transaction
-from django.http import JsonResponse
-from django.utils.timezone import now
+from django.db.models import Count, Min, Q
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils.cache import patch_vary_headers
+from django.utils.timezone import is_naive, make_aware, now
 from django.views.decorators.csrf import csrf_exempt
 
-from ..models import SailTicket, SailTicketLog
+from .. import dashboard_counters, rfid_cache, rfid_rate_limit, rfid_telemetry, rfid_wire, trips
+from ..models import PairingSession, PairingSessionItem, SailTicket
+from ..ticket_log_buffer import log_ticket_change
+
+
+def _too_many_requests(retry_after):
+    response = JsonResponse({'error': 'Too many requests'}, status=429)
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def _api_key_denied(request):
+    """Return a 401 response unless the request carries the RFID API key,
+    or a 429 response when the key is over its rate limit."""
+    expected = getattr(settings, 'RFID_API_KEY', '')
+    auth = request.headers.get('Authorization', '')
+    if not expected or auth != f'Bearer {expected}':
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+    retry_after = rfid_rate_limit.take('key', expected)
+    if retry_after:
+        return _too_many_requests(retry_after)
+    return None
+
+
+def _module_throttled(module_id):
+    """Return a 429 response when ``module_id`` is over its rate limit, else None.
+
+    Rejections of known modules are counted in the reader telemetry. Values
+    that are not module IDs at all are left to the request validation.
+    """
+    if not module_id or not isinstance(module_id, str):
+        return None
+    retry_after = rfid_rate_limit.take('module', module_id)
+    if not retry_after:
+        return None
+    if module_id in _MODULE_TRANSITIONS or module_id in _pairing_modules():
+        rfid_telemetry.record_throttled(module_id)
+    return _too_many_requests(retry_after)
 
 
 def require_api_key(view_func):
-    """Decorator: validates Authorization: Bearer <RFID_API_KEY> header."""
+    """Decorator: validates Authorization: Bearer <RFID_API_KEY> header.
+
+    Supports both sync and async views.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            denied = _api_key_denied(request)
+            if denied is not None:
+                return denied
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        expected = getattr(settings, 'RFID_API_KEY', '')
-        auth = request.headers.get('Authorization', '')
-        if not expected or auth != f'Bearer {expected}':
-            return JsonResponse({'error': 'Unauthorized'}, status=401)
+        denied = _api_key_denied(request)
+        if denied is not None:
+            return denied
         return view_func(request, *args, **kwargs)
     return wrapper
 
 
+def _reader_state_aggregates():
+    """Aggregates computing the reader state counts in a single query."""
+    with_boat = Q(boat__isnull=False)
+    return {
+        'boats_on_water': Count('pk', filter=with_boat & Q(status=SailTicket.Status.ON_WATER)),
+        'boats_ashore': Count('pk', filter=with_boat & Q(status=SailTicket.Status.ASHORE)),
+        'pairing_ticket': Min('code', filter=Q(pending_pairing=True)),
+    }
+
+
+def _reader_state(state):
+    """Turn the aggregate result into the reader state document."""
+    state['mode'] = 'pairing' if state['pairing_ticket'] else 'scanning'
+    if not state['pairing_ticket']:
+        del state['pairing_ticket']
+    return state
+
+
+def _load_reader_state():
+    """Compute the reader state document with a single aggregate query."""
+    return _reader_state(SailTicket.objects.aggregate(**_reader_state_aggregates()))
+
+
+def _wants_compact(request):
+    """Whether the reader asked for the compact response format (``Accept: text/plain``)."""
+    return request.get_preferred_type(['application/json', rfid_wire.CONTENT_TYPE]) == rfid_wire.CONTENT_TYPE
+
+
+def _compact_response(line):
+    return HttpResponse(line, content_type=f'{rfid_wire.CONTENT_TYPE}; charset=utf-8')
+
+
+def _alive_response(request, state):
+    """Build the heartbeat response for ``state``, honouring If-None-Match."""
+    etag = f'"{state["version"]}"'
+    if (request.headers.get('If-None-Match') == etag
+            or request.GET.get('version') == str(state['version'])):
+        response = HttpResponseNotModified()
+    elif _wants_compact(request):
+        response = _compact_response(rfid_wire.encode_reader_state(state))
+    else:
+        response = JsonResponse(dict(state, timestamp=now().isoformat()))
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
 @csrf_exempt
 @require_api_key
 def rfid_alive(request):
     if request.method != 'GET':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
-    tickets_with_boat = SailTicket.objects.filter(boat__isnull=False)
-    boats_on_water = tickets_with_boat.filter(
-        status=SailTicket.Status.ON_WATER
-    ).count()
-    boats_ashore = tickets_with_boat.filter(
-        status=SailTicket.Status.ASHORE
-    ).count()
+    throttled = _module_throttled(request.GET.get('module_id', ''))
+    if throttled:
+        return throttled
+    _record_heartbeat(request)
+    state = rfid_cache.cached_reader_state(_load_reader_state)
+    return _alive_response(request, state)
 
-    pending = SailTicket.objects.filter(pending_pairing=True).first()
 
-    data = {
-        'mode': 'pairing' if pending else 'scanning',
-        'boats_on_water': boats_on_water,
-        'boats_ashore': boats_ashore,
-        'timestamp': now().isoformat(),
-    }
-    if pending:
-        data['pairing_ticket'] = pending.code
-    return JsonResponse(data)
+def _state_event(state):
+    """Format ``state`` as an SSE message."""
+    data = json.dumps(dict(state, timestamp=now().isoformat()))
+    return f'id: {state["version"]}\nevent: state\ndata: {data}\n\n'
+
+
+def _reader_events(last_version):
+    """Yield SSE messages whenever the reader state version changes.
+
+    Polls the cached reader state (no database query unless the state has
+    changed) and closes after ``RFID_EVENTS_MAX_DURATION`` seconds so that a
+    connection does not hold a worker thread forever; readers reconnect with
+    ``Last-Event-ID``.
+    """
+    yield f'retry: {settings.RFID_EVENTS_RETRY_MS}\n\n'
+    deadline = time.monotonic() + settings.RFID_EVENTS_MAX_DURATION
+    last_sent = time.monotonic()
+    while True:
+        state = rfid_cache.cached_reader_state(_load_reader_state)
+        if str(state['version']) != last_version:
+            last_version = str(state['version'])
+            yield _state_event(state)
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= settings.RFID_EVENTS_KEEPALIVE:
+            yield ': keepalive\n\n'
+            last_sent = time.monotonic()
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(settings.RFID_EVENTS_POLL_INTERVAL)
+
+
+# Streams over RFID_EVENTS_MAX_SYNC_STREAMS are refused with this Retry-After;
+# the reader polls the heartbeat meanwhile
+_STREAMS_BUSY_RETRY_AFTER = 60
+
+_sync_streams_lock = threading.Lock()
+_sync_streams = 0  # open event streams served by this process's worker threads
+
+
+def _claim_sync_stream():
+    """Take one of the ``RFID_EVENTS_MAX_SYNC_STREAMS`` stream slots.
+
+    Returns False when all are in use, so that connected readers cannot take
+    every worker thread from the InfoDesk.
+    """
+    global _sync_streams
+    with _sync_streams_lock:
+        if _sync_streams >= settings.RFID_EVENTS_MAX_SYNC_STREAMS:
+            return False
+        _sync_streams += 1
+        return True
+
+
+def _release_sync_stream():
+    global _sync_streams
+    with _sync_streams_lock:
+        _sync_streams -= 1
+
+
+class _ClaimedStream:
+    """Iterator over an event stream holding a stream slot.
+
+    The slot is given back when the server closes the response, whether or
+    not the stream was ever iterated.
+    """
+
+    def __init__(self, events):
+        self._events = events
+        self._claimed = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        self._events.close()
+        if self._claimed:
+            self._claimed = False
+            _release_sync_stream()
+
+
+@csrf_exempt
+@require_api_key
+def rfid_events(request):
+    """Server-Sent Events stream of reader state changes (mode, pairing ticket, counts)."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    events = _reader_events(request.headers.get('Last-Event-ID', ''))
+    if settings.RFID_EVENTS_MAX_SYNC_STREAMS:
+        if not _claim_sync_stream():
+            response = JsonResponse({'error': 'Too many event streams'}, status=503)
+            response['Retry-After'] = str(_STREAMS_BUSY_RETRY_AFTER)
+            return response
+        events = _ClaimedStream(events)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 _MODULE_TRANSITIONS = {
@@ -54,6 +246,13 @@ _MODULE_TRANSITIONS = {
 }
 
 
+def _record_heartbeat(request):
+    """Record a heartbeat for the reader named by the ``module_id`` query parameter."""
+    module_id = request.GET.get('module_id', '')
+    if module_id and (module_id in _MODULE_TRANSITIONS or module_id in _pairing_modules()):
+        rfid_telemetry.record_heartbeat(module_id)
+
+
 def _boat_data(boat):
     """Build the boat sub-dict for API responses. Omits blank/null fields."""
     if boat is None:
@@ -74,111 +273,437 @@ def _boat_data(boat):
     return data
 
 
-@csrf_exempt
-@require_api_key
-def rfid_scan(request):
-    if request.method != 'POST':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+def _index_entry(ticket):
+    """Build the cached UID index entry for ``ticket`` (None → empty dict)."""
+    if ticket is None:
+        return {}
+    return {
+        'id': ticket.pk,
+        'code': ticket.code,
+        'lost': ticket.status == SailTicket.Status.LOST,
+        'boat_id': ticket.boat_id,
+        'boat': _boat_data(ticket.boat),
+    }
 
-    try:
-        body = json.loads(request.body)
-    except (json.JSONDecodeError, ValueError):
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
 
-    module_id = body.get('module_id', '')
-    rfid_uid = body.get('rfid_uid', '')
+def _lookup_uid(rfid_uid):
+    """Return the UID index entry for ``rfid_uid``; empty dict for unknown cards."""
+    return rfid_cache.cached_index_value(
+        f'uid:{rfid_uid}',
+        lambda: _index_entry(
+            SailTicket.objects.select_related('boat', 'boat__boat_class')
+            .filter(rfid_uid=rfid_uid).first()
+        ),
+    )
 
-    if not rfid_uid:
-        return JsonResponse({'error': 'Missing rfid_uid'}, status=400)
-    if module_id not in _MODULE_TRANSITIONS:
-        return JsonResponse({'error': 'Invalid module_id'}, status=400)
 
-    timestamp = now().isoformat()
+def _pending_pairing_pk():
+    """Return the pk of the ticket awaiting pairing, or 0 when not pairing."""
+    return rfid_cache.cached_index_value(
+        'pending_pairing',
+        lambda: SailTicket.objects.filter(pending_pairing=True)
+        .values_list('pk', flat=True).first() or 0,
+    )
 
-    # ── Pairing mode ──────────────────────────────────────────────────────
+
+def _pairing_modules():
+    """Module IDs of the open pairing sessions."""
+    return rfid_cache.cached_index_value(
+        'pairing_modules',
+        lambda: list(
+            PairingSession.objects.filter(closed_at__isnull=True)
+            .values_list('module_id', flat=True)
+        ),
+    )
+
+
+def _apply_session_pairing(module_id, rfid_uid, timestamp):
+    """Pair the card with the next ticket of the open session on ``module_id``.
+
+    Tickets paired by other means since the session started are skipped. The
+    session closes itself when its last ticket is paired.
+    """
     with transaction.atomic():
-        pending = SailTicket.objects.select_for_update().filter(pending_pairing=True).first()
+        queue = PairingSessionItem.objects.filter(
+            session__module_id=module_id,
+            session__closed_at__isnull=True,
+            paired_at__isnull=True,
+            ticket__rfid_uid='',
+        )
+        item = queue.select_for_update().select_related('ticket').first()
+        if item is None:
+            return {
+                'result': 'error',
+                'error': 'session_closed',
+                'timestamp': timestamp,
+            }
+        paired_code = (
+            SailTicket.objects.filter(rfid_uid=rfid_uid)
+            .values_list('code', flat=True).first()
+        )
+        if paired_code:
+            return {
+                'result': 'error',
+                'error': 'already_paired',
+                'ticket_code': paired_code,
+                'timestamp': timestamp,
+            }
+        ticket = item.ticket
+        ticket.rfid_uid = rfid_uid
+        ticket.save(update_fields=['rfid_uid', 'updated_at'])
+        item.paired_at = now()
+        item.save(update_fields=['paired_at'])
+        upcoming = list(queue.values_list('ticket__code', flat=True)[:1])
+        data = {
+            'result': 'ok',
+            'ticket_code': ticket.code,
+            'remaining': queue.count(),
+            'timestamp': timestamp,
+        }
+        if upcoming:
+            data['next_ticket'] = upcoming[0]
+        else:
+            PairingSession.objects.filter(pk=item.session_id).update(closed_at=now())
+    rfid_cache.invalidate_rfid_index()
+    return data
+
+
+def _process_scan(module_id, rfid_uid, scanned_at=None, allow_pairing=True,
+                  pending_windows=None):
+    """Apply a single validated scan and return the response dict.
+
+    ``scanned_at`` is the moment the card was read; it defaults to now and is
+    used both as the response ``timestamp`` and as ``SailTicketLog.changed_at``.
+    Buffered scans pass ``allow_pairing=False``: only a live read may pair the
+    card with the ticket waiting at the desk. Scans applied in one transaction
+    share ``pending_windows``, the debounce windows not yet committed.
+    Repeated reads of the same card on the same module within
+    ``RFID_SCAN_DEBOUNCE_SECONDS`` get the previous answer without any
+    database access.
+    """
+    if scanned_at is None:
+        scanned_at = now()
+    started = time.perf_counter()
+    data = rfid_cache.get_debounced_response(
+        module_id, rfid_uid, scanned_at, pending_windows,
+    )
+    if data is not None:
+        rfid_telemetry.record_scan(
+            module_id, 'duplicate', (time.perf_counter() - started) * 1000,
+        )
+        return data
+    data = _apply_scan(module_id, rfid_uid, scanned_at, allow_pairing)
+    rfid_telemetry.record_scan(
+        module_id, rfid_telemetry.scan_kind(data), (time.perf_counter() - started) * 1000,
+    )
+    rfid_cache.remember_debounced_response(
+        module_id, rfid_uid, scanned_at, data, pending_windows,
+    )
+    if 'new_status' in data:
+        # The card crossed the gate: a read on another module is not a repeat
+        rfid_cache.clear_debounce(
+            rfid_uid, [m for m in _MODULE_TRANSITIONS if m != module_id],
+            pending_windows,
+        )
+    return data
+
+
+def _apply_scan(module_id, rfid_uid, scanned_at, allow_pairing=True):
+    """Apply a scan to the database. Unknown, lost and boat-less cards are
+    answered from the UID index alone."""
+    timestamp = scanned_at.isoformat()
+
+    # ── Pairing session (desk readers) ────────────────────────────────────
+    if module_id not in _MODULE_TRANSITIONS:
+        return _apply_session_pairing(module_id, rfid_uid, timestamp)
+
+    # ── Pairing mode ──────────────────────────────────────────────────────
+    if allow_pairing and _pending_pairing_pk():
+        with transaction.atomic():
+            pending = SailTicket.objects.select_for_update().filter(pending_pairing=True).first()
+            if pending:
+                if SailTicket.objects.filter(rfid_uid=rfid_uid).exclude(pk=pending.pk).exists():
+                    return {
+                        'result': 'error',
+                        'error': 'already_paired',
+                        'timestamp': timestamp,
+                    }
+                pending.rfid_uid = rfid_uid
+                pending.pending_pairing = False
+                pending.save(update_fields=['rfid_uid', 'pending_pairing', 'updated_at'])
+                transaction.on_commit(rfid_cache.bump_reader_state)
+        rfid_cache.invalidate_rfid_index()
         if pending:
-            if SailTicket.objects.filter(rfid_uid=rfid_uid).exclude(pk=pending.pk).exists():
-                return JsonResponse({
-                    'result': 'error',
-                    'error': 'already_paired',
-                    'timestamp': timestamp,
-                })
-            pending.rfid_uid = rfid_uid
-            pending.pending_pairing = False
-            pending.save(update_fields=['rfid_uid', 'pending_pairing', 'updated_at'])
-            return JsonResponse({
+            return {
                 'result': 'ok',
                 'ticket_code': pending.code,
                 'timestamp': timestamp,
-            })
+            }
 
     # ── Scanning mode ─────────────────────────────────────────────────────
-    try:
-        ticket = SailTicket.objects.select_related(
-            'boat', 'boat__boat_class'
-        ).get(rfid_uid=rfid_uid)
-    except SailTicket.DoesNotExist:
-        return JsonResponse({
+    entry = _lookup_uid(rfid_uid)
+    if not entry:
+        return {
             'result': 'error',
             'error': 'unknown_card',
             'timestamp': timestamp,
-        })
-
-    target_status = _MODULE_TRANSITIONS[module_id]
+        }
 
-    if ticket.status == SailTicket.Status.LOST:
+    if entry['lost']:
         data = {
             'result': 'error',
             'error': 'lost',
-            'ticket_code': ticket.code,
+            'ticket_code': entry['code'],
             'timestamp': timestamp,
         }
-        boat_info = _boat_data(ticket.boat)
-        if boat_info:
-            data['boat'] = boat_info
-        return JsonResponse(data)
+        if entry['boat']:
+            data['boat'] = entry['boat']
+        return data
 
-    if ticket.boat is None:
-        return JsonResponse({
+    if entry['boat'] is None:
+        return {
             'result': 'error',
             'error': 'no_boat',
-            'ticket_code': ticket.code,
+            'ticket_code': entry['code'],
             'timestamp': timestamp,
-        })
+        }
 
-    if ticket.status == target_status:
-        error_key = (
-            'already_on_water'
-            if target_status == SailTicket.Status.ON_WATER
-            else 'already_ashore'
-        )
-        SailTicketLog.objects.create(
-            ticket=ticket,
-            status=ticket.status,
-            note=f'Duplicate scan on {module_id} module',
-        )
-        return JsonResponse({
-            'result': 'error',
-            'error': error_key,
-            'ticket_code': ticket.code,
-            'boat': _boat_data(ticket.boat),
-            'timestamp': timestamp,
-        })
+    target_status = _MODULE_TRANSITIONS[module_id]
+    data = None
+    with transaction.atomic():
+        ticket = SailTicket.objects.select_for_update().filter(
+            pk=entry['id'], rfid_uid=rfid_uid, boat_id=entry['boat_id'],
+        ).exclude(status=SailTicket.Status.LOST).first()
+        if (ticket is not None and ticket.status_changed_at is not None
+                and scanned_at < ticket.status_changed_at):
+            # A batched scan from before the last status change (e.g. the boat
+            # was landed at the desk meanwhile): keep it in the log only
+            log_ticket_change(
+                ticket,
+                status=ticket.status,
+                changed_at=scanned_at,
+                note=f'Late scan on {module_id} module, older than the last status change',
+            )
+            data = {
+                'result': 'error',
+                'error': 'stale_scan',
+                'ticket_code': ticket.code,
+                'boat': entry['boat'],
+                'timestamp': timestamp,
+            }
+        elif ticket is not None and ticket.status == target_status:
+            error_key = (
+                'already_on_water'
+                if target_status == SailTicket.Status.ON_WATER
+                else 'already_ashore'
+            )
+            log_ticket_change(
+                ticket,
+                status=ticket.status,
+                changed_at=scanned_at,
+                note=f'Duplicate scan on {module_id} module',
+            )
+            data = {
+                'result': 'error',
+                'error': error_key,
+                'ticket_code': ticket.code,
+                'boat': entry['boat'],
+                'timestamp': timestamp,
+            }
+        elif ticket is not None:
+            old_status = ticket.status
+            trips.record_status_change(
+                ticket, old_status, target_status, scanned_at, module_id,
+            )
+            ticket.status = target_status
+            ticket.save(update_fields=[
+                'status', 'on_water_since', 'status_changed_at', 'updated_at',
+            ])
+            dashboard_counters.ticket_status_changed(old_status, target_status)
+            log_ticket_change(
+                ticket, status=target_status, changed_at=scanned_at,
+            )
+            transaction.on_commit(rfid_cache.bump_reader_state)
+            data = {
+                'result': 'ok',
+                'ticket_code': ticket.code,
+                'new_status': target_status,
+                'boat': entry['boat'],
+                'timestamp': timestamp,
+            }
+    if data is None:
+        # The index entry no longer matches the database (e.g. the boat was
+        # deleted); drop it and answer from a fresh lookup.
+        rfid_cache.invalidate_rfid_index()
+        return _apply_scan(module_id, rfid_uid, scanned_at, allow_pairing)
+    return data
+
+
+_SCAN_ID_RE = re.compile(r'[A-Za-z0-9_.:-]{1,64}')
+
+
+def _valid_scan_id(scan_id):
+    """An optional client scan ID: empty, or up to 64 URL-safe characters."""
+    return scan_id == '' or (
+        isinstance(scan_id, str) and _SCAN_ID_RE.fullmatch(scan_id) is not None
+    )
+
+
+def _scan_request_error(module_id, rfid_uid, scan_id):
+    """Return the 400 error message for an invalid scan request, or None."""
+    if not rfid_uid:
+        return 'Missing rfid_uid'
+    if not isinstance(module_id, str) or (
+            module_id not in _MODULE_TRANSITIONS and module_id not in _pairing_modules()):
+        return 'Invalid module_id'
+    if not _valid_scan_id(scan_id):
+        return 'Invalid scan_id'
+    return None
+
+
+def _scan_request_fields(request):
+    """Read module_id, rfid_uid and scan_id from a JSON or form-encoded body.
+
+    Returns None when a JSON body cannot be parsed.
+    """
+    if request.content_type == rfid_wire.FORM_CONTENT_TYPE:
+        return rfid_wire.scan_request_fields(request.POST)
+    try:
+        body = json.loads(request.body)
+    except (json.JSONDecodeError, ValueError):
+        return None
+    return {
+        'module_id': body.get('module_id', ''),
+        'rfid_uid': body.get('rfid_uid', ''),
+        'scan_id': body.get('scan_id', ''),
+    }
 
-    # Normal transition
+
+def _scan_http_response(data, compact):
+    """Encode a scan result as JSON or, for ``compact`` readers, one text line."""
+    if compact:
+        return _compact_response(rfid_wire.encode_scan_result(data))
+    return JsonResponse(data)
+
+
+def _scan_response(module_id, rfid_uid, scan_id):
+    """Process a live scan, answering retries of a known ``scan_id`` from the cache."""
+    if scan_id:
+        cached = rfid_cache.get_scan_response(module_id, scan_id)
+        if cached is not None:
+            rfid_telemetry.record_heartbeat(module_id)
+            return cached
+    data = _process_scan(module_id, rfid_uid)
+    if scan_id:
+        rfid_cache.remember_scan_response(module_id, scan_id, data)
+    return data
+
+
+@csrf_exempt
+@require_api_key
+def rfid_scan(request):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    fields = _scan_request_fields(request)
+    if fields is None:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    module_id, rfid_uid, scan_id = fields['module_id'], fields['rfid_uid'], fields['scan_id']
+    throttled = _module_throttled(module_id)
+    if throttled:
+        return throttled
+
+    error = _scan_request_error(module_id, rfid_uid, scan_id)
+    if error:
+        return JsonResponse({'error': error}, status=400)
+    return _scan_http_response(
+        _scan_response(module_id, rfid_uid, scan_id), _wants_compact(request),
+    )
+
+
+_BATCH_MAX_SCANS = 1000
+
+
+def _parse_scanned_at(value):
+    """Parse an ISO 8601 ``scanned_at`` value into an aware datetime.
+
+    Naive values are read in the server timezone. Timestamps in the future
+    (reader clock drift) are clamped to now. Returns None when unparseable.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        scanned_at = parse_datetime(value)
+    except ValueError:
+        return None
+    if scanned_at is None:
+        return None
+    if is_naive(scanned_at):
+        scanned_at = make_aware(scanned_at)
+    return min(scanned_at, now())
+
+
+@csrf_exempt
+@require_api_key
+def rfid_scan_batch(request):
+    """Apply scans buffered by a reader while it was offline.
+
+    Scans are applied in one transaction, ordered by ``scanned_at``; results
+    are returned in request order, one per submitted record.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        body = json.loads(request.body)
+    except (json.JSONDecodeError, ValueError):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    scans = body.get('scans') if isinstance(body, dict) else None
+    if not isinstance(scans, list):
+        return JsonResponse({'error': 'Missing scans'}, status=400)
+    if len(scans) > _BATCH_MAX_SCANS:
+        return JsonResponse({'error': 'Too many scans'}, status=400)
+
+    results = [None] * len(scans)
+    valid = []
+    for index, record in enumerate(scans):
+        record = record if isinstance(record, dict) else {}
+        module_id = record.get('module_id', '')
+        rfid_uid = record.get('rfid_uid', '')
+        scanned_at = _parse_scanned_at(record.get('scanned_at'))
+        scan_id = record.get('scan_id', '')
+        if (not rfid_uid or module_id not in _MODULE_TRANSITIONS
+                or scanned_at is None or not _valid_scan_id(scan_id)):
+            results[index] = {
+                'result': 'error',
+                'error': 'invalid_record',
+                'timestamp': now().isoformat(),
+            }
+            continue
+        if scan_id:
+            cached = rfid_cache.get_scan_response(module_id, scan_id)
+            if cached is not None:
+                results[index] = cached
+                continue
+        valid.append((scanned_at, index, module_id, rfid_uid, scan_id))
+
+    valid.sort(key=lambda item: (item[0], item[1]))
+    processed = {}
+    pending_windows = {}
     with transaction.atomic():
-        ticket = SailTicket.objects.select_related(
-            'boat', 'boat__boat_class'
-        ).select_for_update().get(pk=ticket.pk)
-        ticket.status = target_status
-        ticket.save(update_fields=['status', 'updated_at'])
-        SailTicketLog.objects.create(ticket=ticket, status=target_status)
-    return JsonResponse({
-        'result': 'ok',
-        'ticket_code': ticket.code,
-        'new_status': target_status,
-        'boat': _boat_data(ticket.boat),
-        'timestamp': timestamp,
-    })
+        for scanned_at, index, module_id, rfid_uid, scan_id in valid:
+            if scan_id and (module_id, scan_id) in processed:
+                # The same scan submitted twice within one batch
+                results[index] = processed[(module_id, scan_id)]
+                continue
+            results[index] = _process_scan(
+                module_id, rfid_uid, scanned_at, allow_pairing=False,
+                pending_windows=pending_windows,
+            )
+            if scan_id:
+                processed[(module_id, scan_id)] = results[index]
+
+    for (module_id, scan_id), data in processed.items():
+        rfid_cache.remember_scan_response(module_id, scan_id, data)
+    return JsonResponse({'results': results})
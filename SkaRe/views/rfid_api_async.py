@@ -0,0 +1,114 @@
+"""Async variants of the RFID reader API views for ASGI deployments.
+
+With ``RFID_API_ASYNC`` enabled the reader endpoints are routed here (see
+DEPLOYMENT.md). The event stream waits between polls on the event loop, so an
+open reader connection no longer pins a worker thread. The cache and database
+work of heartbeats, stream polls and scans goes through the sync code path in a
+thread pool (``thread_sensitive=False``) rather than on the one shared sync
+thread, where every reader request would queue behind the others and behind
+the sync InfoDesk views of the worker.
+"""
+import asyncio
+import time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .. import rfid_cache
+from .rfid_api import (
+    _alive_response,
+    _load_reader_state,
+    _module_throttled,
+    _record_heartbeat,
+    _scan_http_response,
+    _scan_request_error,
+    _scan_request_fields,
+    _scan_response,
+    _state_event,
+    _wants_compact,
+    require_api_key,
+)
+
+
+_acached_reader_state = sync_to_async(
+    partial(rfid_cache.cached_reader_state, _load_reader_state), thread_sensitive=False,
+)
+
+
+def _checked_alive_response(request):
+    """Throttle, record the heartbeat and answer from the cached reader state."""
+    throttled = _module_throttled(request.GET.get('module_id', ''))
+    if throttled:
+        return throttled
+    _record_heartbeat(request)
+    return _alive_response(request, rfid_cache.cached_reader_state(_load_reader_state))
+
+
+@csrf_exempt
+@require_api_key
+async def rfid_alive_async(request):
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return await sync_to_async(_checked_alive_response, thread_sensitive=False)(request)
+
+
+async def _areader_events(last_version):
+    """Async variant of ``_reader_events``; waits with ``asyncio.sleep``."""
+    yield f'retry: {settings.RFID_EVENTS_RETRY_MS}\n\n'
+    deadline = time.monotonic() + settings.RFID_EVENTS_MAX_DURATION
+    last_sent = time.monotonic()
+    while True:
+        state = await _acached_reader_state()
+        if str(state['version']) != last_version:
+            last_version = str(state['version'])
+            yield _state_event(state)
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= settings.RFID_EVENTS_KEEPALIVE:
+            yield ': keepalive\n\n'
+            last_sent = time.monotonic()
+        if time.monotonic() >= deadline:
+            return
+        await asyncio.sleep(settings.RFID_EVENTS_POLL_INTERVAL)
+
+
+@csrf_exempt
+@require_api_key
+async def rfid_events_async(request):
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    last_version = request.headers.get('Last-Event-ID', '')
+    response = StreamingHttpResponse(
+        _areader_events(last_version), content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@csrf_exempt
+@require_api_key
+async def rfid_scan_async(request):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    fields = _scan_request_fields(request)
+    if fields is None:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    return await sync_to_async(_checked_scan_response, thread_sensitive=False)(
+        fields['module_id'], fields['rfid_uid'], fields['scan_id'], _wants_compact(request),
+    )
+
+
+def _checked_scan_response(module_id, rfid_uid, scan_id, compact):
+    """Validate and process a scan; validation may query open pairing sessions."""
+    throttled = _module_throttled(module_id)
+    if throttled:
+        return throttled
+    error = _scan_request_error(module_id, rfid_uid, scan_id)
+    if error:
+        return JsonResponse({'error': error}, status=400)
+    return _scan_http_response(_scan_response(module_id, rfid_uid, scan_id), compact)
@@ -1,16 +1,27 @@
 import csv
 import re
-from collections import defaultdict
+import secrets
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib import messages
 from django.db import transaction
-from django.db.models import Q
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Sum
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, JsonResponse
 from django.utils.http import url_has_allowed_host_and_scheme
+from django.utils.timezone import now
 from django.utils.translation import gettext as _
+from .. import dashboard_counters, overdue, rfid_cache, rfid_rate_limit, rfid_telemetry, ticket_search, trips
+from ..rfid_manifest import decode_manifest, import_manifest, parse_manifest
+from ..ticket_log_buffer import log_ticket_change
 from ..permissions import infodesk_required
-from ..models import SailTicket, SailTicketLog, Boat, BoatClass
-from ..forms import BulkTicketCreateForm
+from ..models import SailTicket, SailTicketLog, Boat, BoatClass, RfidReader
+from ..forms import BulkTicketCreateForm, RfidManifestForm
+from .rfid_api import _MODULE_TRANSITIONS
 
 VALID_TICKET_STATUSES = {s.value for s in SailTicket.Status}
 
@@ -116,30 +127,216 @@ def _build_ticket_plan(boats, reserve_counts, spare_count):
     return tickets
 
 
+def _boat_fingerprint():
+    """Cheap summary of the boats a ticket plan is built from: count and last edit."""
+    boats = Boat.objects.aggregate(count=Count('pk'), updated=Max('updated_at'))
+    return boats['count'], boats['updated']
+
+
+def _store_ticket_plan(plan, fingerprint, params):
+    """Keep a previewed plan in the cache for the confirm step; return its token."""
+    token = secrets.token_urlsafe(16)
+    cache.set(f'ticket_plan:{token}', {
+        'fingerprint': fingerprint,
+        'params': params,
+        'tickets': [(t.code, t.color, t.boat_id) for t in plan],
+    }, settings.TICKET_PLAN_CACHE_SECONDS)
+    return token
+
+
+def _load_ticket_plan(token, params, with_boats=False):
+    """Return the plan previewed under ``token`` as unsaved tickets.
+
+    Returns None when the token is unknown or expired, was issued for other
+    form values, or the boats changed since the preview.
+    """
+    stored = cache.get(f'ticket_plan:{token}') if token else None
+    if stored is None or stored['params'] != params or stored['fingerprint'] != _boat_fingerprint():
+        return None
+    cache.delete(f'ticket_plan:{token}')
+    plan = [SailTicket(code=code, color=color, boat_id=boat_id) for code, color, boat_id in stored['tickets']]
+    if with_boats:
+        boats = Boat.objects.in_bulk({t.boat_id for t in plan if t.boat_id})
+        for ticket in plan:
+            ticket.boat = boats.get(ticket.boat_id)
+    return plan
+
+
+def _diff_ticket_plan(plan):
+    """Compare a ticket plan with the existing tickets by code.
+
+    Returns a dict of lists:
+
+    * ``create``: planned tickets whose code does not exist yet
+    * ``reassign``: existing tickets whose boat or color differ from the plan,
+      already updated in memory, each with an ``old_boat`` attribute
+    * ``retire``: existing tickets missing from the plan that have history or
+      an RFID pairing; they are kept and only lose their boat
+    * ``delete``: unused existing tickets missing from the plan
+    * ``locked``: existing tickets on water that the plan would change; they
+      are left alone, together with the planned changes involving their boats
+    """
+    existing = {
+        t.code: t for t in SailTicket.objects.select_related('boat').annotate(
+            has_history=Exists(SailTicketLog.objects.filter(ticket=OuterRef('pk'))),
+        )
+    }
+    planned = {t.code: t for t in plan}
+
+    def changed(ticket):
+        target = planned.get(ticket.code)
+        if target is None:
+            return ticket.boat_id is not None or not ticket.has_history and not ticket.rfid_uid
+        return (ticket.boat_id, ticket.color) != (target.boat_id, target.color)
+
+    locked = [
+        t for t in existing.values()
+        if t.status == SailTicket.Status.ON_WATER and changed(t)
+    ]
+    held_boats = {t.boat_id for t in locked if t.boat_id}
+    locked_codes = {t.code for t in locked}
+
+    diff = {'create': [], 'reassign': [], 'retire': [], 'delete': [], 'locked': locked}
+    for code, target in planned.items():
+        ticket = existing.get(code)
+        if code in locked_codes or target.boat_id in held_boats:
+            continue
+        if ticket is None:
+            diff['create'].append(target)
+        elif changed(ticket):
+            ticket.old_boat = ticket.boat
+            ticket.boat, ticket.color = target.boat, target.color
+            diff['reassign'].append(ticket)
+    for code, ticket in existing.items():
+        if code in planned or code in locked_codes or not changed(ticket):
+            continue
+        if ticket.has_history or ticket.rfid_uid:
+            ticket.old_boat = ticket.boat
+            ticket.boat = None
+            diff['retire'].append(ticket)
+        else:
+            diff['delete'].append(ticket)
+    return diff
+
+
+def _apply_ticket_diff(diff, user):
+    """Save a diff from ``_diff_ticket_plan`` in one transaction.
+
+    Boat changes are logged like manual (un)assignments at the InfoDesk.
+    """
+    changed_at = now()
+    updated = diff['reassign'] + diff['retire']
+    for ticket in updated:
+        ticket.updated_at = changed_at
+    logs = [
+        SailTicketLog(
+            ticket=ticket,
+            status=ticket.status,
+            changed_at=changed_at,
+            changed_by=user,
+            note=(
+                f'Boat reassigned: {ticket.old_boat or "-"} -> {ticket.boat or "-"} '
+                f'by bulk reconcile ({user.username})'
+            ),
+        )
+        for ticket in updated
+        if ticket.old_boat != ticket.boat
+    ]
+    with transaction.atomic():
+        SailTicket.objects.filter(pk__in=[t.pk for t in diff['delete']]).delete()
+        SailTicket.objects.bulk_update(updated, ['boat', 'color', 'updated_at'], batch_size=500)
+        SailTicket.objects.bulk_create(diff['create'], batch_size=500)
+        SailTicketLog.objects.bulk_create(logs, batch_size=500)
+        rfid_cache.invalidate_rfid_index()
+        transaction.on_commit(rfid_cache.bump_reader_state)
+
+
+def _ticket_filter_q(status_filter, color_filter, assigned_filter):
+    """The ticket list filters as a Q object; invalid values are ignored."""
+    q = Q()
+    if status_filter in VALID_TICKET_STATUSES:
+        q &= Q(status=status_filter)
+    if color_filter in {c.value for c in SailTicket.Color}:
+        q &= Q(color=color_filter)
+    if assigned_filter:
+        q &= Q(boat__isnull=False)
+    return q
+
+
+def _filter_tickets(tickets, status_filter, color_filter, assigned_filter):
+    """Apply the ticket list filters; invalid values are ignored."""
+    return tickets.filter(_ticket_filter_q(status_filter, color_filter, assigned_filter))
+
+
+def _ticket_counts(filter_q):
+    """Total, filtered and per-status ticket counts in one aggregate query."""
+    aggregates = {
+        'total': Count('pk'),
+        'filtered': Count('pk', filter=filter_q),
+    }
+    for status in SailTicket.Status:
+        aggregates[status.value] = Count('pk', filter=filter_q & Q(status=status))
+    counts = SailTicket.objects.aggregate(**aggregates)
+    total, filtered = counts.pop('total'), counts.pop('filtered')
+    return total, filtered, counts
+
+
+def _ticket_page(tickets, after, before, size):
+    """One page of ``tickets`` by code: after code ``after`` or before ``before``.
+
+    Keyset pagination on the unique ``code``: every page is a range scan of
+    its index, however deep. Returns ``(page, previous_code, next_code)``,
+    the cursors for the neighbouring pages or None at either end.
+    """
+    if before:
+        page = list(tickets.filter(code__lt=before).order_by('-code')[:size + 1])
+        has_previous, has_next = len(page) > size, True
+        page = page[:size][::-1]
+    else:
+        if after:
+            tickets = tickets.filter(code__gt=after)
+        page = list(tickets.order_by('code')[:size + 1])
+        has_previous, has_next = bool(after), len(page) > size
+        page = page[:size]
+    if not page:
+        return page, None, None
+    return (
+        page,
+        page[0].code if has_previous else None,
+        page[-1].code if has_next else None,
+    )
+
+
 @infodesk_required
 def ticket_list(request):
-    from django.db.models import Count
-    tickets = SailTicket.objects.select_related('boat', 'boat__boat_class')
     status_filter = request.GET.get('status', '')
     color_filter = request.GET.get('color', '')
     assigned_filter = bool(request.GET.get('assigned', ''))
-    if status_filter in VALID_TICKET_STATUSES:
-        tickets = tickets.filter(status=status_filter)
-    if color_filter in {c.value for c in SailTicket.Color}:
-        tickets = tickets.filter(color=color_filter)
-    if assigned_filter:
-        tickets = tickets.filter(boat__isnull=False)
-    ticket_count = tickets.count()
+    filter_q = _ticket_filter_q(status_filter, color_filter, assigned_filter)
+    tickets = SailTicket.objects.select_related('boat', 'boat__boat_class').filter(filter_q)
+    page, previous_code, next_code = _ticket_page(
+        tickets,
+        request.GET.get('after', ''),
+        request.GET.get('before', ''),
+        settings.TICKET_LIST_PAGE_SIZE,
+    )
+    ticket_total, ticket_count, status_counts = _ticket_counts(filter_q)
     is_filtered = bool(status_filter or color_filter or assigned_filter)
-    ticket_total = SailTicket.objects.count() if is_filtered else None
-    status_counts = {
-        row['status']: row['count']
-        for row in tickets.values('status').annotate(count=Count('id'))
-    }
+
+    def page_query(**cursor):
+        query = request.GET.copy()
+        query.pop('after', None)
+        query.pop('before', None)
+        query.update(cursor)
+        return query.urlencode()
+
     return render(request, 'SkaRe/tickets/list.html', {
-        'tickets': tickets,
+        'tickets': page,
         'ticket_count': ticket_count,
-        'ticket_total': ticket_total,
+        'ticket_total': ticket_total if is_filtered else None,
+        'previous_query': page_query(before=previous_code) if previous_code else None,
+        'next_query': page_query(after=next_code) if next_code else None,
+        'list_query': request.GET.urlencode(),
         'is_filtered': is_filtered,
         'status_counts': status_counts,
         'status_filter': status_filter,
@@ -157,41 +354,141 @@ def ticket_detail(request, ticket_id):
         pk=ticket_id,
     )
     logs = ticket.logs.select_related('changed_by').order_by('-changed_at')
-    assigned_boat_ids = set(
-        SailTicket.objects.exclude(pk=ticket_id)
-        .filter(boat__isnull=False)
-        .values_list('boat_id', flat=True)
-    )
-    available_boats = Boat.objects.exclude(pk__in=assigned_boat_ids).select_related('boat_class').order_by('name')
     return render(request, 'SkaRe/tickets/detail.html', {
         'ticket': ticket,
         'logs': logs,
         'statuses': SailTicket.Status,
-        'available_boats': available_boats,
     })
 
 
+BOAT_SUGGESTIONS = 15
+
+
+@infodesk_required
+def ticket_boat_suggest(request):
+    """Typeahead for boat assignment: boats without a ticket matching name or sail number."""
+    query = request.GET.get('q', '').strip()
+    boats = []
+    if query:
+        boats = (
+            Boat.objects.filter(~Exists(SailTicket.objects.filter(boat=OuterRef('pk'))))
+            .filter(Q(name__icontains=query) | Q(sail_number__icontains=query))
+            .select_related('boat_class')
+            .order_by('name')[:BOAT_SUGGESTIONS]
+        )
+    return JsonResponse({'results': [
+        {
+            'id': boat.pk,
+            'name': boat.name,
+            'sail_number': boat.sail_number,
+            'boat_class': boat.boat_class.name if boat.boat_class else '',
+            'label': str(boat),
+        }
+        for boat in boats
+    ]})
+
+
 @infodesk_required
 def ticket_set_status(request, ticket_id):
     if request.method != 'POST':
         return HttpResponseNotAllowed(['POST'])
-    ticket = get_object_or_404(SailTicket, pk=ticket_id)
     new_status = request.POST.get('new_status', '')
     if new_status not in VALID_TICKET_STATUSES:
         return HttpResponseBadRequest('Invalid status')
-    ticket.status = new_status
-    ticket.save(update_fields=['status', 'updated_at'])
-    SailTicketLog.objects.create(
-        ticket=ticket,
-        status=new_status,
-        changed_by=request.user,
-    )
+    with transaction.atomic():
+        ticket = get_object_or_404(SailTicket.objects.select_for_update(), pk=ticket_id)
+        old_status = ticket.status
+        trips.record_status_change(ticket, old_status, new_status, now())
+        ticket.status = new_status
+        ticket.save(update_fields=[
+            'status', 'on_water_since', 'status_changed_at', 'updated_at',
+        ])
+        dashboard_counters.ticket_status_changed(old_status, new_status)
+        log_ticket_change(
+            ticket,
+            status=new_status,
+            changed_by=request.user,
+        )
+    if SailTicket.Status.LOST in (old_status, new_status):
+        rfid_cache.invalidate_rfid_index()
+    transaction.on_commit(rfid_cache.bump_reader_state)
     next_url = request.POST.get('next') or request.META.get('HTTP_REFERER', '')
     if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
         return redirect(next_url)
     return redirect('SkaRe:ticket_detail', ticket_id=ticket.pk)
 
 
+@infodesk_required
+def ticket_bulk_set_status(request):
+    """Set the status of the selected tickets, or of all tickets matching the list filters.
+
+    One bulk update of the tickets and one bulk insert of their log entries,
+    in one transaction. Tickets already in the new status are left alone.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    new_status = request.POST.get('new_status', '')
+    if new_status not in VALID_TICKET_STATUSES:
+        return HttpResponseBadRequest('Invalid status')
+    tickets = SailTicket.objects.all()
+    if request.POST.get('scope') == 'filter':
+        tickets = _filter_tickets(
+            tickets,
+            request.POST.get('status', ''),
+            request.POST.get('color', ''),
+            bool(request.POST.get('assigned', '')),
+        )
+    else:
+        ticket_ids = request.POST.getlist('ticket_ids')
+        if not all(pk.isdigit() for pk in ticket_ids):
+            return HttpResponseBadRequest('Invalid ticket_ids')
+        tickets = tickets.filter(pk__in=ticket_ids)
+
+    changed_at = now()
+    with transaction.atomic():
+        matched = list(tickets.select_for_update())
+        changing = [t for t in matched if t.status != new_status]
+        lost_involved = any(
+            SailTicket.Status.LOST in (t.status, new_status) for t in changing
+        )
+        old_statuses = Counter(t.status for t in changing)
+        trips.record_bulk_status_change(changing, new_status, changed_at)
+        for ticket in changing:
+            ticket.status = new_status
+            ticket.updated_at = changed_at
+        SailTicket.objects.bulk_update(
+            changing, ['status', 'on_water_since', 'status_changed_at', 'updated_at'],
+            batch_size=500,
+        )
+        for old_status, count in old_statuses.items():
+            dashboard_counters.ticket_status_changed(old_status, new_status, count)
+        SailTicketLog.objects.bulk_create([
+            SailTicketLog(
+                ticket=ticket,
+                status=new_status,
+                changed_at=changed_at,
+                changed_by=request.user,
+                note=f'Bulk status change by {request.user.username}',
+            )
+            for ticket in changing
+        ], batch_size=500)
+    if lost_involved:
+        rfid_cache.invalidate_rfid_index()
+    if changing:
+        transaction.on_commit(rfid_cache.bump_reader_state)
+    messages.success(request, _(
+        '%(changed)d tickets set to %(status)s; %(unchanged)d already had that status.'
+    ) % {
+        'changed': len(changing),
+        'status': SailTicket.Status(new_status).label,
+        'unchanged': len(matched) - len(changing),
+    })
+    next_url = request.POST.get('next', '')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('SkaRe:ticket_list')
+
+
 @infodesk_required
 def ticket_pair_rfid(request, ticket_id):
     if request.method != 'POST':
@@ -201,6 +498,8 @@ def ticket_pair_rfid(request, ticket_id):
         SailTicket.objects.filter(pending_pairing=True).update(pending_pairing=False)
         ticket.pending_pairing = True
         ticket.save(update_fields=['pending_pairing', 'updated_at'])
+    rfid_cache.invalidate_rfid_index()
+    transaction.on_commit(rfid_cache.bump_reader_state)
     messages.info(request, _('Waiting for RFID scan on ticket %(code)s\u2026') % {'code': ticket.code})
     return redirect('SkaRe:ticket_detail', ticket_id=ticket.pk)
 
@@ -214,8 +513,9 @@ def ticket_unpair_rfid(request, ticket_id):
         return HttpResponseBadRequest('Ticket has no paired card')
     ticket.rfid_uid = ''
     ticket.save(update_fields=['rfid_uid', 'updated_at'])
-    SailTicketLog.objects.create(
-        ticket=ticket,
+    rfid_cache.invalidate_rfid_index()
+    log_ticket_change(
+        ticket,
         status=ticket.status,
         changed_by=request.user,
         note=f'RFID card unpaired by {request.user.username}',
@@ -233,6 +533,8 @@ def ticket_cancel_pairing(request, ticket_id):
         return HttpResponseBadRequest('Ticket is not awaiting pairing')
     ticket.pending_pairing = False
     ticket.save(update_fields=['pending_pairing', 'updated_at'])
+    rfid_cache.invalidate_rfid_index()
+    transaction.on_commit(rfid_cache.bump_reader_state)
     messages.info(request, _('Pairing cancelled for ticket %(code)s.') % {'code': ticket.code})
     return redirect('SkaRe:ticket_detail', ticket_id=ticket.pk)
 
@@ -256,8 +558,10 @@ def ticket_assign_boat(request, ticket_id):
         return redirect('SkaRe:ticket_detail', ticket_id=ticket.pk)
     ticket.boat = boat
     ticket.save(update_fields=['boat', 'updated_at'])
-    SailTicketLog.objects.create(
-        ticket=ticket,
+    rfid_cache.invalidate_rfid_index()
+    transaction.on_commit(rfid_cache.bump_reader_state)
+    log_ticket_change(
+        ticket,
         status=ticket.status,
         changed_by=request.user,
         note=f'Boat assigned: {boat} by {request.user.username}',
@@ -279,8 +583,10 @@ def ticket_unassign_boat(request, ticket_id):
     old_boat = ticket.boat
     ticket.boat = None
     ticket.save(update_fields=['boat', 'updated_at'])
-    SailTicketLog.objects.create(
-        ticket=ticket,
+    rfid_cache.invalidate_rfid_index()
+    transaction.on_commit(rfid_cache.bump_reader_state)
+    log_ticket_change(
+        ticket,
         status=ticket.status,
         changed_by=request.user,
         note=f'Boat unassigned: {old_boat} by {request.user.username}',
@@ -294,12 +600,7 @@ def ticket_lookup(request):
     query = request.GET.get('q', '').strip()
     results = []
     if query:
-        results = SailTicket.objects.filter(
-            Q(code__icontains=query) |
-            Q(boat__name__icontains=query) |
-            Q(boat__sail_number__icontains=query) |
-            Q(boat__contact_person__icontains=query)
-        ).select_related('boat', 'boat__boat_class').order_by('code')
+        results = ticket_search.search_tickets(query)
     return render(request, 'SkaRe/tickets/lookup.html', {
         'query': query,
         'results': results,
@@ -307,26 +608,91 @@ def ticket_lookup(request):
     })
 
 
+LOOKUP_SUGGESTIONS = 10
+
+
+@infodesk_required
+def ticket_lookup_suggest(request):
+    """Typeahead for the lookup page: best matching tickets as JSON."""
+    query = request.GET.get('q', '').strip()
+    tickets = ticket_search.search_tickets(query, LOOKUP_SUGGESTIONS) if query else []
+    return JsonResponse({'results': [
+        {
+            'id': ticket.pk,
+            'code': ticket.code,
+            'boat': ticket.boat.name if ticket.boat else '',
+            'sail_number': ticket.boat.sail_number if ticket.boat else '',
+            'contact_person': ticket.boat.contact_person if ticket.boat else '',
+            'status': ticket.status,
+            'status_display': ticket.get_status_display(),
+            'url': reverse('SkaRe:ticket_detail', args=[ticket.pk]),
+        }
+        for ticket in tickets
+    ]})
+
+
+def _confirm_ticket_plan(request, plan, reconcile):
+    if reconcile:
+        diff = _diff_ticket_plan(plan)
+        _apply_ticket_diff(diff, request.user)
+        messages.success(request, _(
+            'Tickets reconciled: %(created)d created, %(reassigned)d reassigned, '
+            '%(retired)d retired, %(deleted)d deleted, %(locked)d on water left unchanged.'
+        ) % {
+            'created': len(diff['create']),
+            'reassigned': len(diff['reassign']),
+            'retired': len(diff['retire']),
+            'deleted': len(diff['delete']),
+            'locked': len(diff['locked']),
+        })
+        return redirect('SkaRe:ticket_list')
+    with transaction.atomic():
+        SailTicket.objects.all().delete()
+        SailTicket.objects.bulk_create(plan)
+        dashboard_counters.reconcile()
+    rfid_cache.invalidate_rfid_index()
+    transaction.on_commit(rfid_cache.bump_reader_state)
+    messages.success(request, _('%(n)d tickets created.') % {'n': len(plan)})
+    return redirect('SkaRe:ticket_list')
+
+
 @infodesk_required
 def ticket_create_bulk(request):
     if request.method == 'POST':
         form = BulkTicketCreateForm(request.POST)
         if form.is_valid():
+            reconcile = form.cleaned_data['mode'] == BulkTicketCreateForm.MODE_RECONCILE
+            if request.POST.get('confirm') == '1':
+                # Commit exactly the plan the operator reviewed
+                plan = _load_ticket_plan(
+                    request.POST.get('plan_token', ''), form.cleaned_data, with_boats=reconcile,
+                )
+                if plan is not None:
+                    return _confirm_ticket_plan(request, plan, reconcile)
+                messages.warning(request, _(
+                    'Boats changed or the preview expired. Review the updated plan and confirm again.'
+                ))
+
             reserve_counts = {
                 SailTicket.Color.P550: form.cleaned_data['p550_reserves'],
                 SailTicket.Color.SAIL: form.cleaned_data['sail_reserves'],
                 SailTicket.Color.OTHER: form.cleaned_data['other_reserves'],
             }
             spare_count = form.cleaned_data['spare_count']
+            fingerprint = _boat_fingerprint()
             boats = Boat.objects.select_related('boat_class')
             plan = _build_ticket_plan(boats, reserve_counts, spare_count)
-
-            if request.POST.get('confirm') == '1':
-                with transaction.atomic():
-                    SailTicket.objects.all().delete()
-                    SailTicket.objects.bulk_create(plan)
-                messages.success(request, _('%(n)d tickets created.') % {'n': len(plan)})
-                return redirect('SkaRe:ticket_list')
+            plan_token = _store_ticket_plan(plan, fingerprint, form.cleaned_data)
+
+            if reconcile:
+                diff = _diff_ticket_plan(plan)
+                return render(request, 'SkaRe/tickets/create_bulk.html', {
+                    'form': form,
+                    'plan_token': plan_token,
+                    'diff': diff,
+                    'diff_empty': not any(diff.values()),
+                    'reassign_count': len(diff['reassign']) + len(diff['retire']),
+                })
 
             # Step 1: show preview — group tickets by color for the template
             groups = defaultdict(list)
@@ -345,6 +711,7 @@ def ticket_create_bulk(request):
             ]
             return render(request, 'SkaRe/tickets/create_bulk.html', {
                 'form': form,
+                'plan_token': plan_token,
                 'plan': plan,
                 'plan_by_color': plan_by_color,
                 'existing_ticket_count': SailTicket.objects.count(),
@@ -367,10 +734,158 @@ def ticket_create_bulk(request):
 
 @infodesk_required
 def ticket_on_water(request):
-    tickets = SailTicket.objects.filter(
-        status=SailTicket.Status.ON_WATER
-    ).select_related('boat', 'boat__boat_class', 'boat__created_by')
-    return render(request, 'SkaRe/tickets/on_water.html', {'tickets': tickets})
+    # Taken before the tickets so that no change falls between the two
+    cursor = SailTicketLog.objects.aggregate(cursor=Max('pk'))['cursor'] or 0
+    tickets = _on_water_tickets().filter(status=SailTicket.Status.ON_WATER)
+    return render(request, 'SkaRe/tickets/on_water.html', {
+        'tickets': tickets,
+        'cursor': cursor,
+        'refresh_ms': int(settings.ON_WATER_BOARD_REFRESH * 1000),
+    })
+
+
+def _on_water_tickets():
+    return SailTicket.objects.select_related('boat', 'boat__boat_class').order_by(
+        F('on_water_since').asc(nulls_first=True), 'code',
+    )
+
+
+ON_WATER_CHANGES_MAX_LOGS = 500
+
+
+@infodesk_required
+def ticket_on_water_changes(request):
+    """Changes to the boats-on-water board since the log entry ``?after=<id>``.
+
+    Every status change and boat (un)assignment writes a SailTicketLog entry,
+    so the tickets logged after the cursor are the only rows that can differ.
+    Returns their rows to insert or replace (``upsert``), the IDs of tickets
+    that left the water (``remove``) and the new ``cursor``. ``reset`` asks
+    the board to reload when the cursor is unknown or too far behind.
+    """
+    try:
+        after = int(request.GET.get('after', ''))
+    except ValueError:
+        return HttpResponseBadRequest('Invalid cursor')
+    logs = list(
+        SailTicketLog.objects.filter(pk__gt=after).order_by('pk')
+        .values_list('pk', 'ticket_id')[:ON_WATER_CHANGES_MAX_LOGS + 1]
+    )
+    if len(logs) > ON_WATER_CHANGES_MAX_LOGS:
+        return JsonResponse({'reset': True})
+    if not logs:
+        # The cursor must still exist, else the database was reset under the board
+        if after and not SailTicketLog.objects.filter(pk=after).exists():
+            return JsonResponse({'reset': True})
+        return JsonResponse({'cursor': after, 'upsert': [], 'remove': []})
+    changed = {ticket_id for _pk, ticket_id in logs}
+    upsert, remove = [], []
+    for ticket in _on_water_tickets().filter(pk__in=changed):
+        if ticket.status == SailTicket.Status.ON_WATER:
+            upsert.append({
+                'id': ticket.pk,
+                'html': render_to_string('SkaRe/tickets/_on_water_row.html', {'ticket': ticket}),
+            })
+        else:
+            remove.append(ticket.pk)
+    return JsonResponse({'cursor': logs[-1][0], 'upsert': upsert, 'remove': remove})
+
+
+@infodesk_required
+def ticket_overdue(request):
+    """Boats on water longer than their class threshold, refreshed from the feed."""
+    boats, evaluated_at = overdue.current_overdue()
+    return render(request, 'SkaRe/tickets/overdue.html', {
+        'boats': boats,
+        'evaluated_at': evaluated_at,
+        'default_minutes': settings.OVERDUE_DEFAULT_MINUTES,
+        'refresh_ms': int(settings.OVERDUE_CHECK_INTERVAL * 1000),
+    })
+
+
+@infodesk_required
+def ticket_overdue_feed(request):
+    """JSON feed of the overdue boats for the alert page and big screens."""
+    boats, evaluated_at = overdue.current_overdue()
+    return JsonResponse({'evaluated_at': evaluated_at, 'overdue': boats})
+
+
+@infodesk_required
+def ticket_import_manifest(request):
+    """Pair RFID cards with tickets from an uploaded supplier manifest."""
+    report = None
+    if request.method == 'POST':
+        form = RfidManifestForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                rows = parse_manifest(decode_manifest(form.cleaned_data['manifest'].read()))
+            except UnicodeDecodeError:
+                rows = None
+            if not rows:
+                form.add_error('manifest', _('The file contains no manifest rows.'))
+            else:
+                report = import_manifest(
+                    rows,
+                    user=request.user,
+                    replace=form.cleaned_data['replace'],
+                    skip_conflicts=form.cleaned_data['skip_conflicts'],
+                    dry_run=form.cleaned_data['dry_run'],
+                )
+                report['rows'] = len(rows)
+                if report['applied']:
+                    messages.success(request, _('%(n)d tickets paired from the manifest.') % {'n': report['paired']})
+                elif report['conflicts'] and report['paired'] and not form.cleaned_data['dry_run']:
+                    messages.error(request, _('Nothing was saved because the manifest has conflicts.'))
+    else:
+        form = RfidManifestForm()
+    return render(request, 'SkaRe/tickets/import_manifest.html', {
+        'form': form,
+        'report': report,
+    })
+
+
+READER_WINDOW_MINUTES = 10
+
+
+@infodesk_required
+def ticket_readers(request):
+    """Health and throughput of the gate readers, from the flushed RFID telemetry."""
+    rfid_telemetry.flush()
+    current = now()
+    since = current.replace(second=0, microsecond=0) - timedelta(minutes=READER_WINDOW_MINUTES - 1)
+    recent = Q(minutes__minute__gte=since)
+    readers = {
+        reader.module_id: reader
+        for reader in RfidReader.objects.annotate(
+            recent_scans=Sum('minutes__scans', filter=recent, default=0),
+            recent_errors=Sum('minutes__errors', filter=recent, default=0),
+            recent_latency_ms=Sum('minutes__latency_total_ms', filter=recent, default=0),
+            recent_latency_max_ms=Max('minutes__latency_max_ms', filter=recent),
+        )
+    }
+    # Known modules that have never reported are listed as offline
+    for module_id in _MODULE_TRANSITIONS:
+        if module_id not in readers:
+            reader = readers[module_id] = RfidReader(module_id=module_id)
+            reader.recent_scans = reader.recent_errors = reader.recent_latency_ms = 0
+            reader.recent_latency_max_ms = None
+
+    stale = timedelta(seconds=settings.RFID_READER_STALE_SECONDS)
+    for reader in readers.values():
+        seen = [t for t in (reader.last_heartbeat_at, reader.last_scan_at) if t]
+        reader.last_seen_at = max(seen) if seen else None
+        reader.online = reader.last_seen_at is not None and current - reader.last_seen_at <= stale
+        reader.scans_per_minute = reader.recent_scans / READER_WINDOW_MINUTES
+        reader.recent_latency_avg_ms = (
+            reader.recent_latency_ms / reader.recent_scans if reader.recent_scans else None
+        )
+        reader.latency_avg_ms = reader.latency_total_ms / reader.scans if reader.scans else None
+
+    return render(request, 'SkaRe/tickets/readers.html', {
+        'readers': sorted(readers.values(), key=lambda r: r.module_id),
+        'window_minutes': READER_WINDOW_MINUTES,
+        'rate_limit_rejected': rfid_rate_limit.rejected_counts(),
+    })
 
 
 @infodesk_required